@@ -0,0 +1,303 @@
+"""
+api.py - カタログの読み取り専用JSON API（ASGI）
+UIと同じDBを読み取り専用で開き、VOD一覧・検索、VOD詳細、クリップ一覧・詳細、統計を返す
+
+ETagは依存するテーブルのデータバージョンから作る強いETagで、If-None-Match が一致すれば
+クエリを実行せずに 304 を返す（ポーリングするボットやミラーは data_versions を読むだけで済む）。
+Accept-Encoding に gzip があれば圧縮して返す。
+
+エンドポイント:
+    GET /api/vods?q=&category=&broadcaster_id=&limit=&cursor=
+    GET /api/vods/{id}
+    GET /api/clips?q=&vod_id=&broadcaster_id=&limit=&cursor=
+    GET /api/clips/{id}
+    GET /api/stats
+    GET /healthz
+
+使い方:
+    python -m app.api serve --port 8000          # uvicorn が必要
+    uvicorn app.api:app --port 8000
+    python -m app.api get "/api/vods?limit=5"    # サーバーを起動せずに1件リクエスト
+"""
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import sys
+from urllib.parse import parse_qs
+
+from app.utils.catalog import (
+    CLIP_LIST_TABLES, CLIP_TABLES, STATS_TABLES, VOD_LIST_TABLES, VOD_TABLES, InvalidCursor,
+    catalog_stats, clamp_limit, clip_detail, connect_readonly, list_clips, list_vods, vod_detail
+)
+from app.utils.data_version import get_data_versions
+from app.utils.details import parse_detail_id
+from app.utils.schema import ensure_sync_schema
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = "vods.db"
+DEFAULT_PORT = 8000
+# レスポンスの形を変えたら上げる（ETagが変わり、キャッシュが読み直される）
+API_VERSION = 1
+# キャッシュはしてよいが、使う前に必ずETagで確認させる
+CACHE_CONTROL = "public, max-age=0, must-revalidate"
+
+
+class NotFound(Exception):
+    pass
+
+
+def _param(query, name):
+    values = query.get(name)
+    return values[0] if values else None
+
+
+def _by_id(fetch):
+    """/api/<種類>/<id> のハンドラ（SQLiteの整数に収まらないIDは存在しないものとして404）"""
+    def handler(c, m, q):
+        row_id = parse_detail_id(m.group(1))
+        return fetch(c, row_id) if row_id is not None else None
+    return handler
+
+
+# (パターン, 依存テーブル, ハンドラ)。ハンドラは (cursor, match, query) を受け取る
+# IDは19桁まで（INTEGERの上限 2^63-1 は19桁。それより長いものはパターンに合わず404）
+ROUTES = [
+    (re.compile(r"^/api/vods/?$"), VOD_LIST_TABLES, lambda c, m, q: list_vods(
+        c, q=_param(q, 'q'), category=_param(q, 'category'), broadcaster_id=_param(q, 'broadcaster_id'),
+        after=_param(q, 'cursor'), limit=clamp_limit(_param(q, 'limit')))),
+    (re.compile(r"^/api/vods/(\d{1,19})$"), VOD_TABLES, _by_id(vod_detail)),
+    (re.compile(r"^/api/clips/?$"), CLIP_LIST_TABLES, lambda c, m, q: list_clips(
+        c, q=_param(q, 'q'), vod_id=_param(q, 'vod_id'), broadcaster_id=_param(q, 'broadcaster_id'),
+        after=_param(q, 'cursor'), limit=clamp_limit(_param(q, 'limit')))),
+    (re.compile(r"^/api/clips/(\d{1,19})$"), CLIP_TABLES, _by_id(clip_detail)),
+    (re.compile(r"^/api/stats/?$"), STATS_TABLES, lambda c, m, q: catalog_stats(c)),
+]
+
+
+def prepare_database(db_path):
+    """起動時に1回だけスキーマとバージョン管理用のトリガーを用意（以降は読み取り専用）"""
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    try:
+        ensure_sync_schema(conn.cursor())
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def make_etag(path, query_string, versions, encoding=None):
+    """パス・クエリ・データバージョンから強いETagを作る（圧縮した表現は別のETag）"""
+    key = json.dumps([API_VERSION, path, query_string, versions], sort_keys=True)
+    digest = hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]
+    return f'"{digest}-{encoding}"' if encoding else f'"{digest}"'
+
+
+def etag_matches(if_none_match, etag):
+    """If-None-Match の比較（GETでは弱い比較でよいので W/ は無視する）"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return True
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def accepts_gzip(accept_encoding):
+    for part in (accept_encoding or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        if coding.strip().lower() in ('gzip', '*') and params.replace(' ', '') != 'q=0':
+            return True
+    return False
+
+
+def _read_versions(db_path, tables):
+    conn = connect_readonly(db_path)
+    try:
+        return get_data_versions(conn.cursor(), tables)
+    finally:
+        conn.close()
+
+
+def _run_handler(db_path, tables, handler, match, query):
+    """バージョンと結果を同じスナップショットから読む（ETagと本文を食い違わせない）"""
+    conn = connect_readonly(db_path)
+    try:
+        c = conn.cursor()
+        c.execute("BEGIN")
+        versions = get_data_versions(c, tables)
+        result = handler(c, match, query)
+        conn.rollback()
+    finally:
+        conn.close()
+    if result is None:
+        raise NotFound()
+    return versions, result
+
+
+def create_app(db_path=DB_PATH):
+    """ASGIアプリを作成"""
+
+    async def send_response(send, status, body=b'', headers=(), head_only=False):
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(name.encode('latin-1'), value.encode('latin-1')) for name, value in headers],
+        })
+        await send({"type": "http.response.body", "body": b'' if head_only else body})
+
+    async def send_json(send, status, payload, headers=(), head_only=False):
+        body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        await send_response(send, status, body, [
+            ("content-type", "application/json; charset=utf-8"), ("content-length", str(len(body))), *headers
+        ], head_only)
+
+    async def lifespan(receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await asyncio.to_thread(prepare_database, db_path)
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def app(scope, receive, send):
+        if scope["type"] == "lifespan":
+            await lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        method = scope["method"]
+        head_only = method == "HEAD"
+        if method not in ("GET", "HEAD"):
+            await send_json(send, 405, {"error": "method not allowed"}, [("allow", "GET, HEAD")])
+            return
+
+        path = scope["path"]
+        if path == "/healthz":
+            await send_response(send, 200, b'ok', [("content-type", "text/plain; charset=utf-8")], head_only)
+            return
+
+        for pattern, tables, handler in ROUTES:
+            match = pattern.match(path)
+            if match:
+                break
+        else:
+            await send_json(send, 404, {"error": "not found"}, head_only=head_only)
+            return
+
+        headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope["headers"]}
+        query_string = scope.get("query_string", b'').decode('latin-1')
+        encoding = 'gzip' if accepts_gzip(headers.get('accept-encoding')) else None
+
+        # 先にデータバージョンだけ読み、変わっていなければクエリを実行しない
+        versions = await asyncio.to_thread(_read_versions, db_path, tables)
+        etag = make_etag(path, query_string, versions, encoding)
+        cache_headers = [("etag", etag), ("cache-control", CACHE_CONTROL), ("vary", "Accept-Encoding")]
+        if etag_matches(headers.get('if-none-match'), etag):
+            await send_response(send, 304, headers=cache_headers)
+            return
+
+        try:
+            versions, result = await asyncio.to_thread(
+                _run_handler, db_path, tables, handler, match, parse_qs(query_string, keep_blank_values=False)
+            )
+        except NotFound:
+            await send_json(send, 404, {"error": "not found"}, head_only=head_only)
+            return
+        except InvalidCursor:
+            await send_json(send, 400, {"error": "invalid cursor"}, head_only=head_only)
+            return
+
+        body = json.dumps(result, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        cache_headers[0] = ("etag", make_etag(path, query_string, versions, encoding))
+        response_headers = [("content-type", "application/json; charset=utf-8"), *cache_headers]
+        if encoding:
+            # ETagは圧縮の有無で分けているので、小さな本文も常に圧縮する
+            body = gzip.compress(body, compresslevel=6)
+            response_headers.append(("content-encoding", "gzip"))
+        response_headers.append(("content-length", str(len(body))))
+        await send_response(send, 200, body, response_headers, head_only)
+
+    return app
+
+
+app = create_app()
+
+
+def request(path, db_path=DB_PATH, headers=None):
+    """
+    サーバーを起動せずにASGIアプリへ1件リクエストする（確認・テスト用）
+
+    Returns: (ステータス, ヘッダーの辞書, 本文のbytes)
+    """
+    path, _, query_string = path.partition('?')
+    scope = {
+        "type": "http", "method": "GET", "path": path, "query_string": query_string.encode('latin-1'),
+        "headers": [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                    for name, value in (headers or {}).items()],
+    }
+    response = {"body": b''}
+
+    async def receive():
+        return {"type": "http.request", "body": b'', "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = {name.decode('latin-1'): value.decode('latin-1')
+                                   for name, value in message["headers"]}
+        else:
+            response["body"] += message.get("body", b'')
+
+    asyncio.run(create_app(db_path)(scope, receive, send))
+    return response["status"], response["headers"], response["body"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="カタログの読み取り専用JSON API")
+    parser.add_argument('--db', default=DB_PATH)
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = sub.add_parser('serve', help="APIサーバーを起動（uvicornが必要）")
+    serve_parser.add_argument('--host', default='0.0.0.0')
+    serve_parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+
+    get_parser = sub.add_parser('get', help="サーバーを起動せずに1件リクエストして表示")
+    get_parser.add_argument('path', help='例: "/api/vods?limit=5"')
+    get_parser.add_argument('--etag', help="If-None-Match に指定するETag")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr,
+                        format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    if args.command == 'serve':
+        try:
+            import uvicorn
+        except ImportError:
+            parser.error("uvicorn がインストールされていません（pip install uvicorn）")
+        uvicorn.run(create_app(args.db), host=args.host, port=args.port)
+    elif args.command == 'get':
+        prepare_database(args.db)
+        status, headers, body = request(args.path, db_path=args.db,
+                                        headers={"If-None-Match": args.etag} if args.etag else None)
+        print(f"{status} ETag: {headers.get('etag', '-')}", file=sys.stderr)
+        if body:
+            print(body.decode('utf-8'))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,66 @@
+# カード一覧（1つのHTMLブロック）と詳細ページへのリンク: app/components/card_grid.py
+from html import escape
+from urllib.parse import urlencode
+
+import streamlit as st
+
+from app.utils.details import parse_detail_id
+
+
+def detail_href(page_path, **params):
+    """詳細ページへの相対リンク（例: video_detail?vod_id=1）"""
+    return f"{page_path}?{urlencode(params)}"
+
+
+def resolve_detail_id(param, session_key):
+    """
+    詳細ページのIDを決めて、URLを正規の形（?vod_id= / ?clip_id=）にそろえる
+
+    クエリパラメータを優先し、なければ他ページのボタンが残した session_state を使う。
+    session_state から来た場合もURLに書き戻すので、共有・ブックマークできる。
+    Returns: 数値のID（指定がない・不正な場合はNone）
+    """
+    detail_id = parse_detail_id(st.query_params.get(param))
+    if detail_id is None:
+        detail_id = parse_detail_id(st.session_state.get(session_key))
+    st.session_state.pop(session_key, None)
+    if detail_id is not None and st.query_params.get(param) != str(detail_id):
+        st.query_params[param] = str(detail_id)
+    return detail_id
+
+
+def render_card_grid(cards, columns=4, thumbnail_height=210, thumbnail_size=(320, 180)):
+    """
+    カード一覧を1回のst.markdownで描画
+
+    cards: [{"href", "thumbnail_url", "placeholder", "body"}] のリスト。
+    placeholder（サムネイルがないときの表示）と body はHTML（呼び出し側でエスケープ済み）。
+    カード全体が詳細ページへのリンクになるので、カードごとのボタンは不要。
+    クリックは static/js/shell.js が同じセッションのままのページ遷移に置き換える
+    （session_state が残る）。新しいタブで開いた場合や直接のアクセスは href のURLで開く。
+    サムネイルは loading="lazy" で、見えている行と少し先の行だけを読み込む
+    （thumbnail_size は画像の実寸。width/heightを指定してレイアウトのずれを防ぐ）。
+    先読みは static/js/shell.js が data-lazy-card の画像をDOMへの挿入時に拾って行うので、
+    フラグメントの再実行やページ送りでもここから追加のスクリプトは送らない。
+    """
+    width, height = thumbnail_size
+    items = []
+    for card in cards:
+        if card.get("thumbnail_url"):
+            thumb = (
+                f'<img src="{escape(card["thumbnail_url"])}" alt="" width="{width}" height="{height}" '
+                f'loading="lazy" decoding="async" data-lazy-card="1">'
+            )
+        else:
+            thumb = card.get("placeholder", "")
+        items.append(
+            f'<a class="card-grid-item" href="{escape(card["href"])}" target="_self" data-app-link="1">'
+            f'<div class="card-grid-thumb">{thumb}</div>{card["body"]}</a>'
+        )
+    # スタイル（.card-grid）は static/css/shell.css にあり、再実行のたびには送らない
+    st.markdown(
+        f'<div class="card-grid" style="--card-columns: {columns}; --card-thumb-height: {thumbnail_height}px;">'
+        + "".join(items)
+        + "</div>",
+        unsafe_allow_html=True,
+    )
@@ -0,0 +1,70 @@
+# カタログの一括エクスポート（管理者用）: app/components/catalog_export.py
+import io
+from datetime import timedelta
+
+import streamlit as st
+
+from app.components.channel_selector import load_channels
+from app.utils.catalog_export import (
+    DB_PATH, EXPORT_COLUMNS, MIME_TYPES, export_file_name, export_to_file, parquet_available
+)
+
+TABLE_LABELS = {"vods": "VOD", "clips": "クリップ", "youtube_links": "YouTubeリンク"}
+FORMAT_LABELS = {"csv": "CSV", "jsonl": "JSONL", "parquet": "Parquet"}
+
+
+def _deferred_export(table, fmt, filters):
+    """
+    ボタンが押されたときだけ書き出す（再実行のたびには読まない）
+
+    書き出しはチャンクごとだが、Streamlitはダウンロードするファイルをメモリに保持するので
+    大きなカタログはCLI（python -m app.utils.catalog_export）を使う。
+    """
+    def build():
+        buffer = io.BytesIO()
+        export_to_file(buffer, table, fmt, db_path=DB_PATH, **filters)
+        buffer.seek(0)
+        return buffer
+    return build
+
+
+def show_catalog_export():
+    """テーブル・形式・絞り込みを選んでダウンロード（管理者用）"""
+    col_table, col_format = st.columns(2)
+    with col_table:
+        table = st.selectbox("テーブル", list(EXPORT_COLUMNS), format_func=TABLE_LABELS.get, key="export_table")
+    with col_format:
+        formats = [fmt for fmt in FORMAT_LABELS if fmt != "parquet" or parquet_available()]
+        fmt = st.radio("形式", formats, format_func=FORMAT_LABELS.get, horizontal=True, key="export_format")
+    if not parquet_available():
+        st.caption("Parquetで出力するには pyarrow をインストールしてください")
+
+    col_channel, col_since, col_until = st.columns(3)
+    with col_channel:
+        channels = load_channels()
+        ids = [None] + [channel["broadcaster_id"] for channel in channels]
+        names = {channel["broadcaster_id"]: channel["display_name"] or channel["login"] for channel in channels}
+        broadcaster_id = st.selectbox("チャンネル", ids, format_func=lambda bid: names.get(bid, "すべて"),
+                                      key="export_channel")
+    with col_since:
+        since = st.date_input("開始日", value=None, key="export_since")
+    with col_until:
+        until = st.date_input("終了日（この日を含む）", value=None, key="export_until")
+    q = st.text_input("タイトルの部分一致", key="export_q")
+
+    filters = {
+        "broadcaster_id": broadcaster_id,
+        "since": since.isoformat() if since else None,
+        # created_at は日時の文字列なので、終了日の翌日より前で比べる
+        "until": (until + timedelta(days=1)).isoformat() if until else None,
+        "q": q.strip() or None,
+    }
+    st.download_button(
+        f"⬇️ {TABLE_LABELS[table]}を{FORMAT_LABELS[fmt]}で出力",
+        data=_deferred_export(table, fmt, filters),
+        file_name=export_file_name(table, fmt, **dict(filters, until=until.isoformat() if until else None)),
+        mime=MIME_TYPES[fmt],
+        on_click="ignore",
+        use_container_width=True,
+    )
+    st.caption("CLI: python -m app.utils.catalog_export clips --format csv --out clips.csv")
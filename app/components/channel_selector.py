@@ -0,0 +1,63 @@
+# チャンネル選択コンポーネント: app/components/channel_selector.py
+import sqlite3
+
+import streamlit as st
+
+
+@st.cache_data(ttl=60)
+def load_channels():
+    """同期対象（有効）のチャンネル一覧を取得（channelsテーブルがなければ空）"""
+    conn = sqlite3.connect("vods.db", check_same_thread=False)
+    try:
+        rows = conn.execute("""
+            SELECT broadcaster_id, login, display_name
+            FROM channels WHERE enabled = 1
+            ORDER BY added_at, login
+        """).fetchall()
+    except sqlite3.OperationalError:
+        rows = []
+    finally:
+        conn.close()
+    return [{"broadcaster_id": row[0], "login": row[1], "display_name": row[2]} for row in rows]
+
+
+def get_selected_channel():
+    """
+    選択中のチャンネルを返す（チャンネル未登録ならNone）
+
+    選択はsession_state['channel_id']に保存してページ間で共有する。
+    未選択・削除済みの場合は最初に登録されたチャンネル。
+    """
+    channels = load_channels()
+    if not channels:
+        return None
+    for channel in channels:
+        if channel["broadcaster_id"] == st.session_state.get("channel_id"):
+            return channel
+    st.session_state.channel_id = channels[0]["broadcaster_id"]
+    return channels[0]
+
+
+def select_channel(label="📡 チャンネル"):
+    """
+    チャンネルの選択ボックスを表示し、選択中のチャンネルを返す
+
+    チャンネルが1つだけなら選択ボックスは出さない。
+    """
+    channels = load_channels()
+    current = get_selected_channel()
+    if len(channels) > 1:
+        ids = [channel["broadcaster_id"] for channel in channels]
+        names = {channel["broadcaster_id"]: channel["display_name"] or channel["login"] for channel in channels}
+        selected = st.selectbox(label, ids, index=ids.index(current["broadcaster_id"]),
+                                format_func=names.get, key="channel_selector")
+        st.session_state.channel_id = selected
+        current = channels[ids.index(selected)]
+    return current
+
+
+def channel_url(channel):
+    """チャンネルのTwitch URL（未登録ならNone）"""
+    if not channel or not channel.get("login"):
+        return None
+    return f"https://www.twitch.tv/{channel['login']}"
@@ -0,0 +1,98 @@
+# お気に入り（ブラウザごとに保存）: app/components/favorites.py
+"""
+閲覧者の識別子（owner_token）をCookieに保存し、お気に入りを favorites テーブルに記録する。
+セッションにはお気に入りのクリップIDの集合だけを持ち、ページの再実行ではDBを読まない。
+"""
+
+import secrets
+import sqlite3
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+from app.utils.data_cache import DB_PATH, ensure_database
+from app.utils.favorites import add_favorites, get_favorite_clip_ids, is_valid_owner_token, set_favorite
+
+OWNER_COOKIE = "vod_finder_owner"
+# 2年（開くたびに期限を延ばすことはしない）
+OWNER_COOKIE_MAX_AGE = 60 * 60 * 24 * 365 * 2
+# 以前の形式（セッションにクリップごとのキーを持っていた）
+LEGACY_KEY_PREFIX = "clip_fav_"
+
+SET_COOKIE_SCRIPT = """
+<script>
+window.parent.document.cookie = "__NAME__=__VALUE__; max-age=__MAX_AGE__; path=/; SameSite=Lax";
+</script>
+"""
+
+
+def get_owner_token():
+    """
+    このブラウザの owner_token を取得（なければ作ってCookieに保存）
+
+    Cookieは st.context.cookies から読む。読めない古いStreamlitでは、
+    お気に入りはDBに残るがセッションをまたいで引き継がれない。
+    """
+    token = st.session_state.get("favorites_owner_token")
+    if token:
+        return token
+    cookies = getattr(getattr(st, "context", None), "cookies", None) or {}
+    token = cookies.get(OWNER_COOKIE)
+    if not is_valid_owner_token(token):
+        token = secrets.token_urlsafe(24)
+        components.html(
+            SET_COOKIE_SCRIPT.replace("__NAME__", OWNER_COOKIE)
+            .replace("__VALUE__", token)
+            .replace("__MAX_AGE__", str(OWNER_COOKIE_MAX_AGE)),
+            height=0,
+        )
+    st.session_state["favorites_owner_token"] = token
+    return token
+
+
+def favorite_clip_ids():
+    """お気に入りのクリップIDの集合（セッションで最初の1回だけDBから読む）"""
+    ids = st.session_state.get("favorite_clip_ids")
+    if ids is not None:
+        return ids
+    token = get_owner_token()
+    ensure_database()
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    try:
+        c = conn.cursor()
+        legacy_keys = [key for key in st.session_state if str(key).startswith(LEGACY_KEY_PREFIX)]
+        legacy_ids = [
+            int(key[len(LEGACY_KEY_PREFIX):]) for key in legacy_keys
+            if st.session_state[key] is True and key[len(LEGACY_KEY_PREFIX):].isdigit()
+        ]
+        if legacy_ids:
+            add_favorites(c, token, legacy_ids)
+            conn.commit()
+        ids = get_favorite_clip_ids(c, token)
+    finally:
+        conn.close()
+    for key in legacy_keys:
+        del st.session_state[key]
+    st.session_state["favorite_clip_ids"] = ids
+    return ids
+
+
+def toggle_favorite(clip_id):
+    """
+    お気に入りを切り替えてDBに保存
+
+    Returns: 切り替え後にお気に入りならTrue
+    """
+    ids = favorite_clip_ids()
+    favorite = clip_id not in ids
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    try:
+        set_favorite(conn.cursor(), get_owner_token(), clip_id, favorite)
+        conn.commit()
+    finally:
+        conn.close()
+    if favorite:
+        ids.add(clip_id)
+    else:
+        ids.discard(clip_id)
+    return favorite
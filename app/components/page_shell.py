@@ -0,0 +1,77 @@
+# ページ共通のCSS/JSを1セッションに1回だけ読み込む: app/components/page_shell.py
+"""
+スタイルとスクリプトは static/ に置き、Streamlitの静的配信（server.enableStaticServing）から読む。
+読み込みは親ドキュメントの <head> に <link>/<script> を追加するだけなので、再実行やページ移動の
+あとも残り続ける。ローダーが追加を終えたことを返してきたら記録し、以降の再実行では何も送らない。
+ページ別のCSSは、移動先のページで shell.js が足りないものを追加する。
+URLには内容のハッシュを付けるので、ブラウザのキャッシュをそのまま使い、更新時だけ取り直させる。
+
+static/
+    css/shell.css        全ページ共通（サイドバー・カード一覧）
+    css/<ページ名>.css    ページ別（body[data-page] で絞り込み済み）
+    js/shell.js          MutationObserver 1つでページ名の設定・ページ別CSSの追加・デフォルトナビの非表示
+    loader/index.html    読み込み用のコンポーネント（追加できたら読み込みのバージョンを返す）
+"""
+
+import hashlib
+import json
+import os
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+STATIC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "static"))
+# 静的配信のURL（ページのURLからの相対パス。baseUrlPath を設定していても動く）
+STATIC_URL = "app/static"
+SHELL_ASSETS = ("css/shell.css", "js/shell.js")
+
+# ローダーは親ドキュメントの <head> にまだないものだけ追加する（コンポーネントのiframeは同一オリジン）
+_loader = components.declare_component("page_shell_loader", path=os.path.join(STATIC_DIR, "loader"))
+
+
+@st.cache_resource(show_spinner=False)
+def asset_url(path):
+    """static/ 配下のファイルのURL（内容のハッシュ付き。プロセスごとに1回だけ計算）"""
+    with open(os.path.join(STATIC_DIR, path), "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:12]
+    return f"{STATIC_URL}/{path}?v={digest}"
+
+
+def _asset_tag(path):
+    name = os.path.splitext(path)[0].replace("/", "-")
+    if path.endswith(".js"):
+        return {"id": f"page-shell-{name}", "tag": "script", "attr": "src", "url": asset_url(path)}
+    return {"id": f"page-shell-{name}", "tag": "link", "attr": "href", "url": asset_url(path)}
+
+
+@st.cache_resource(show_spinner=False)
+def shell_manifest():
+    """ローダーに渡す共通アセットとページ別CSSの一覧（version はその内容のハッシュ）"""
+    assets = [_asset_tag(path) for path in SHELL_ASSETS]
+    pages = {
+        os.path.splitext(name)[0]: _asset_tag(f"css/{name}")
+        for name in sorted(os.listdir(os.path.join(STATIC_DIR, "css")))
+        if name.endswith(".css") and f"css/{name}" not in SHELL_ASSETS
+    }
+    version = hashlib.sha256(json.dumps([assets, pages], sort_keys=True).encode("utf-8")).hexdigest()[:12]
+    return {"version": version, "assets": assets, "pages": pages}
+
+
+def apply_page_shell(page=None):
+    """
+    共通のCSS/JSと、ページ別のCSS（static/css/<page>.css）を読み込む
+
+    page: ページ名（URLパスと同じ。例: "videos"）。指定するとページ別のCSSも読み込む。
+    ローダーが実際に追加を終えて値を返してくるまでは毎回送り、返ってきたら session_state に記録する。
+    記録のあとのページ移動では、ページ別のCSSは shell.js が追加する。
+    ローダーは固定のキーで描画するので、各ページの先頭で1回だけ呼ぶ（サイドバーなどからは呼ばない）。
+    """
+    manifest = shell_manifest()
+    if st.session_state.get("_page_shell_loaded") == manifest["version"]:
+        return
+    loaded = _loader(
+        page=page, assets=manifest["assets"], pages=manifest["pages"], version=manifest["version"],
+        key="_page_shell_loader", default=None,
+    )
+    if loaded == manifest["version"]:
+        st.session_state["_page_shell_loaded"] = loaded
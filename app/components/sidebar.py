@@ -5,92 +5,7 @@ import os
 def show_sidebar():
     """全ページで共通のサイドバーを表示"""
     
-    # デフォルトのマルチページナビゲーションを完全に非表示にするCSS
-    st.markdown("""
-    <style>
-        /* デフォルトのページセレクトボックスを完全に非表示 */
-        section[data-testid="stSidebar"] .stSelectbox {
-            display: none !important;
-        }
-        
-        /* デフォルトのページナビゲーション全体を非表示 */
-        section[data-testid="stSidebar"] div[data-testid="stSelectbox"] {
-            display: none !important;
-        }
-        
-        /* ページセレクタのコンテナも非表示 */
-        section[data-testid="stSidebar"] > div > div:first-child {
-            display: none !important;
-        }
-        
-        /* Streamlitのデフォルトナビゲーションを強制的に非表示 */
-        .css-1d391kg, .css-1y0tads, .e1fqkh3o0 {
-            display: none !important;
-        }
-        
-        /* より具体的なセレクタでStreamlitのページリストを非表示 */
-        section[data-testid="stSidebar"] ul {
-            display: none !important;
-        }
-        
-        /* ページリンクのリストを非表示 */
-        section[data-testid="stSidebar"] nav {
-            display: none !important;
-        }
-        
-        /* サイドバー内の最初の要素（デフォルトナビ）を強制非表示 */
-        section[data-testid="stSidebar"] > div:first-child > div:first-child {
-            display: none !important;
-        }
-        
-        /* サイドバーの上部パディングを調整 */
-        section[data-testid="stSidebar"] > div {
-            padding-top: 1rem;
-        }
-        
-        /* カスタムボタンのスタイリング */
-        .stButton > button {
-            width: 100%;
-            margin-bottom: 0.25rem;
-            text-align: left;
-        }
-        
-        /* アクティブページのスタイル */
-        .active-page {
-            background-color: #e8f4f8 !important;
-            border-left: 4px solid #1f77b4 !important;
-        }
-    </style>
-    
-    <script>
-    // JavaScriptでもデフォルトナビゲーションを動的に削除
-    setTimeout(function() {
-        const sidebar = document.querySelector('[data-testid="stSidebar"]');
-        if (sidebar) {
-            // Streamlitのデフォルトナビゲーション要素を削除
-            const navElements = sidebar.querySelectorAll('ul, nav, .css-1d391kg, .e1fqkh3o0');
-            navElements.forEach(el => el.remove());
-            
-            // ページセレクタも削除
-            const selectBoxes = sidebar.querySelectorAll('[data-testid="stSelectbox"]');
-            selectBoxes.forEach(el => el.remove());
-        }
-    }, 100);
-    
-    // 定期的にチェックしてデフォルトナビを削除
-    setInterval(function() {
-        const sidebar = document.querySelector('[data-testid="stSidebar"]');
-        if (sidebar) {
-            const unwantedElements = sidebar.querySelectorAll('ul:not(.custom-nav), nav:not(.custom-nav)');
-            unwantedElements.forEach(el => {
-                if (!el.classList.contains('custom-nav')) {
-                    el.remove();
-                }
-            });
-        }
-    }, 500);
-    </script>
-    """, unsafe_allow_html=True)
+    # デフォルトのナビゲーションを隠すCSS/JSは、各ページが先頭で apply_page_shell() を呼んで読み込む
     
     with st.sidebar:
         st.title("🎥 VOD Finder")
@@ -197,17 +112,5 @@ def safe_navigation():
     # ナビゲーション処理を最初に実行
     handle_navigation()
     
-    # デフォルトのページナビゲーションを強制的に非表示
-    st.markdown("""
-    <script>
-    // デフォルトのページセレクタを動的に非表示
-    setTimeout(function() {
-        const selectors = document.querySelectorAll('[data-testid="stSelectbox"]');
-        selectors.forEach(selector => {
-            if (selector.closest('[data-testid="stSidebar"]')) {
-                selector.style.display = 'none';
-            }
-        });
-    }, 100);
-    </script>
-    """, unsafe_allow_html=True)
\ No newline at end of file
+    # デフォルトのページセレクタは static/js/shell.js の MutationObserver が隠す
+    # （読み込みは各ページの apply_page_shell() で行う）
\ No newline at end of file
@@ -0,0 +1,83 @@
+# YouTube一括マッチングの管理画面: app/components/youtube_matcher.py
+import sqlite3
+
+import streamlit as st
+
+from app.utils.youtube_matcher import accept_match, list_review_queue, load_export, match_export, reject_match
+
+
+def _run_match(uploaded):
+    """アップロードされたエクスポートをマッチングして登録"""
+    videos = load_export(uploaded.getvalue(), filename=uploaded.name)
+    if not videos:
+        st.warning("⚠️ 動画ID・公開日時を含む行が見つかりませんでした")
+        return
+    conn = sqlite3.connect("vods.db", check_same_thread=False)
+    try:
+        summary = match_export(conn.cursor(), videos)
+        conn.commit()
+    finally:
+        conn.close()
+    st.session_state.youtube_match_summary = summary
+
+
+def _decide(queue_id, accept):
+    conn = sqlite3.connect("vods.db", check_same_thread=False)
+    try:
+        c = conn.cursor()
+        if accept:
+            accept_match(c, queue_id)
+        else:
+            reject_match(c, queue_id)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def show_youtube_matcher(review_limit=30):
+    """エクスポートのアップロードと、確認待ちの候補の確定・却下（管理者用）"""
+    uploaded = st.file_uploader(
+        "YouTubeチャンネルのエクスポート（JSON / CSV）", type=["json", "csv"], key="youtube_export"
+    )
+    if uploaded is not None and st.button("🔗 一括マッチング", key="run_youtube_match"):
+        with st.spinner("マッチング中..."):
+            _run_match(uploaded)
+
+    summary = st.session_state.get("youtube_match_summary")
+    if summary:
+        st.success(
+            f"✅ {summary['linked']}件を登録 / 確認待ち {summary['queued']}件 / "
+            f"候補なし {summary['unmatched']}件 / 登録済み {summary['already_linked']}件"
+        )
+
+    conn = sqlite3.connect("vods.db", check_same_thread=False)
+    try:
+        queue = list_review_queue(conn.cursor(), limit=review_limit)
+    except sqlite3.OperationalError:
+        queue = []
+    finally:
+        conn.close()
+    if not queue:
+        return
+
+    st.markdown(f"**確認待ち（スコアの高い順に{len(queue)}件）**")
+    for item in queue:
+        col1, col2, col3 = st.columns([6, 1, 1])
+        with col1:
+            st.markdown(
+                f"▶️ [{item['title'] or item['video_id']}](https://www.youtube.com/watch?v={item['video_id']}) "
+                f"（{(item['published_at'] or '')[:10]}）"
+            )
+            if item["vod_id"]:
+                st.caption(
+                    f"候補: {item['vod_title']} （{str(item['vod_created_at'] or '')[:10]}） "
+                    f"スコア {item['score']:.2f} = タイトル {item['title_score']:.2f} / 日付 {item['date_score']:.2f}"
+                )
+            else:
+                st.caption("候補のVODなし")
+        with col2:
+            st.button("✅", key=f"accept_match_{item['id']}", help="この候補で登録",
+                      disabled=not item["vod_id"], on_click=_decide, args=(item["id"], True))
+        with col3:
+            st.button("❌", key=f"reject_match_{item['id']}", help="却下",
+                      on_click=_decide, args=(item["id"], False))
@@ -0,0 +1,248 @@
+"""
+eventsub.py - Twitch EventSub（Webhook）の受信サーバーと通知シミュレーター
+stream.offline / channel.update を受け取ると、そのチャンネルの直近VODと配信期間のクリップだけを
+同期するジョブを積み、バックグラウンドのワーカーが順に実行する
+
+使い方:
+    python -m app.eventsub serve --port 8080                 # 受信サーバー（TWITCH_EVENTSUB_SECRET が必要）
+    python -m app.eventsub subscribe --callback https://example.com/eventsub
+    python -m app.eventsub simulate --broadcaster-id 123 --type stream.offline
+    python -m app.eventsub simulate --broadcaster-id 123 --replay      # 同じ通知を2回送る
+    python -m app.eventsub simulate --broadcaster-id 123 --stale       # 古いタイムスタンプ
+    python -m app.eventsub simulate --broadcaster-id 123 --bad-signature
+"""
+
+import argparse
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import urllib.error
+import urllib.request
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.utils.channels import list_channels
+from app.utils.eventsub import SYNC_EVENT_TYPES, build_notification, handle_message
+from app.utils.helix import create_client_from_env
+from app.utils.schema import ensure_sync_schema
+from app.utils.sync_engine import (
+    BUSY_TIMEOUT, DB_PATH, SyncAlreadyRunning, process_sync_queue, summary_json, sync_lock
+)
+from app.utils.watermarks import to_utc_iso, utcnow
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8080
+CALLBACK_PATH = '/eventsub'
+# 1件の通知の上限（Twitchの通知は数KB）
+MAX_BODY_BYTES = 1024 * 1024
+# 通知を受けてから同期を始めるまでの待ち時間（続けて届いた通知を1回の同期にまとめる）
+DEBOUNCE_SECONDS = 5
+# 通知がなくてもキューを確認する間隔（再試行待ちのジョブ用）
+QUEUE_POLL_SECONDS = 60
+# 通常同期の実行中は少し待ってからやり直す
+LOCK_RETRY_SECONDS = 30
+
+
+class EventSubHandler(BaseHTTPRequestHandler):
+    """EventSubの通知を受け取り、検証してsync_queueに積む"""
+
+    def do_GET(self):
+        if self.path == '/healthz':
+            self._respond(200, 'ok')
+        else:
+            self._respond(404, 'not found')
+
+    def do_POST(self):
+        if self.path != self.server.callback_path:
+            self._respond(404, 'not found')
+            return
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BODY_BYTES:
+            self._respond(413, 'too large')
+            return
+        body = self.rfile.read(length)
+
+        conn = sqlite3.connect(self.server.db_path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+        try:
+            status, text, content_type = handle_message(conn.cursor(), self.headers, body, self.server.secret)
+            conn.commit()
+        finally:
+            conn.close()
+
+        self._respond(status, text, content_type)
+        if status == 202:
+            self.server.wake.set()
+
+    def _respond(self, status, text, content_type='text/plain; charset=utf-8'):
+        data = text.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logger.info(f"{self.address_string()} {format % args}")
+
+
+def queue_worker(db_path, stop, wake, client=None):
+    """通知で積まれたジョブを実行するワーカー（通常同期とはロックで排他）"""
+    while not stop.is_set():
+        wake.wait(QUEUE_POLL_SECONDS)
+        if stop.is_set():
+            break
+        wake.clear()
+        stop.wait(DEBOUNCE_SECONDS)
+        try:
+            with sync_lock(db_path):
+                for job in process_sync_queue(db_path, client=client):
+                    logger.info(f"ジョブ #{job['id']} {job['broadcaster_id']}: {job['status']}")
+        except SyncAlreadyRunning:
+            logger.info(f"同期の実行中のため{LOCK_RETRY_SECONDS}秒後に再試行します")
+            stop.wait(LOCK_RETRY_SECONDS)
+            wake.set()
+        except Exception:
+            logger.exception("キューの処理でエラー")
+
+
+def serve(host, port, secret, db_path=DB_PATH, callback_path=CALLBACK_PATH, client=None):
+    """受信サーバーとキューのワーカーを起動（Ctrl+Cで停止）"""
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    try:
+        ensure_sync_schema(conn.cursor())
+        conn.commit()
+    finally:
+        conn.close()
+
+    server = ThreadingHTTPServer((host, port), EventSubHandler)
+    server.db_path = db_path
+    server.secret = secret
+    server.callback_path = callback_path
+    server.wake = threading.Event()
+    stop = threading.Event()
+
+    worker = threading.Thread(target=queue_worker, args=(db_path, stop, server.wake, client), daemon=True)
+    worker.start()
+    # 起動前に積まれたジョブも処理する
+    server.wake.set()
+
+    logger.info(f"EventSub受信サーバーを起動: http://{host}:{server.server_port}{callback_path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.wake.set()
+        server.server_close()
+    return server
+
+
+def subscribe(callback_url, secret, db_path=DB_PATH):
+    """登録済みチャンネルの stream.offline / channel.update を購読"""
+    client, user_id = create_client_from_env()
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    try:
+        c = conn.cursor()
+        ensure_sync_schema(c)
+        channels = list_channels(c)
+    finally:
+        conn.close()
+
+    results = []
+    for channel in channels:
+        for subscription_type in SYNC_EVENT_TYPES:
+            payload = {
+                "type": subscription_type,
+                "version": "2" if subscription_type == 'channel.update' else "1",
+                "condition": {"broadcaster_user_id": channel['broadcaster_id']},
+                "transport": {"method": "webhook", "callback": callback_url, "secret": secret},
+            }
+            try:
+                client.post('eventsub/subscriptions', payload)
+                results.append({"channel": channel['login'], "type": subscription_type, "status": "ok"})
+            except Exception as e:
+                results.append({"channel": channel['login'], "type": subscription_type, "error": str(e)})
+    return results
+
+
+def simulate(url, secret, subscription_type, broadcaster_id, broadcaster_login='', message_type='notification',
+             replay=False, stale=False, bad_signature=False):
+    """
+    Twitchと同じ形式の通知を受信サーバーに送る（オフライン検証用）
+
+    replay は同じメッセージIDで2回送信、stale は15分前のタイムスタンプ、
+    bad_signature は別のシークレットで署名する。
+    Returns: [(HTTPステータス, 本文), ...]
+    """
+    timestamp = to_utc_iso(utcnow() - timedelta(minutes=15)) if stale else None
+    headers, body = build_notification(
+        'wrong-secret' if bad_signature else secret, subscription_type, broadcaster_id,
+        broadcaster_login=broadcaster_login, message_type=message_type, timestamp=timestamp
+    )
+
+    responses = []
+    for _ in range(2 if replay else 1):
+        request = urllib.request.Request(url, data=body, headers=headers, method='POST')
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                responses.append((response.status, response.read().decode('utf-8')))
+        except urllib.error.HTTPError as e:
+            responses.append((e.code, e.read().decode('utf-8')))
+    return responses
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Twitch EventSub 受信サーバー")
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--secret', default=os.getenv('TWITCH_EVENTSUB_SECRET'),
+                        help="署名検証のシークレット（既定は TWITCH_EVENTSUB_SECRET）")
+    parser.add_argument('-v', '--verbose', action='store_true')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = sub.add_parser('serve', help="通知を受信して対象を絞った同期を実行")
+    serve_parser.add_argument('--host', default='0.0.0.0')
+    serve_parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument('--path', default=CALLBACK_PATH)
+
+    subscribe_parser = sub.add_parser('subscribe', help="登録済みチャンネルの通知を購読")
+    subscribe_parser.add_argument('--callback', required=True, help="公開URL（https）")
+
+    simulate_parser = sub.add_parser('simulate', help="署名付きの通知をローカルの受信サーバーに送る")
+    simulate_parser.add_argument('--url', default=f"http://127.0.0.1:{DEFAULT_PORT}{CALLBACK_PATH}")
+    simulate_parser.add_argument('--type', default='stream.offline', choices=SYNC_EVENT_TYPES)
+    simulate_parser.add_argument('--broadcaster-id', required=True)
+    simulate_parser.add_argument('--login', default='')
+    simulate_parser.add_argument('--verification', action='store_true', help="購読確認（challenge）を送る")
+    simulate_parser.add_argument('--replay', action='store_true')
+    simulate_parser.add_argument('--stale', action='store_true')
+    simulate_parser.add_argument('--bad-signature', action='store_true')
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO if args.verbose or args.command == 'serve' else logging.WARNING,
+        stream=sys.stderr,
+        format='%(asctime)s %(levelname)s %(name)s: %(message)s'
+    )
+    if not args.secret:
+        parser.error("--secret または TWITCH_EVENTSUB_SECRET を指定してください")
+
+    if args.command == 'serve':
+        serve(args.host, args.port, args.secret, db_path=args.db, callback_path=args.path)
+    elif args.command == 'subscribe':
+        print(summary_json(subscribe(args.callback, args.secret, db_path=args.db)))
+    elif args.command == 'simulate':
+        responses = simulate(
+            args.url, args.secret, args.type, args.broadcaster_id, broadcaster_login=args.login,
+            message_type='webhook_callback_verification' if args.verification else 'notification',
+            replay=args.replay, stale=args.stale, bad_signature=args.bad_signature
+        )
+        print(summary_json([{"status": status, "body": body} for status, body in responses]))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
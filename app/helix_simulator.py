@@ -0,0 +1,558 @@
+"""
+helix_simulator.py - オフラインで動くTwitch Helix APIの代用サーバー
+認証情報やネットワークなしで同期エンジンの動作確認・性能測定を行うためのもの。
+/oauth2/token, /helix/users, /helix/videos, /helix/clips, /helix/games を、
+カーソル・レート制限ヘッダー・エラー注入付きで決定的なデータから返す
+
+使い方:
+    python -m app.helix_simulator serve --port 8090 --channels 2 --videos 300 --clips 20000
+    python -m app.helix_simulator serve --error-rate 0.05 --rate-limit 120
+    python -m app.helix_simulator serve --record fixtures.jsonl --upstream https://api.twitch.tv/helix
+    python -m app.helix_simulator serve --replay fixtures.jsonl
+    python -m app.helix_simulator bench --channels 2 --clips 20000    # バックフィル＋差分同期を計測
+
+同期側は次の環境変数でシミュレーターに向ける:
+    TWITCH_API_BASE_URL=http://127.0.0.1:8090/helix
+    TWITCH_AUTH_URL=http://127.0.0.1:8090/oauth2/token
+"""
+
+import argparse
+import base64
+import bisect
+import json
+import logging
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from app.utils.watermarks import parse_utc, to_utc_iso
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8090
+# /clips は1つの期間で辿れる件数に上限がある（本物のHelixと同じく約1000件で打ち切る）
+CLIPS_WINDOW_LIMIT = 1000
+# 固定の基準時刻（同じシードなら毎回同じカタログになる）
+CATALOG_EPOCH = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+
+def _encode_cursor(offset):
+    return base64.urlsafe_b64encode(json.dumps({"o": offset}).encode()).decode()
+
+
+def _decode_cursor(cursor):
+    try:
+        return int(json.loads(base64.urlsafe_b64decode(cursor.encode()))["o"])
+    except Exception:
+        return None
+
+
+class HelixCatalog:
+    """
+    シミュレーターが返すチャンネル・VOD・クリップ・ゲームの決定的なカタログ
+
+    同じ引数（seed）からは常に同じデータを生成する。クリップの9割はVODの配信中に作られ、
+    video_id と vod_offset を持つ。
+    """
+
+    VIDEO_TYPES = (('archive', 0.8), ('highlight', 0.15), ('upload', 0.05))
+
+    def __init__(self, channels=1, videos_per_channel=200, clips_per_channel=5000, games=40, seed=1,
+                 now=CATALOG_EPOCH):
+        rng = random.Random(seed)
+        self.now = now
+        self.games = {
+            str(1000 + i): {"id": str(1000 + i), "name": f"Sim Game {i}",
+                            "box_art_url": f"https://example.invalid/box/{1000 + i}-{{width}}x{{height}}.jpg"}
+            for i in range(games)
+        }
+        game_ids = list(self.games)
+
+        self.users = {}
+        self.videos = {}     # broadcaster_id -> 新しい順のVOD
+        self.clips = {}      # broadcaster_id -> 古い順のクリップ
+        self.clip_times = {}
+        for c in range(channels):
+            broadcaster_id = str(50000 + c)
+            login = f"sim_channel{c}"
+            videos = []
+            start = now - timedelta(hours=rng.randint(2, 30))
+            for v in range(videos_per_channel):
+                duration = rng.randint(1800, 6 * 3600)
+                video_type = rng.choices([t for t, _ in self.VIDEO_TYPES],
+                                         [w for _, w in self.VIDEO_TYPES])[0]
+                video_id = str(2000000000 + c * 1000000 + v)
+                videos.append({
+                    "id": video_id, "stream_id": None, "user_id": broadcaster_id, "user_login": login,
+                    "user_name": login, "title": f"{login} stream #{videos_per_channel - v}",
+                    "description": "", "created_at": to_utc_iso(start), "published_at": to_utc_iso(start),
+                    "url": f"https://www.twitch.tv/videos/{video_id}",
+                    "thumbnail_url": f"https://example.invalid/vod/{video_id}-%{{width}}x%{{height}}.jpg",
+                    "viewable": "public", "view_count": rng.randint(10, 50000), "language": "ja",
+                    "type": video_type, "game_id": rng.choice(game_ids),
+                    "duration": f"{duration // 3600}h{duration % 3600 // 60}m{duration % 60}s",
+                    "_seconds": duration,
+                })
+                start -= timedelta(hours=rng.randint(12, 60))
+            created_at = start - timedelta(days=30)
+            self.users[broadcaster_id] = {
+                "id": broadcaster_id, "login": login, "display_name": f"Sim Channel {c}", "type": "",
+                "broadcaster_type": "affiliate", "description": "", "profile_image_url": "",
+                "offline_image_url": "", "view_count": 0, "created_at": to_utc_iso(created_at),
+            }
+            self.videos[broadcaster_id] = videos
+
+            archives = [v for v in videos if v["type"] == 'archive'] or videos
+            clips = []
+            for k in range(clips_per_channel):
+                if rng.random() < 0.9:
+                    video = rng.choice(archives)
+                    offset = rng.randint(0, video["_seconds"] - 30)
+                    created = parse_utc(video["created_at"]) + timedelta(seconds=offset)
+                    video_id, game_id = video["id"], video["game_id"]
+                else:
+                    offset = None
+                    created = created_at + timedelta(seconds=rng.randint(0, int((now - created_at).total_seconds())))
+                    video_id, game_id = "", rng.choice(game_ids)
+                clip_id = f"SimClip{c}x{k}"
+                clips.append({
+                    "id": clip_id, "url": f"https://clips.twitch.tv/{clip_id}",
+                    "embed_url": f"https://clips.twitch.tv/embed?clip={clip_id}",
+                    "broadcaster_id": broadcaster_id, "broadcaster_name": login,
+                    "creator_id": str(rng.randint(1, 10 ** 8)), "creator_name": f"viewer{rng.randint(1, 5000)}",
+                    "video_id": video_id, "game_id": game_id, "language": "ja",
+                    "title": f"clip {k}", "view_count": rng.randint(1, 20000),
+                    "created_at": to_utc_iso(created),
+                    "thumbnail_url": f"https://example.invalid/clip/{clip_id}-480x272.jpg",
+                    "duration": round(rng.uniform(5, 60), 1), "vod_offset": offset, "is_featured": False,
+                })
+            clips.sort(key=lambda clip: (clip["created_at"], clip["id"]))
+            self.clips[broadcaster_id] = clips
+            self.clip_times[broadcaster_id] = [clip["created_at"] for clip in clips]
+
+    def summary(self):
+        """カタログの件数（同期結果の検証用）"""
+        return {
+            "channels": len(self.users),
+            "videos": sum(len(v) for v in self.videos.values()),
+            "clips": sum(len(c) for c in self.clips.values()),
+            "clips_with_vod": sum(1 for c in self.clips.values() for clip in c if clip["video_id"]),
+            "games": len(self.games),
+        }
+
+    @staticmethod
+    def _public(item):
+        return {k: v for k, v in item.items() if not k.startswith('_')}
+
+    @staticmethod
+    def _page(items, params, limit=None):
+        first = min(int(params.get('first', [20])[0]), 100)
+        offset = _decode_cursor(params['after'][0]) if params.get('after') else 0
+        if offset is None:
+            return None
+        end = offset + first
+        if limit is not None:
+            end = min(end, limit)
+        page = items[offset:end]
+        more = end < (len(items) if limit is None else min(len(items), limit))
+        return page, ({"cursor": _encode_cursor(end)} if more and page else {})
+
+    def users_response(self, params):
+        ids = params.get('id', [])
+        logins = [login.lower() for login in params.get('login', [])]
+        data = [u for u in self.users.values() if u["id"] in ids or u["login"] in logins]
+        return 200, {"data": data}
+
+    def videos_response(self, params):
+        if params.get('id'):
+            ids = set(params['id'])
+            data = [self._public(v) for videos in self.videos.values() for v in videos if v["id"] in ids]
+            return 200, {"data": data, "pagination": {}}
+        user_id = (params.get('user_id') or [''])[0]
+        if user_id not in self.videos:
+            return 200, {"data": [], "pagination": {}}
+        video_type = (params.get('type') or ['all'])[0]
+        videos = [v for v in self.videos[user_id] if video_type == 'all' or v["type"] == video_type]
+        page = self._page(videos, params)
+        if page is None:
+            return 400, {"error": "Bad Request", "status": 400, "message": "invalid cursor"}
+        return 200, {"data": [self._public(v) for v in page[0]], "pagination": page[1]}
+
+    def clips_response(self, params):
+        if params.get('id'):
+            ids = set(params['id'])
+            return 200, {"data": [c for clips in self.clips.values() for c in clips if c["id"] in ids],
+                         "pagination": {}}
+        broadcaster_id = (params.get('broadcaster_id') or [''])[0]
+        clips = self.clips.get(broadcaster_id, [])
+        times = self.clip_times.get(broadcaster_id, [])
+        lo, hi = 0, len(clips)
+        if params.get('started_at'):
+            lo = bisect.bisect_left(times, to_utc_iso(parse_utc(params['started_at'][0])))
+        if params.get('ended_at'):
+            hi = bisect.bisect_left(times, to_utc_iso(parse_utc(params['ended_at'][0])))
+        page = self._page(clips[lo:max(lo, hi)], params, limit=CLIPS_WINDOW_LIMIT)
+        if page is None:
+            return 400, {"error": "Bad Request", "status": 400, "message": "invalid cursor"}
+        return 200, {"data": page[0], "pagination": page[1]}
+
+    def games_response(self, params):
+        ids = params.get('id', [])[:100]
+        return 200, {"data": [self.games[g] for g in ids if g in self.games]}
+
+
+class FixtureStore:
+    """record / replay 用のレスポンス保存（1行1レスポンスのJSONL）"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.responses = {}
+        self.served = {}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.responses.setdefault(self.key(entry["path"], entry["query"]), []).append(entry)
+
+    @staticmethod
+    def key(path, query):
+        return f"{path}?{urlencode(sorted(tuple(pair) for pair in query))}"
+
+    def append(self, path, query, status, headers, body):
+        entry = {"path": path, "query": sorted(query), "status": status, "headers": headers,
+                 "body": body.decode('utf-8')}
+        with self.lock, open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def lookup(self, path, query):
+        """同じリクエストが複数記録されていれば記録順に返す（最後の1件は繰り返す）"""
+        key = self.key(path, query)
+        with self.lock:
+            entries = self.responses.get(key)
+            if not entries:
+                return None
+            index = self.served.get(key, 0)
+            self.served[key] = index + 1
+            return entries[min(index, len(entries) - 1)]
+
+
+class SimulatorHandler(BaseHTTPRequestHandler):
+    """HTTPリクエストをHelixSimulatorに振り分ける"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.server.simulator.handle(self, 'GET')
+
+    def do_POST(self):
+        self.server.simulator.handle(self, 'POST')
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+
+class HelixSimulator:
+    """
+    Helixの代用サーバーの状態（カタログ・レート制限・エラー注入・統計）
+
+    rate_limit はトークンごとの1分あたりのポイント数。error_rate の割合で
+    error_codes のいずれかを返す（429の場合はRatelimit-Resetも付ける）。
+    """
+
+    def __init__(self, catalog=None, rate_limit=800, error_rate=0.0, error_codes=(429, 500, 503),
+                 latency=0.0, seed=1, record=None, upstream=None, replay=None):
+        self.catalog = catalog
+        self.rate_limit = rate_limit
+        self.error_rate = error_rate
+        self.error_codes = tuple(error_codes)
+        self.latency = latency
+        self.rng = random.Random(seed)
+        self.record = FixtureStore(record) if record else None
+        self.upstream = upstream.rstrip('/') if upstream else None
+        self.replay = FixtureStore(replay) if replay else None
+        self.lock = threading.Lock()
+        self.buckets = {}
+        self.stats = {"requests": 0, "bytes": 0, "by_endpoint": {}, "injected_errors": 0, "rate_limited": 0}
+        self.server = None
+
+    # ---------------------------------------------------------------- 共通
+    def _send(self, handler, status, body, headers=None):
+        data = body if isinstance(body, bytes) else json.dumps(body, ensure_ascii=False).encode('utf-8')
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            handler.send_header(name, str(value))
+        handler.end_headers()
+        handler.wfile.write(data)
+        with self.lock:
+            self.stats["bytes"] += len(data)
+
+    def _take_point(self, token):
+        """レート制限のバケットから1ポイント消費し、(許可, 残り, リセット時刻) を返す"""
+        now = time.time()
+        with self.lock:
+            tokens, updated = self.buckets.get(token, (float(self.rate_limit), now))
+            tokens = min(float(self.rate_limit), tokens + (now - updated) * self.rate_limit / 60.0)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self.buckets[token] = (tokens, now)
+            reset = int(now + (self.rate_limit - tokens) * 60.0 / self.rate_limit) + 1
+            return allowed, int(tokens), reset
+
+    def handle(self, handler, method):
+        url = urlsplit(handler.path)
+        path = url.path.rstrip('/')
+        query = parse_qsl(url.query, keep_blank_values=True)
+        length = int(handler.headers.get('Content-Length') or 0)
+        if length:
+            handler.rfile.read(length)
+
+        with self.lock:
+            self.stats["requests"] += 1
+            endpoint = path.rsplit('/', 1)[-1]
+            self.stats["by_endpoint"][endpoint] = self.stats["by_endpoint"].get(endpoint, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        if path == '/_sim/stats':
+            self._send(handler, 200, dict(self.stats, catalog=self.catalog.summary() if self.catalog else None))
+            return
+        if path == '/oauth2/token' and method == 'POST':
+            self._send(handler, 200, {"access_token": "sim-app-token", "expires_in": 5000000,
+                                      "token_type": "bearer"})
+            return
+        if not path.startswith('/helix/'):
+            self._send(handler, 404, {"error": "Not Found", "status": 404, "message": path})
+            return
+
+        token = handler.headers.get('Authorization', '')
+        if not token.startswith('Bearer ') or not handler.headers.get('Client-Id'):
+            self._send(handler, 401, {"error": "Unauthorized", "status": 401, "message": "OAuth token is missing"})
+            return
+
+        allowed, remaining, reset = self._take_point(token)
+        rate_headers = {'Ratelimit-Limit': self.rate_limit, 'Ratelimit-Remaining': remaining,
+                        'Ratelimit-Reset': reset}
+        if not allowed:
+            with self.lock:
+                self.stats["rate_limited"] += 1
+            self._send(handler, 429, {"error": "Too Many Requests", "status": 429, "message": ""}, rate_headers)
+            return
+
+        if self.error_rate and self.rng.random() < self.error_rate:
+            code = self.rng.choice(self.error_codes)
+            with self.lock:
+                self.stats["injected_errors"] += 1
+            if code == 429:
+                rate_headers.update({'Ratelimit-Remaining': 0, 'Ratelimit-Reset': int(time.time()) + 1})
+            self._send(handler, code, {"error": "Injected", "status": code, "message": "simulated error"},
+                       rate_headers)
+            return
+
+        if self.replay:
+            entry = self.replay.lookup(path, query)
+            if entry is None:
+                self._send(handler, 404, {"error": "Not Found", "status": 404,
+                                          "message": f"fixture not found: {FixtureStore.key(path, query)}"})
+                return
+            self._send(handler, entry["status"], entry["body"].encode('utf-8'),
+                       dict(rate_headers, **entry.get("headers", {})))
+            return
+
+        if self.upstream:
+            self._proxy(handler, method, path, query, rate_headers)
+            return
+
+        status, body = self._route(method, path, query)
+        self._send(handler, status, body, rate_headers)
+
+    def _route(self, method, path, query):
+        params = {}
+        for key, value in query:
+            params.setdefault(key, []).append(value)
+        endpoint = path[len('/helix/'):]
+        if method == 'POST' and endpoint == 'eventsub/subscriptions':
+            return 202, {"data": [{"id": "sim-subscription", "status": "webhook_callback_verification_pending"}],
+                         "total": 1, "max_total_cost": 10000, "total_cost": 1}
+        routes = {
+            'users': self.catalog.users_response,
+            'videos': self.catalog.videos_response,
+            'clips': self.catalog.clips_response,
+            'games': self.catalog.games_response,
+        }
+        if method != 'GET' or endpoint not in routes:
+            return 404, {"error": "Not Found", "status": 404, "message": endpoint}
+        return routes[endpoint](params)
+
+    def _proxy(self, handler, method, path, query, rate_headers):
+        """本物のHelixに転送し、レスポンスをフィクスチャとして記録する"""
+        url = f"{self.upstream}/{path[len('/helix/'):]}"
+        if query:
+            url += f"?{urlencode(query)}"
+        request = urllib.request.Request(url, method=method, headers={
+            'Client-Id': handler.headers.get('Client-Id'),
+            'Authorization': handler.headers.get('Authorization'),
+        })
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                status, body, headers = response.status, response.read(), response.headers
+        except urllib.error.HTTPError as e:
+            status, body, headers = e.code, e.read(), e.headers
+        upstream_rate = {k: headers[k] for k in ('Ratelimit-Limit', 'Ratelimit-Remaining', 'Ratelimit-Reset')
+                         if headers.get(k)}
+        if self.record:
+            self.record.append(path, query, status, upstream_rate, body)
+        self._send(handler, status, body, dict(rate_headers, **upstream_rate))
+
+    # ---------------------------------------------------------------- 起動
+    def start(self, host='127.0.0.1', port=0):
+        """別スレッドで起動して (base_url, auth_url) を返す（port=0なら空きポート）"""
+        self.server = ThreadingHTTPServer((host, port), SimulatorHandler)
+        self.server.daemon_threads = True
+        self.server.simulator = self
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        root = f"http://{host}:{self.server.server_port}"
+        return f"{root}/helix", f"{root}/oauth2/token"
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+
+
+def bench(catalog, simulator, workdir=None):
+    """
+    シミュレーターに対してバックフィル → 差分同期を実行し、所要時間と正しさを返す
+
+    正しさはカタログとDBの件数（VOD・クリップ・VODへの紐づけ）の一致で確認する。
+    """
+    from app.utils.backfill import run_backfill
+    from app.utils.helix import HelixClient, RateBudget
+    from app.utils.sync_engine import run_sync
+
+    base_url, _ = simulator.start()
+    db_path = os.path.join(workdir or tempfile.mkdtemp(), 'bench.db')
+    expected = catalog.summary()
+    channel_ids = list(catalog.users)
+    budget = RateBudget(simulator.rate_limit)
+
+    def client():
+        return HelixClient('sim-client', 'sim-app-token', base_url=base_url, rate_budget=budget)
+
+    report = {"catalog": expected, "db_path": db_path}
+    try:
+        # チャンネルを登録（1件目は既定チャンネルとして、残りは register_channel で）
+        from app.utils.channels import register_channel
+        from app.utils.schema import ensure_sync_schema
+        conn = sqlite3.connect(db_path)
+        ensure_sync_schema(conn.cursor())
+        for broadcaster_id in channel_ids:
+            register_channel(conn.cursor(), client(), broadcaster_id=broadcaster_id)
+        conn.commit()
+        conn.close()
+
+        started = time.monotonic()
+        requests_before = simulator.stats["requests"]
+        backfill = run_backfill(db_path=db_path, client=client(), user_id=channel_ids[0])
+        report["backfill"] = {
+            "seconds": round(time.monotonic() - started, 3),
+            "requests": simulator.stats["requests"] - requests_before,
+            "linked": backfill["linked"],
+        }
+
+        started = time.monotonic()
+        requests_before = simulator.stats["requests"]
+        summary = run_sync(db_path=db_path, client=client(), user_id=channel_ids[0])
+        report["incremental"] = {
+            "seconds": round(time.monotonic() - started, 3),
+            "requests": simulator.stats["requests"] - requests_before,
+            "result": summary["result"],
+        }
+
+        conn = sqlite3.connect(db_path)
+        actual = {
+            "videos": conn.execute("SELECT COUNT(*) FROM vods").fetchone()[0],
+            "clips": conn.execute("SELECT COUNT(*) FROM clips").fetchone()[0],
+            "clips_with_vod": conn.execute("SELECT COUNT(*) FROM clips WHERE vod_id IS NOT NULL").fetchone()[0],
+        }
+        conn.close()
+        report["db"] = actual
+        report["correct"] = all(actual[k] == expected[k] for k in actual)
+        seconds = report["backfill"]["seconds"] or 1e-9
+        report["backfill"]["rows_per_second"] = round((actual["videos"] + actual["clips"]) / seconds, 1)
+        report["simulator"] = {k: simulator.stats[k] for k in ("requests", "bytes", "injected_errors",
+                                                               "rate_limited")}
+    finally:
+        simulator.stop()
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Twitch Helix API のオフライン代用サーバー")
+    parser.add_argument('-v', '--verbose', action='store_true')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    for name, help_text in (('serve', "シミュレーターを起動"), ('bench', "同期エンジンを計測")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument('--channels', type=int, default=1)
+        p.add_argument('--videos', type=int, default=200, help="チャンネルあたりのVOD数")
+        p.add_argument('--clips', type=int, default=5000, help="チャンネルあたりのクリップ数")
+        p.add_argument('--games', type=int, default=40)
+        p.add_argument('--seed', type=int, default=1)
+        p.add_argument('--rate-limit', type=int, default=800, help="1分あたりのポイント数")
+        p.add_argument('--error-rate', type=float, default=0.0, help="エラーを注入する割合 (0～1)")
+        p.add_argument('--error-codes', default='429,500,503')
+        p.add_argument('--latency', type=float, default=0.0, help="レスポンスの遅延（秒）")
+        if name == 'serve':
+            p.add_argument('--host', default='127.0.0.1')
+            p.add_argument('--port', type=int, default=DEFAULT_PORT)
+            p.add_argument('--record', help="レスポンスを記録するJSONLファイル（--upstream と併用）")
+            p.add_argument('--upstream', help="記録時の転送先 (例: https://api.twitch.tv/helix)")
+            p.add_argument('--replay', help="記録したJSONLファイルから応答する")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING, stream=sys.stderr,
+                        format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    if getattr(args, 'record', None) and not args.upstream:
+        parser.error("--record には --upstream を指定してください")
+
+    catalog = HelixCatalog(args.channels, args.videos, args.clips, args.games, seed=args.seed)
+    simulator = HelixSimulator(
+        catalog, rate_limit=args.rate_limit, error_rate=args.error_rate,
+        error_codes=[int(code) for code in args.error_codes.split(',') if code],
+        latency=args.latency, seed=args.seed,
+        record=getattr(args, 'record', None), upstream=getattr(args, 'upstream', None),
+        replay=getattr(args, 'replay', None)
+    )
+
+    if args.command == 'bench':
+        print(json.dumps(bench(catalog, simulator), ensure_ascii=False, indent=2))
+        return 0
+
+    base_url, token_url = simulator.start(args.host, args.port)
+    print(json.dumps({"TWITCH_API_BASE_URL": base_url, "TWITCH_AUTH_URL": token_url,
+                      "catalog": catalog.summary()}, ensure_ascii=False), flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""
+sync.py - 同期のCLI / スケジューラ
+Streamlitを起動せずにTwitchとの同期を実行し、結果をJSONで出力する
+
+使い方:
+    python -m app.sync once                                  # 前回からの差分を1回同期
+    python -m app.sync once --start 2024-01-01 --end 2024-01-31
+    python -m app.sync daemon --interval 900                 # 15分ごとに同期し続ける
+    python -m app.sync backfill --streams clips              # 全履歴のバックフィル
+    python -m app.sync status                                # 同期状態を表示
+    python -m app.sync cancel                                # 実行中の同期にキャンセルを要求
+    python -m app.sync queue                                 # EventSub通知で積まれた同期を実行
+    python -m app.sync channels add some_login               # 同期対象のチャンネルを追加
+    python -m app.sync channels list
+    python -m app.sync channels disable some_login           # 同期対象から外す（データは残す）
+"""
+
+import argparse
+import logging
+import random
+import signal
+import sqlite3
+import sys
+import threading
+from datetime import date
+
+from app.utils import backfill
+from app.utils.channels import get_channel, list_channels, register_channel, set_channel_enabled
+from app.utils.helix import create_client_from_env
+from app.utils.progress import SyncProgress, get_latest_run, request_cancel
+from app.utils.schema import ensure_sync_schema
+from app.utils.sync_engine import (
+    DB_PATH, SyncAlreadyRunning, sync_lock, run_sync, get_sync_status, summary_json, process_sync_queue
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 15 * 60
+
+
+def run_once(date_range=None, db_path=DB_PATH):
+    """ロックを取って1回同期し、サマリーを返す（例外はサマリーに含める）"""
+    try:
+        with sync_lock(db_path):
+            progress = SyncProgress(db_path, kind='range' if date_range else 'sync')
+            try:
+                summary = run_sync(date_range=date_range, db_path=db_path, progress=progress)
+            except Exception as e:
+                progress.finish('failed', message=str(e))
+                raise
+            details = summary['details']
+            progress.finish(
+                'cancelled' if details.get('cancelled') else 'completed',
+                message=summary['result']
+            )
+            summary['run_id'] = progress.run_id
+            return summary
+    except SyncAlreadyRunning as e:
+        return {"success": False, "skipped": True, "error": str(e)}
+    except Exception as e:
+        logger.exception("同期エラー")
+        return {"success": False, "error": f"同期エラー: {str(e)}"}
+
+
+def run_queue(db_path=DB_PATH):
+    """ロックを取ってsync_queueのジョブ（チャンネルの直近VODの同期）を実行"""
+    try:
+        with sync_lock(db_path):
+            jobs = process_sync_queue(db_path)
+        return {"success": True, "jobs": [{k: job[k] for k in ('id', 'broadcaster_id', 'reason', 'status')}
+                                          for job in jobs]}
+    except SyncAlreadyRunning as e:
+        return {"success": False, "skipped": True, "error": str(e)}
+    except Exception as e:
+        logger.exception("キュー処理エラー")
+        return {"success": False, "error": f"キュー処理エラー: {str(e)}"}
+
+
+def run_daemon(interval, db_path=DB_PATH, max_runs=None):
+    """interval秒ごとに同期を実行（SIGINT/SIGTERMで現在の同期を終えてから停止）"""
+    stop = threading.Event()
+
+    def handle_signal(signum, frame):
+        logger.info("停止シグナルを受信しました。現在の同期が終わり次第終了します")
+        stop.set()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+
+    runs = 0
+    while not stop.is_set():
+        print(summary_json(run_once(db_path=db_path)), flush=True)
+        # 受信サーバーが処理しきれなかった通知のジョブも拾う
+        queue_result = run_queue(db_path=db_path)
+        if queue_result.get("jobs"):
+            print(summary_json(queue_result), flush=True)
+        runs += 1
+        if max_runs and runs >= max_runs:
+            break
+        # 複数プロセスが同時刻に集中しないよう少しずらす
+        stop.wait(interval + random.uniform(0, min(30, interval * 0.1)))
+
+
+def manage_channels(action, login=None, db_path=DB_PATH):
+    """channelsテーブルの一覧・追加・有効/無効の切り替え"""
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    try:
+        c = conn.cursor()
+        ensure_sync_schema(c)
+        if action == 'add':
+            client, _ = create_client_from_env()
+            channel = register_channel(c, client, login=login)
+            set_channel_enabled(c, channel['broadcaster_id'], True)
+        elif action in ('enable', 'disable'):
+            channel = get_channel(c, login=login)
+            if not channel:
+                raise ValueError(f"チャンネル '{login}' は登録されていません")
+            set_channel_enabled(c, channel['broadcaster_id'], action == 'enable')
+        conn.commit()
+        return list_channels(c, enabled_only=False)
+    finally:
+        conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Twitch同期（ヘッドレス実行）")
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('-v', '--verbose', action='store_true')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    once = sub.add_parser('once', help="1回だけ同期")
+    once.add_argument('--start', type=date.fromisoformat, help="日付指定同期の開始日 (YYYY-MM-DD)")
+    once.add_argument('--end', type=date.fromisoformat, help="日付指定同期の終了日 (YYYY-MM-DD)")
+
+    daemon = sub.add_parser('daemon', help="一定間隔で同期し続ける")
+    daemon.add_argument('--interval', type=int, default=DEFAULT_INTERVAL, help="同期間隔（秒）")
+    daemon.add_argument('--max-runs', type=int, help="指定回数で終了（動作確認用）")
+
+    sub.add_parser('backfill', help="全履歴のバックフィル（同期のロックを取る。残りの引数はbackfillに渡す）", add_help=False)
+    sub.add_parser('status', help="同期状態を表示")
+    sub.add_parser('cancel', help="実行中の同期にキャンセルを要求")
+    sub.add_parser('queue', help="EventSub通知で積まれた同期を実行")
+
+    channels = sub.add_parser('channels', help="同期対象のチャンネルを管理")
+    channels.add_argument('action', choices=['list', 'add', 'enable', 'disable'])
+    channels.add_argument('login', nargs='?', help="チャンネルのログイン名")
+
+    args, rest = parser.parse_known_args(argv)
+
+    # ログはstderr、サマリーJSONはstdoutに出す
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        stream=sys.stderr,
+        format='%(asctime)s %(levelname)s %(name)s: %(message)s'
+    )
+
+    if args.command == 'backfill':
+        return backfill.main(rest + ['--db', args.db])
+    if rest:
+        parser.error(f"不明な引数: {' '.join(rest)}")
+
+    if args.command == 'status':
+        print(summary_json(dict(get_sync_status(args.db), latest_run=get_latest_run(args.db))))
+    elif args.command == 'once':
+        date_range = None
+        if args.start or args.end:
+            if not (args.start and args.end) or args.start > args.end:
+                parser.error("--start と --end は両方指定し、開始日 <= 終了日 にしてください")
+            date_range = {'start_date': args.start, 'end_date': args.end}
+        summary = run_once(date_range=date_range, db_path=args.db)
+        print(summary_json(summary))
+        if not summary.get("success") and not summary.get("skipped"):
+            return 1
+    elif args.command == 'cancel':
+        run = get_latest_run(args.db)
+        requested = bool(run and run['status'] == 'running' and request_cancel(args.db, run['id']))
+        print(summary_json({"cancel_requested": requested, "run_id": run['id'] if run else None}))
+    elif args.command == 'queue':
+        summary = run_queue(db_path=args.db)
+        print(summary_json(summary))
+        if not summary.get("success") and not summary.get("skipped"):
+            return 1
+    elif args.command == 'channels':
+        if args.action != 'list' and not args.login:
+            parser.error(f"channels {args.action} にはログイン名を指定してください")
+        try:
+            print(summary_json(manage_channels(args.action, args.login, db_path=args.db)))
+        except ValueError as e:
+            print(summary_json({"error": str(e)}))
+            return 1
+    elif args.command == 'daemon':
+        run_daemon(args.interval, db_path=args.db, max_runs=args.max_runs)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,524 +1,573 @@
-# twitch_api.py (修正版)
-
-import requests
-from datetime import datetime, timedelta
-import sqlite3
-import os
-import re
-
-BASE_URL = "https://api.twitch.tv/helix"
-
-def get_access_token():
-    """Twitchアクセストークンを取得"""
-    url = "https://id.twitch.tv/oauth2/token"
-    params = {
-        "client_id": os.getenv("TWITCH_CLIENT_ID"),
-        "client_secret": os.getenv("TWITCH_CLIENT_SECRET"),
-        "grant_type": "client_credentials"
-    }
-    response = requests.post(url, params=params)
-    return response.json()["access_token"]
-
-def get_user_id(headers):
-    """Twitchユーザーの内部IDを取得"""
-    url = f"{BASE_URL}/users"
-    params = {"login": os.getenv("TWITCH_USER_LOGIN")}
-    response = requests.get(url, headers=headers, params=params)
-    return response.json()["data"][0]["id"]
-
-def ensure_tables_exist():
-    """必要なテーブルが存在することを確認"""
-    conn = sqlite3.connect("vods.db", check_same_thread=False)
-    c = conn.cursor()
-    
-    # vodsテーブル
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS vods (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            twitch_id TEXT UNIQUE,
-            title TEXT NOT NULL,
-            category TEXT,
-            url TEXT,
-            created_at TIMESTAMP,
-            type TEXT DEFAULT 'archive'
-        )
-    """)
-    
-    # clipsテーブル
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS clips (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            twitch_id TEXT UNIQUE,
-            title TEXT NOT NULL,
-            category TEXT,
-            url TEXT,
-            created_at TIMESTAMP,
-            vod_twitch_id TEXT,
-            vod_id INTEGER,
-            thumbnail_url TEXT,
-            FOREIGN KEY (vod_id) REFERENCES vods (id)
-        )
-    """)
-    
-    # youtube_linksテーブル
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS youtube_links (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            vod_id INTEGER,
-            url TEXT NOT NULL,
-            title TEXT,
-            video_id TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (vod_id) REFERENCES vods (id)
-        )
-    """)
-    
-    # sync_logテーブル
-    c.execute("""
-        CREATE TABLE IF NOT EXISTS sync_log (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            sync_type TEXT NOT NULL,
-            last_sync_time TEXT NOT NULL,
-            created_at TEXT DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    
-    conn.commit()
-    conn.close()
-
-def get_last_sync_time():
-    """最後の同期時刻を取得"""
-    try:
-        conn = sqlite3.connect("vods.db", check_same_thread=False)
-        c = conn.cursor()
-        
-        # 最後の同期時刻を取得
-        c.execute("SELECT last_sync_time FROM sync_log WHERE sync_type = 'clips' ORDER BY created_at DESC LIMIT 1")
-        result = c.fetchone()
-        
-        conn.close()
-        
-        if result:
-            return datetime.fromisoformat(result[0])
-        else:
-            # 初回実行の場合は30日前から開始
-            return datetime.utcnow() - timedelta(days=30)
-            
-    except Exception as e:
-        print(f"⚠️ sync_log取得エラー: {e}")
-        # エラーの場合は7日前から開始
-        return datetime.utcnow() - timedelta(days=7)
-
-def update_last_sync_time(sync_type="clips"):
-    """最後の同期時刻を更新"""
-    try:
-        conn = sqlite3.connect("vods.db", check_same_thread=False)
-        c = conn.cursor()
-        
-        current_time = datetime.utcnow().isoformat()
-        
-        # 既存の記録を更新または新規作成
-        c.execute("""
-            INSERT OR REPLACE INTO sync_log (sync_type, last_sync_time)
-            VALUES (?, ?)
-        """, (sync_type, current_time))
-        
-        conn.commit()
-        conn.close()
-        
-        print(f"✅ 同期時刻更新: {sync_type} - {current_time}")
-        
-    except Exception as e:
-        print(f"⚠️ sync_log更新エラー: {e}")
-
-def fetch_vods(headers, user_id, vod_type="archive"):
-    """VODデータを取得してSQLiteに保存"""
-    url = f"{BASE_URL}/videos"
-    params = {
-        "user_id": user_id,
-        "type": vod_type,
-        "first": 50
-    }
-    
-    conn = sqlite3.connect("vods.db", check_same_thread=False)
-    c = conn.cursor()
-    
-    new_vods_count = 0
-    updated_vods_count = 0
-    
-    while True:
-        response = requests.get(url, headers=headers, params=params)
-        data = response.json().get("data", [])
-
-        if not data:
-            break
-
-        for item in data:
-            vod_id = item["id"]
-            vod_url = item["url"]
-
-            # 既存のVODをチェック
-            c.execute("SELECT id, url FROM vods WHERE twitch_id = ?", (vod_id,))
-            existing_vod = c.fetchone()
-
-            if existing_vod:
-                existing_id, existing_url = existing_vod
-                # URLが「チャンネルページ」だった場合のみ、VOD形式URLに更新
-                if "twitch.tv/videos/" in vod_url and (
-                    "twitch.tv/videos/" not in existing_url
-                ):
-                    print(f"🔁 URL updated for VOD {vod_id}: {existing_url} → {vod_url}")
-                    c.execute("UPDATE vods SET url = ? WHERE id = ?", (vod_url, existing_id))
-                    updated_vods_count += 1
-            else:
-                # 新しいVODを追加
-                c.execute("""
-                    INSERT INTO vods (twitch_id, title, category, url, created_at, type)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (
-                    vod_id,
-                    item["title"],
-                    item.get("game_id", ""),
-                    vod_url,
-                    datetime.fromisoformat(item["created_at"].replace("Z", "+00:00")),
-                    vod_type
-                ))
-                new_vods_count += 1
-                print(f"🆕 新しいVODを追加: {item['title']}")
-
-        conn.commit()
-
-        # 次ページへ（もし存在するなら）
-        pagination = response.json().get("pagination", {})
-        cursor = pagination.get("cursor")
-        if cursor:
-            params["after"] = cursor
-        else:
-            break
-    
-    conn.close()
-    return {"new": new_vods_count, "updated": updated_vods_count}
-
-def fetch_clips(headers, user_id, start_date: datetime, end_date: datetime):
-    """クリップデータを取得してSQLiteに保存"""
-    url = f"{BASE_URL}/clips"
-    current_start = start_date
-    
-    conn = sqlite3.connect("vods.db", check_same_thread=False)
-    c = conn.cursor()
-    
-    new_clips_count = 0
-    updated_clips_count = 0
-
-    print(f"🔍 クリップ取得範囲: {start_date.strftime('%Y-%m-%d %H:%M')} ～ {end_date.strftime('%Y-%m-%d %H:%M')}")
-
-    while current_start < end_date:
-        current_end = min(current_start + timedelta(days=7), end_date)
-        params = {
-            "broadcaster_id": user_id,
-            "first": 50,
-            "started_at": current_start.isoformat("T") + "Z",
-            "ended_at": current_end.isoformat("T") + "Z"
-        }
-        
-        print(f"📅 期間: {current_start.date()} ～ {current_end.date()}")
-
-        while True:
-            response = requests.get(url, headers=headers, params=params)
-            print(f"🔍 API Status: {response.status_code}")
-            
-            if response.status_code != 200:
-                print(f"❌ API エラー: {response.status_code} - {response.text}")
-                break
-                
-            data = response.json().get("data", [])
-            print(f"📊 取得クリップ数: {len(data)}")
-
-            if not data:
-                break
-
-            for item in data:
-                clip_title = item["title"]
-                clip_id = item["id"]
-                vod_twitch_id = item.get("video_id")
-                
-                # 既存のクリップをチェック
-                c.execute("SELECT id, thumbnail_url FROM clips WHERE twitch_id = ?", (clip_id,))
-                existing = c.fetchone()
-                
-                if not existing:
-                    # 新しいクリップを追加
-                    c.execute("""
-                        INSERT INTO clips (twitch_id, title, category, url, created_at, vod_twitch_id, thumbnail_url)
-                        VALUES (?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        clip_id,
-                        clip_title,
-                        item.get("game_id", ""),
-                        item["url"],
-                        datetime.fromisoformat(item["created_at"].replace("Z", "+00:00")),
-                        vod_twitch_id,
-                        item.get("thumbnail_url")
-                    ))
-                    new_clips_count += 1
-                    print(f"🆕 新しいクリップ追加: {clip_title}")
-                    
-                elif not existing[1] and item.get("thumbnail_url"):
-                    # サムネイルを更新
-                    c.execute("UPDATE clips SET thumbnail_url = ? WHERE twitch_id = ?", 
-                             (item["thumbnail_url"], clip_id))
-                    updated_clips_count += 1
-                    print(f"🔁 サムネイル更新: {clip_title}")
-
-            conn.commit()
-
-            # 次ページへ（もしあれば）
-            pagination = response.json().get("pagination", {})
-            cursor = pagination.get("cursor")
-            if not cursor or cursor == params.get("after"):
-                break
-            params["after"] = cursor
-
-        current_start += timedelta(days=7)
-    
-    conn.close()
-    return {"new": new_clips_count, "updated": updated_clips_count}
-
-def link_clips_to_vods():
-    """クリップとVODの紐づけを実行（SQLite用）"""
-    conn = sqlite3.connect("vods.db", check_same_thread=False)
-    c = conn.cursor()
-    
-    # 紐づけされていないクリップを取得
-    c.execute("""
-        SELECT id, vod_twitch_id 
-        FROM clips 
-        WHERE vod_id IS NULL AND vod_twitch_id IS NOT NULL
-    """)
-    unlinked_clips = c.fetchall()
-    
-    linked_count = 0
-    for clip_id, vod_twitch_id in unlinked_clips:
-        # 対応するVODを検索
-        c.execute("SELECT id FROM vods WHERE twitch_id = ?", (vod_twitch_id,))
-        vod_result = c.fetchone()
-        
-        if vod_result:
-            vod_id = vod_result[0]
-            c.execute("UPDATE clips SET vod_id = ? WHERE id = ?", (vod_id, clip_id))
-            linked_count += 1
-            print(f"🔗 クリップ(ID:{clip_id})をVOD(ID:{vod_id})に紐づけしました")
-    
-    conn.commit()
-    conn.close()
-    return linked_count
-
-def sync_data():
-    """メインの同期処理（SQLite対応版）"""
-    print("🚀 Twitch API同期開始...")
-    sync_start_time = datetime.utcnow()
-    
-    try:
-        # テーブルの存在確認
-        ensure_tables_exist()
-        
-        # 認証
-        token = get_access_token()
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Client-Id": os.getenv("TWITCH_CLIENT_ID")
-        }
-        user_id = get_user_id(headers)
-        print(f"✅ 認証成功 - User ID: {user_id}")
-
-        # VODの取得（全タイプ）
-        print("📺 VOD同期開始...")
-        vod_results = {"new": 0, "updated": 0}
-        
-        for video_type in ["archive", "upload", "highlight"]:
-            print(f"🔄 {video_type} タイプのVODを取得中...")
-            result = fetch_vods(headers, user_id, video_type)
-            vod_results["new"] += result["new"]
-            vod_results["updated"] += result["updated"]
-
-        # クリップの取得（前回同期時から今まで）
-        print("✂️ クリップ同期開始...")
-        last_sync = get_last_sync_time()
-        current_time = datetime.utcnow()
-        
-        # 少し重複させて取得（漏れ防止）
-        start_time = last_sync - timedelta(hours=1)  # 1時間前から
-        
-        clip_results = fetch_clips(headers, user_id, start_time, current_time)
-
-        # VODとクリップの自動紐づけ
-        print("🔗 VODとクリップの紐づけ処理...")
-        linked_count = link_clips_to_vods()
-        
-        # 同期時刻を更新
-        update_last_sync_time("clips")
-        update_last_sync_time("vods")
-        
-        # 結果のサマリー
-        sync_duration = (datetime.utcnow() - sync_start_time).total_seconds()
-        
-        result_summary = (
-            f"✅ 同期完了 ({sync_duration:.1f}秒)\n"
-            f"📺 VOD: 新規{vod_results['new']}件, 更新{vod_results['updated']}件\n"
-            f"✂️ クリップ: 新規{clip_results['new']}件, 更新{clip_results['updated']}件\n"
-            f"🔗 紐づけ: {linked_count}件"
-        )
-        
-        print(result_summary)
-        return result_summary
-        
-    except Exception as e:
-        error_msg = f"❌ 同期エラー: {str(e)}"
-        print(error_msg)
-        return error_msg
-
-def get_sync_status():
-    """同期状態の詳細情報を取得"""
-    try:
-        conn = sqlite3.connect("vods.db", check_same_thread=False)
-        c = conn.cursor()
-        
-        # 最後の同期時刻
-        c.execute("SELECT sync_type, last_sync_time FROM sync_log ORDER BY created_at DESC")
-        sync_logs = c.fetchall()
-        
-        # データ数
-        c.execute("SELECT COUNT(*) FROM vods")
-        vod_count = c.fetchone()[0]
-        
-        c.execute("SELECT COUNT(*) FROM clips")
-        clip_count = c.fetchone()[0]
-        
-        # 紐づけ済みクリップ数
-        c.execute("SELECT COUNT(*) FROM clips WHERE vod_id IS NOT NULL")
-        linked_clips = c.fetchone()[0]
-        
-        # 今日追加されたデータ
-        today = datetime.now().strftime('%Y-%m-%d')
-        c.execute("SELECT COUNT(*) FROM vods WHERE DATE(created_at) = ?", (today,))
-        today_vods = c.fetchone()[0]
-        
-        c.execute("SELECT COUNT(*) FROM clips WHERE DATE(created_at) = ?", (today,))
-        today_clips = c.fetchone()[0]
-        
-        # YouTubeリンク数
-        c.execute("SELECT COUNT(*) FROM youtube_links")
-        youtube_links_count = c.fetchone()[0]
-        
-        conn.close()
-        
-        return {
-            "sync_logs": sync_logs,
-            "vod_count": vod_count,
-            "clip_count": clip_count,
-            "linked_clips": linked_clips,
-            "today_vods": today_vods,
-            "today_clips": today_clips,
-            "youtube_links_count": youtube_links_count
-        }
-        
-    except Exception as e:
-        return {"error": str(e)}
-
-def manual_sync_range(start_date: datetime, end_date: datetime):
-    """手動で期間を指定して同期"""
-    print(f"🔧 手動同期: {start_date.date()} ～ {end_date.date()}")
-    
-    try:
-        ensure_tables_exist()
-        
-        token = get_access_token()
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Client-Id": os.getenv("TWITCH_CLIENT_ID")
-        }
-        user_id = get_user_id(headers)
-        
-        # 指定期間のクリップを取得
-        clip_results = fetch_clips(headers, user_id, start_date, end_date)
-        
-        # 紐づけ処理
-        linked_count = link_clips_to_vods()
-        
-        result = (
-            f"✅ 手動同期完了\n"
-            f"✂️ クリップ: 新規{clip_results['new']}件, 更新{clip_results['updated']}件\n"
-            f"🔗 紐づけ: {linked_count}件"
-        )
-        
-        print(result)
-        return result
-        
-    except Exception as e:
-        error_msg = f"❌ 手動同期エラー: {str(e)}"
-        print(error_msg)
-        return error_msg
-
-def fix_all_youtube_links():
-    """すべてのYouTubeリンクのvideo_idを修復"""
-    conn = sqlite3.connect("vods.db", check_same_thread=False)
-    c = conn.cursor()
-    
-    # すべてのYouTubeリンクを取得
-    c.execute("SELECT id, url, video_id FROM youtube_links")
-    all_links = c.fetchall()
-    
-    fixed_count = 0
-    
-    for link_id, url, current_video_id in all_links:
-        # video_idを再抽出
-        video_id = extract_youtube_video_id(url)
-        
-        # 現在のvideo_idと異なる場合、または空の場合に更新
-        if video_id and video_id != current_video_id:
-            c.execute("UPDATE youtube_links SET video_id = ? WHERE id = ?", (video_id, link_id))
-            fixed_count += 1
-            print(f"🔧 修復: {url} → video_id: {video_id}")
-    
-    conn.commit()
-    conn.close()
-    
-    print(f"✅ {fixed_count}件のYouTubeリンクを修復しました")
-    return fixed_count
-
-def extract_youtube_video_id(url):
-    """YouTubeのURLからvideo_idを抽出する関数"""
-    if not url:
-        return None
-    
-    # パターン1: https://www.youtube.com/watch?v=VIDEO_ID
-    match = re.search(r'(?:youtube\.com/watch\?v=)([a-zA-Z0-9_-]{11})', url)
-    if match:
-        return match.group(1)
-    
-    # パターン2: https://youtu.be/VIDEO_ID
-    match = re.search(r'(?:youtu\.be/)([a-zA-Z0-9_-]{11})', url)
-    if match:
-        return match.group(1)
-    
-    # パターン3: https://www.youtube.com/embed/VIDEO_ID
-    match = re.search(r'(?:youtube\.com/embed/)([a-zA-Z0-9_-]{11})', url)
-    if match:
-        return match.group(1)
-    
-    return None
-
-# Streamlit用の簡単な管理関数
-def streamlit_sync():
-    """Streamlitから呼び出す同期処理"""
-    return sync_data()
-
-def streamlit_fix_links():
-    """Streamlitから呼び出すリンク修復処理"""
-    youtube_fixed = fix_all_youtube_links()
-    clip_linked = link_clips_to_vods()
-    
-    return {
-        "youtube_fixed": youtube_fixed,
-        "clips_linked": clip_linked
+# twitch_api.py (修正版)
+
+import requests
+from datetime import datetime, timedelta, timezone
+import sqlite3
+import os
+import re
+
+from app.utils.bulk_writer import (
+    VOD_FIELDS, CLIP_FIELDS, vod_record, clip_record,
+    VOD_MUTABLE_FIELDS, CLIP_MUTABLE_FIELDS, VOD_CHANGED_WHERE, CLIP_CHANGED_WHERE
+)
+from app.utils.schema import ensure_sync_schema
+from app.utils.watermarks import (
+    VIDEO_TYPES, CLIPS_STREAM, VOD_OVERLAP, CLIP_OVERLAP,
+    video_stream, clips_stream, get_watermark, get_all_watermarks, advance_watermark, record_sync_log,
+    utcnow, to_utc_iso
+)
+from app.utils.channels import register_channel
+from app.utils.clip_planner import estimate_clip_density, fetch_clips_adaptive
+from app.utils.games import resolve_games
+from app.utils.highlights import rebuild_highlights
+from app.utils.helix import HelixClient, auth_url, helix_base_url
+from app.utils.staging import StagingArea
+
+BASE_URL = helix_base_url()
+
+def get_access_token():
+    """Twitchアクセストークンを取得"""
+    url = auth_url()
+    params = {
+        "client_id": os.getenv("TWITCH_CLIENT_ID"),
+        "client_secret": os.getenv("TWITCH_CLIENT_SECRET"),
+        "grant_type": "client_credentials"
+    }
+    response = requests.post(url, params=params)
+    return response.json()["access_token"]
+
+def get_user_id(headers):
+    """Twitchユーザーの内部IDを取得"""
+    url = f"{BASE_URL}/users"
+    params = {"login": os.getenv("TWITCH_USER_LOGIN")}
+    response = requests.get(url, headers=headers, params=params)
+    return response.json()["data"][0]["id"]
+
+def ensure_tables_exist():
+    """必要なテーブルが存在することを確認"""
+    conn = sqlite3.connect("vods.db", check_same_thread=False)
+    c = conn.cursor()
+    
+    # vods / clips / youtube_links / sync_log とマイグレーション
+    ensure_sync_schema(c)
+    
+    conn.commit()
+    conn.close()
+
+def get_last_sync_time(stream=CLIPS_STREAM):
+    """最後の同期位置（UTC）を取得"""
+    try:
+        conn = sqlite3.connect("vods.db", check_same_thread=False)
+        c = conn.cursor()
+        
+        # ストリームごとのハイウォーターマーク
+        mark = get_watermark(c, stream)
+        
+        conn.close()
+        
+        if mark:
+            return mark
+        else:
+            # 初回実行の場合は30日前から開始
+            return utcnow() - timedelta(days=30)
+            
+    except Exception as e:
+        print(f"⚠️ ウォーターマーク取得エラー: {e}")
+        # エラーの場合は7日前から開始
+        return utcnow() - timedelta(days=7)
+
+def update_last_sync_time(sync_type=CLIPS_STREAM, high_water=None):
+    """
+    同期位置を更新（データのコミット後に呼び出す）
+    
+    high_water を省略した場合は現在時刻（UTC）まで進める。
+    """
+    try:
+        conn = sqlite3.connect("vods.db", check_same_thread=False)
+        c = conn.cursor()
+        
+        current_time = utcnow()
+        advance_watermark(c, sync_type, high_water or current_time)
+        
+        # 最終同期としてsync_logにも残す
+        record_sync_log(c, sync_type, current_time)
+        
+        conn.commit()
+        conn.close()
+        
+        print(f"✅ 同期位置更新: {sync_type} - {to_utc_iso(high_water or current_time)}")
+        
+    except Exception as e:
+        print(f"⚠️ 同期位置更新エラー: {e}")
+
+def create_staging(conn):
+    """
+    取得したVOD・クリップを貯めるステージングを用意
+    
+    反映ルールは BulkUpserter で直接書き込んでいたときと同じ。
+    """
+    staging = StagingArea(conn)
+    
+    # 既存VODは可変カラムが変わった場合のみ更新
+    # URLは「チャンネルページ」だった場合のみ、VOD形式URLに更新
+    url_fix = (
+        "excluded.url LIKE '%twitch.tv/videos/%' "
+        "AND COALESCE(vods.url, '') NOT LIKE '%twitch.tv/videos/%'"
+    )
+    staging.define(
+        "vods", VOD_FIELDS,
+        update_columns=VOD_MUTABLE_FIELDS + ["content_hash"],
+        update_expressions={"url": f"CASE WHEN {url_fix} THEN excluded.url ELSE vods.url END"},
+        update_where=f"{VOD_CHANGED_WHERE} OR ({url_fix})"
+    )
+    
+    # 既存クリップは可変カラムが変わった場合のみ更新（空のサムネイルで上書きしない）
+    staging.define(
+        "clips", CLIP_FIELDS,
+        update_columns=[f for f in CLIP_MUTABLE_FIELDS if f != "thumbnail_url"] + ["content_hash"],
+        update_expressions={"thumbnail_url": "COALESCE(NULLIF(excluded.thumbnail_url, ''), clips.thumbnail_url)"},
+        update_where=CLIP_CHANGED_WHERE
+    )
+    return staging
+
+def _merge_standalone(conn, staging):
+    """単独で呼ばれた場合はその場で反映してコミット"""
+    merged = staging.merge()
+    conn.commit()
+    conn.close()
+    return merged
+
+def fetch_vods(headers, user_id, vod_type="archive", since=None, staging=None):
+    """
+    VODデータを取得してステージングに貯める
+    
+    since を指定すると、それより古いVODのページに達した時点で打ち切る（差分同期）。
+    staging を渡した場合、本テーブルへの反映は呼び出し側の staging.merge() で行う。
+    省略した場合はこの関数の最後に反映し、新規/更新件数を返す。
+    取得に失敗した場合は errors に記録する（呼び出し側は同期位置を進めない）。
+    """
+    url = f"{BASE_URL}/videos"
+    params = {
+        "user_id": user_id,
+        "type": vod_type,
+        "first": 50
+    }
+    
+    conn = None
+    if staging is None:
+        conn = sqlite3.connect("vods.db", check_same_thread=False)
+        staging = create_staging(conn)
+    
+    staged_count = 0
+    newest = None
+    errors = []
+    
+    while True:
+        response = requests.get(url, headers=headers, params=params)
+        if response.status_code != 200:
+            errors.append(f"VOD取得エラー({vod_type}): {response.status_code} - {response.text}")
+            print(f"❌ {errors[-1]}")
+            break
+        data = response.json().get("data", [])
+
+        if not data:
+            break
+
+        records = []
+        for item in data:
+            record = vod_record(item, vod_type)
+            record["created_at"] = datetime.fromisoformat(item["created_at"].replace("Z", "+00:00"))
+            records.append(record)
+
+        staged_count += staging.append("vods", records)
+        print(f"📦 {vod_type}: {len(data)}件取得")
+
+        # 新しい順に返るので、since より古いVODが出たら以降は取得済み
+        for record in records:
+            if newest is None or record["created_at"] > newest:
+                newest = record["created_at"]
+        if since and any(record["created_at"] < since for record in records):
+            break
+
+        # 次ページへ（もし存在するなら）
+        pagination = response.json().get("pagination", {})
+        cursor = pagination.get("cursor")
+        if cursor:
+            params["after"] = cursor
+        else:
+            break
+    
+    result = {"staged": staged_count, "new": 0, "updated": 0, "newest": newest, "errors": errors}
+    if conn is not None:
+        merged = _merge_standalone(conn, staging)["vods"]
+        result.update(new=merged["inserted"], updated=merged["updated"])
+    return result
+
+def fetch_clips(headers, user_id, start_date: datetime, end_date: datetime, staging=None):
+    """
+    クリップデータを取得してステージングに貯める
+    
+    staging の扱いは fetch_vods と同じ。
+    取得に失敗した場合は errors に記録する（呼び出し側は同期位置を進めない）。
+    watermark は取りこぼしなく取得できた終端。
+    """
+    url = f"{BASE_URL}/clips"
+    
+    # 期間の初期幅を決めるための読み取り用
+    conn = sqlite3.connect("vods.db", check_same_thread=False)
+    c = conn.cursor()
+    standalone = staging is None
+    if standalone:
+        staging = create_staging(conn)
+    
+    staged_count = 0
+    errors = []
+    watermark = None
+
+    print(f"🔍 クリップ取得範囲: {start_date.strftime('%Y-%m-%d %H:%M')} ～ {end_date.strftime('%Y-%m-%d %H:%M')}")
+
+    def get_page(params):
+        response = requests.get(url, headers=headers, params=params)
+        print(f"🔍 API Status: {response.status_code}")
+        if response.status_code != 200:
+            raise Exception(f"API エラー: {response.status_code} - {response.text}")
+        return response.json()
+
+    def on_page(data):
+        nonlocal staged_count
+        print(f"📊 取得クリップ数: {len(data)}")
+        records = []
+        for item in data:
+            record = clip_record(item)
+            record["created_at"] = datetime.fromisoformat(item["created_at"].replace("Z", "+00:00"))
+            records.append(record)
+
+        staged_count += staging.append("clips", records)
+
+    # 期間は固定7日ではなく、飽和したら分割・空なら拡大する（初期幅は既存データの密度から推定）
+    try:
+        stats = fetch_clips_adaptive(
+            get_page, user_id,
+            start_date.replace(tzinfo=timezone.utc), end_date.replace(tzinfo=timezone.utc),
+            on_page, clips_per_day=estimate_clip_density(c, broadcaster_id=user_id)
+        )
+        print(f"📅 {stats['windows']}期間 / {stats['pages']}リクエスト (分割{stats['splits']}回, 拡大{stats['widened']}回)")
+        watermark = stats["complete_until"]
+    except Exception as e:
+        errors.append(f"クリップ取得エラー: {e}")
+        print(f"❌ {e}")
+    
+    result = {"staged": staged_count, "new": 0, "updated": 0, "errors": errors, "watermark": watermark}
+    if standalone:
+        merged = _merge_standalone(conn, staging)["clips"]
+        result.update(new=merged["inserted"], updated=merged["updated"])
+    else:
+        conn.close()
+    return result
+
+def link_clips_to_vods():
+    """クリップとVODの紐づけを実行（SQLite用）"""
+    conn = sqlite3.connect("vods.db", check_same_thread=False)
+    c = conn.cursor()
+    
+    # 紐づけされていないクリップを取得
+    c.execute("""
+        SELECT id, vod_twitch_id 
+        FROM clips 
+        WHERE vod_id IS NULL AND vod_twitch_id IS NOT NULL
+    """)
+    unlinked_clips = c.fetchall()
+    
+    linked_count = 0
+    for clip_id, vod_twitch_id in unlinked_clips:
+        # 対応するVODを検索
+        c.execute("SELECT id FROM vods WHERE twitch_id = ?", (vod_twitch_id,))
+        vod_result = c.fetchone()
+        
+        if vod_result:
+            vod_id = vod_result[0]
+            c.execute("UPDATE clips SET vod_id = ? WHERE id = ?", (vod_id, clip_id))
+            linked_count += 1
+            print(f"🔗 クリップ(ID:{clip_id})をVOD(ID:{vod_id})に紐づけしました")
+    
+    conn.commit()
+    conn.close()
+    return linked_count
+
+def update_highlights():
+    """クリップ件数が変わったVODのハイライトタイムラインを再計算"""
+    conn = sqlite3.connect("vods.db", check_same_thread=False)
+    c = conn.cursor()
+    
+    updated = rebuild_highlights(c)
+    
+    conn.commit()
+    conn.close()
+    return updated
+
+def fetch_game_names(headers):
+    """vods / clips のうち未登録のgame_idをまとめて名前解決（/games は100件ずつ）"""
+    conn = sqlite3.connect("vods.db", check_same_thread=False)
+    c = conn.cursor()
+    
+    client = HelixClient(headers["Client-Id"], headers["Authorization"].split(" ", 1)[1], base_url=BASE_URL)
+    result = resolve_games(c, client)
+    
+    conn.commit()
+    conn.close()
+    return result["resolved"]
+
+def register_user_channel(headers, user_id):
+    """同期するチャンネルをchannelsテーブルに登録（初回は既存データと同期位置を引き継ぐ）"""
+    conn = sqlite3.connect("vods.db", check_same_thread=False)
+    c = conn.cursor()
+    
+    client = HelixClient(headers["Client-Id"], headers["Authorization"].split(" ", 1)[1], base_url=BASE_URL)
+    channel = register_channel(c, client, broadcaster_id=user_id)
+    
+    conn.commit()
+    conn.close()
+    return channel
+
+def sync_data():
+    """メインの同期処理（SQLite対応版）"""
+    print("🚀 Twitch API同期開始...")
+    sync_start_time = utcnow()
+    
+    try:
+        # テーブルの存在確認
+        ensure_tables_exist()
+        
+        # 認証
+        token = get_access_token()
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Client-Id": os.getenv("TWITCH_CLIENT_ID")
+        }
+        user_id = get_user_id(headers)
+        print(f"✅ 認証成功 - User ID: {user_id}")
+        register_user_channel(headers, user_id)
+
+        # 取得中は TEMP のステージングに貯めるだけで、vods / clips はロックしない
+        conn = sqlite3.connect("vods.db", check_same_thread=False)
+        c = conn.cursor()
+        watermarks = get_all_watermarks(c)
+        staging = create_staging(conn)
+        marks = {}
+        errors = []
+        
+        # VODの取得（全タイプ）
+        print("📺 VOD同期開始...")
+        for video_type in VIDEO_TYPES:
+            print(f"🔄 {video_type} タイプのVODを取得中...")
+            stream = video_stream(video_type, user_id)
+            # 前回位置から少し遡って差分取得（初回は全件）
+            since = watermarks[stream] - VOD_OVERLAP if stream in watermarks else None
+            result = fetch_vods(headers, user_id, video_type, since=since, staging=staging)
+            errors.extend(result["errors"])
+            # 途中で失敗したタイプは位置を進めない（次回も同じ位置から取り直す）
+            if result["newest"] and not result["errors"]:
+                marks[stream] = result["newest"]
+
+        # クリップの取得（前回同期時から今まで）
+        print("✂️ クリップ同期開始...")
+        last_sync = get_last_sync_time(clips_stream(user_id))
+        current_time = utcnow()
+        
+        # 少し重複させて取得（漏れ防止）
+        start_time = last_sync - CLIP_OVERLAP
+        
+        clip_result = fetch_clips(headers, user_id, start_time, current_time, staging=staging)
+        # クリップは取りこぼしなく取得できた終端まで進める（失敗したときは進めない）
+        if not clip_result["errors"] and clip_result["watermark"]:
+            marks[clips_stream(user_id)] = min(clip_result["watermark"], current_time)
+        errors.extend(clip_result["errors"])
+
+        # 反映・紐づけ・ハイライト・同期位置の更新を1トランザクションで行う
+        print("🔗 取得データを反映中（VODとクリップの紐づけを含む）...")
+        merged = staging.merge()
+        for stream, mark in marks.items():
+            advance_watermark(c, stream, mark)
+            record_sync_log(c, stream)
+        conn.commit()
+        conn.close()
+        vod_results = {"new": merged["vods"]["inserted"], "updated": merged["vods"]["updated"]}
+        clip_results = {"new": merged["clips"]["inserted"], "updated": merged["clips"]["updated"]}
+        linked_count = merged["linked"]
+        
+        # ゲーム名の解決（HTTPを伴うので反映とは別に行う）
+        print("🎮 ゲーム名を取得中...")
+        games_count = fetch_game_names(headers)
+        
+        # 結果のサマリー
+        sync_duration = (utcnow() - sync_start_time).total_seconds()
+        
+        result_summary = (
+            f"✅ 同期完了 ({sync_duration:.1f}秒)\n"
+            f"📺 VOD: 新規{vod_results['new']}件, 更新{vod_results['updated']}件\n"
+            f"✂️ クリップ: 新規{clip_results['new']}件, 更新{clip_results['updated']}件\n"
+            f"🔗 紐づけ: {linked_count}件\n"
+            f"🎮 ゲーム名: {games_count}件"
+        )
+        if errors:
+            result_summary += f"\n⚠️ {len(errors)}件のエラー（失敗したストリームの同期位置は進めていません）"
+        
+        print(result_summary)
+        return result_summary
+        
+    except Exception as e:
+        error_msg = f"❌ 同期エラー: {str(e)}"
+        print(error_msg)
+        return error_msg
+
+def get_sync_status():
+    """同期状態の詳細情報を取得"""
+    try:
+        conn = sqlite3.connect("vods.db", check_same_thread=False)
+        c = conn.cursor()
+        
+        # 最後の同期時刻
+        c.execute("SELECT sync_type, last_sync_time FROM sync_log ORDER BY created_at DESC LIMIT 50")
+        sync_logs = c.fetchall()
+        
+        # ストリームごとの同期位置
+        watermarks = {stream: to_utc_iso(mark) for stream, mark in get_all_watermarks(c).items()}
+        
+        # データ数
+        c.execute("SELECT COUNT(*) FROM vods")
+        vod_count = c.fetchone()[0]
+        
+        c.execute("SELECT COUNT(*) FROM clips")
+        clip_count = c.fetchone()[0]
+        
+        # 紐づけ済みクリップ数
+        c.execute("SELECT COUNT(*) FROM clips WHERE vod_id IS NOT NULL")
+        linked_clips = c.fetchone()[0]
+        
+        # 今日追加されたデータ
+        today = datetime.now().strftime('%Y-%m-%d')
+        c.execute("SELECT COUNT(*) FROM vods WHERE DATE(created_at) = ?", (today,))
+        today_vods = c.fetchone()[0]
+        
+        c.execute("SELECT COUNT(*) FROM clips WHERE DATE(created_at) = ?", (today,))
+        today_clips = c.fetchone()[0]
+        
+        # YouTubeリンク数
+        c.execute("SELECT COUNT(*) FROM youtube_links")
+        youtube_links_count = c.fetchone()[0]
+        
+        conn.close()
+        
+        return {
+            "sync_logs": sync_logs,
+            "watermarks": watermarks,
+            "vod_count": vod_count,
+            "clip_count": clip_count,
+            "linked_clips": linked_clips,
+            "today_vods": today_vods,
+            "today_clips": today_clips,
+            "youtube_links_count": youtube_links_count
+        }
+        
+    except Exception as e:
+        return {"error": str(e)}
+
+def manual_sync_range(start_date: datetime, end_date: datetime):
+    """手動で期間を指定して同期"""
+    print(f"🔧 手動同期: {start_date.date()} ～ {end_date.date()}")
+    
+    try:
+        ensure_tables_exist()
+        
+        token = get_access_token()
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Client-Id": os.getenv("TWITCH_CLIENT_ID")
+        }
+        user_id = get_user_id(headers)
+        
+        # 指定期間のクリップを取得
+        clip_results = fetch_clips(headers, user_id, start_date, end_date)
+        
+        # 紐づけ処理
+        linked_count = link_clips_to_vods()
+        update_highlights()
+        
+        result = (
+            f"✅ 手動同期完了\n"
+            f"✂️ クリップ: 新規{clip_results['new']}件, 更新{clip_results['updated']}件\n"
+            f"🔗 紐づけ: {linked_count}件"
+        )
+        
+        print(result)
+        return result
+        
+    except Exception as e:
+        error_msg = f"❌ 手動同期エラー: {str(e)}"
+        print(error_msg)
+        return error_msg
+
+def fix_all_youtube_links():
+    """すべてのYouTubeリンクのvideo_idを修復"""
+    conn = sqlite3.connect("vods.db", check_same_thread=False)
+    c = conn.cursor()
+    
+    # すべてのYouTubeリンクを取得
+    c.execute("SELECT id, url, video_id FROM youtube_links")
+    all_links = c.fetchall()
+    
+    fixed_count = 0
+    
+    for link_id, url, current_video_id in all_links:
+        # video_idを再抽出
+        video_id = extract_youtube_video_id(url)
+        
+        # 現在のvideo_idと異なる場合、または空の場合に更新
+        if video_id and video_id != current_video_id:
+            c.execute("UPDATE youtube_links SET video_id = ? WHERE id = ?", (video_id, link_id))
+            fixed_count += 1
+            print(f"🔧 修復: {url} → video_id: {video_id}")
+    
+    conn.commit()
+    conn.close()
+    
+    print(f"✅ {fixed_count}件のYouTubeリンクを修復しました")
+    return fixed_count
+
+def extract_youtube_video_id(url):
+    """YouTubeのURLからvideo_idを抽出する関数"""
+    if not url:
+        return None
+    
+    # パターン1: https://www.youtube.com/watch?v=VIDEO_ID
+    match = re.search(r'(?:youtube\.com/watch\?v=)([a-zA-Z0-9_-]{11})', url)
+    if match:
+        return match.group(1)
+    
+    # パターン2: https://youtu.be/VIDEO_ID
+    match = re.search(r'(?:youtu\.be/)([a-zA-Z0-9_-]{11})', url)
+    if match:
+        return match.group(1)
+    
+    # パターン3: https://www.youtube.com/embed/VIDEO_ID
+    match = re.search(r'(?:youtube\.com/embed/)([a-zA-Z0-9_-]{11})', url)
+    if match:
+        return match.group(1)
+    
+    return None
+
+# Streamlit用の簡単な管理関数
+def streamlit_sync():
+    """Streamlitから呼び出す同期処理"""
+    return sync_data()
+
+def streamlit_fix_links():
+    """Streamlitから呼び出すリンク修復処理"""
+    youtube_fixed = fix_all_youtube_links()
+    clip_linked = link_clips_to_vods()
+    update_highlights()
+    
+    return {
+        "youtube_fixed": youtube_fixed,
+        "clips_linked": clip_linked
     }
\ No newline at end of file
@@ -0,0 +1,346 @@
+"""
+backfill.py - チャンネルの全履歴を取り込むバックフィル
+ページをコミットするたびにHelixのカーソルと期間をsync_checkpointsに保存し、
+中断しても次回の実行で続きから再開する
+
+使い方:
+    python -m app.utils.backfill                      # VODとクリップの全履歴
+    python -m app.utils.backfill --streams clips --since 2021-01-01
+    python -m app.utils.backfill --restart            # チェックポイントを破棄して最初から
+    python -m app.utils.backfill --channel some_login # 特定のチャンネルだけ
+"""
+
+import argparse
+import json
+import logging
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+from app.utils.bulk_writer import (
+    BulkUpserter, VOD_FIELDS, CLIP_FIELDS, vod_record, clip_record,
+    VOD_MUTABLE_FIELDS, CLIP_MUTABLE_FIELDS, VOD_CHANGED_WHERE, CLIP_CHANGED_WHERE,
+    relink_clips
+)
+from app.utils.channels import ensure_sync_channels, register_channel
+from app.utils.games import resolve_games
+from app.utils.highlights import rebuild_highlights
+from app.utils.clip_planner import ClipWindowPlanner, estimate_clip_density, fetch_window
+from app.utils.helix import HelixError, RequestStats, create_client_from_env
+from app.utils.progress import SyncCancelled, SyncProgress
+from app.utils.schema import ensure_sync_schema
+from app.utils.sync_engine import SyncAlreadyRunning, sync_lock
+from app.utils.watermarks import video_stream, clips_stream
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = "vods.db"
+VIDEO_TYPES = ['archive', 'upload', 'highlight']
+PAGE_SIZE = 100
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(microsecond=0)
+
+
+def _to_iso(dt):
+    return dt.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _from_iso(value):
+    dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def load_checkpoint(cursor, stream):
+    """チェックポイントを辞書で返す（なければNone）"""
+    cursor.execute("""
+        SELECT cursor, window_start, window_end, range_end, pages, rows, status
+        FROM sync_checkpoints WHERE stream = ?
+    """, (stream,))
+    row = cursor.fetchone()
+    if not row:
+        return None
+    keys = ['cursor', 'window_start', 'window_end', 'range_end', 'pages', 'rows', 'status']
+    return dict(zip(keys, row))
+
+
+def save_checkpoint(cursor, stream, cursor_value=None, window_start=None, window_end=None,
+                    range_end=None, pages=0, rows=0, status='running'):
+    """チェックポイントを保存（コミットは呼び出し側で行う）"""
+    cursor.execute("""
+        INSERT INTO sync_checkpoints
+            (stream, cursor, window_start, window_end, range_end, pages, rows, status, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(stream) DO UPDATE SET
+            cursor = excluded.cursor,
+            window_start = excluded.window_start,
+            window_end = excluded.window_end,
+            range_end = excluded.range_end,
+            pages = excluded.pages,
+            rows = excluded.rows,
+            status = excluded.status,
+            updated_at = excluded.updated_at
+    """, (stream, cursor_value, window_start, window_end, range_end, pages, rows, status,
+          _to_iso(_utcnow())))
+
+
+def backfill_videos(conn, client, user_id, video_type, restart=False, progress=None):
+    """指定タイプのVODを全ページ取得"""
+    stream = video_stream(video_type, user_id)
+    c = conn.cursor()
+
+    checkpoint = None if restart else load_checkpoint(c, stream)
+    if checkpoint and checkpoint['status'] == 'completed':
+        logger.info(f"{stream}: 完了済みのためスキップ")
+        return {"stream": stream, "skipped": True}
+
+    writer = BulkUpserter(
+        c, 'vods', VOD_FIELDS,
+        update_columns=VOD_MUTABLE_FIELDS + ['content_hash'],
+        update_where=VOD_CHANGED_WHERE
+    )
+
+    after = checkpoint['cursor'] if checkpoint else None
+    pages = checkpoint['pages'] if checkpoint else 0
+    rows = checkpoint['rows'] if checkpoint else 0
+    inserted = updated = 0
+
+    if after:
+        logger.info(f"{stream}: チェックポイントから再開 ({pages}ページ取得済み)")
+
+    while True:
+        params = {'user_id': user_id, 'type': video_type, 'first': PAGE_SIZE}
+        if after:
+            params['after'] = after
+
+        try:
+            data = client.get('videos', params)
+        except HelixError as e:
+            if after and e.status_code == 400:
+                # カーソルの有効期限切れ: 先頭から取り直す（アップサートなので重複しない）
+                logger.warning(f"{stream}: カーソルが無効なため先頭から再取得します")
+                after = None
+                continue
+            raise
+
+        videos = data.get('data', [])
+        result = writer.write(vod_record(video, video_type) for video in videos)
+        inserted += result['inserted']
+        updated += result['updated']
+
+        after = data.get('pagination', {}).get('cursor')
+        done = not videos or not after
+        pages += 1
+        rows += len(videos)
+
+        save_checkpoint(c, stream, cursor_value=after, pages=pages, rows=rows,
+                        status='completed' if done else 'running')
+        conn.commit()
+        if progress:
+            progress.page(result['inserted'] + result['updated'])
+            progress.check_cancel()
+
+        if done:
+            break
+
+    logger.info(f"{stream}: {pages}ページ, 追加{inserted}件, 更新{updated}件")
+    return {"stream": stream, "pages": pages, "inserted": inserted, "updated": updated}
+
+
+def backfill_clips(conn, client, user_id, since=None, restart=False, progress=None):
+    """クリップを古い順に全件取得（期間はclip_plannerで適応的に分割）"""
+    stream = clips_stream(user_id)
+    c = conn.cursor()
+
+    checkpoint = None if restart else load_checkpoint(c, stream)
+    if checkpoint and checkpoint['status'] == 'completed':
+        logger.info(f"{stream}: 完了済みのためスキップ")
+        return {"stream": stream, "skipped": True}
+
+    first_window = None
+    after = None
+    if checkpoint:
+        start = _from_iso(checkpoint['window_start'])
+        range_end = _from_iso(checkpoint['range_end'])
+        pages, rows = checkpoint['pages'], checkpoint['rows']
+        if checkpoint['cursor'] and checkpoint['window_end']:
+            # 期間の途中から再開
+            first_window = (start, _from_iso(checkpoint['window_end']))
+            after = checkpoint['cursor']
+        logger.info(f"{stream}: チェックポイントから再開 ({_to_iso(start)} から)")
+    else:
+        if since:
+            start = since
+        else:
+            # チャンネル作成日から開始
+            users = client.get('users', {'id': user_id}).get('data', [])
+            start = _from_iso(users[0]['created_at']) if users else _utcnow() - timedelta(days=365)
+        range_end = _utcnow()
+        pages = rows = 0
+
+    writer = BulkUpserter(
+        c, 'clips', CLIP_FIELDS,
+        update_columns=CLIP_MUTABLE_FIELDS + ['content_hash'],
+        update_where=CLIP_CHANGED_WHERE
+    )
+    planner = ClipWindowPlanner(start, range_end, estimate_clip_density(c, broadcaster_id=user_id),
+                                first_window=first_window)
+    totals = {"inserted": 0, "updated": 0, "pages": pages, "rows": rows}
+
+    def get_page(params):
+        return client.get('clips', params)
+
+    while True:
+        window = planner.next_window()
+        if window is None:
+            break
+        if progress:
+            progress.window(window[0], window[1], fraction=planner.fraction_done())
+
+        def on_page(clips, next_cursor):
+            result = writer.write(clip_record(clip) for clip in clips)
+            totals['inserted'] += result['inserted']
+            totals['updated'] += result['updated']
+            totals['pages'] += 1
+            totals['rows'] += len(clips)
+            # 期間の途中ならカーソルも保存して、その位置から再開できるようにする
+            save_checkpoint(
+                c, stream, cursor_value=next_cursor,
+                window_start=_to_iso(window[0]), window_end=_to_iso(window[1]),
+                range_end=_to_iso(range_end), pages=totals['pages'], rows=totals['rows']
+            )
+            conn.commit()
+            if progress:
+                progress.page(result['inserted'] + result['updated'])
+                progress.check_cancel()
+
+        try:
+            count, saturated, _ = fetch_window(get_page, user_id, window, on_page, after=after)
+        except HelixError as e:
+            if after and e.status_code == 400:
+                logger.warning(f"{stream}: カーソルが無効なため期間の先頭から再取得します")
+                planner = ClipWindowPlanner(window[0], range_end,
+                                            estimate_clip_density(c, broadcaster_id=user_id))
+                after = None
+                continue
+            raise
+        after = None
+        planner.complete(window, count, saturated)
+
+        done = planner.done_until >= range_end
+        save_checkpoint(
+            c, stream, window_start=_to_iso(min(planner.done_until, range_end)),
+            range_end=_to_iso(range_end), pages=totals['pages'], rows=totals['rows'],
+            status='completed' if done else 'running'
+        )
+        conn.commit()
+
+    logger.info(
+        f"{stream}: {totals['pages']}ページ, 追加{totals['inserted']}件, 更新{totals['updated']}件 "
+        f"(期間 {planner.stats['windows']}, 分割 {planner.stats['splits']}, 拡大 {planner.stats['widened']})"
+    )
+    if planner.stats['truncated']:
+        logger.warning(f"{stream}: 取得しきれなかった期間が{planner.stats['truncated']}件あります")
+    return {"stream": stream, "pages": totals['pages'], "inserted": totals['inserted'],
+            "updated": totals['updated'], "planner": planner.stats}
+
+
+def run_backfill(streams=('vods', 'clips'), since=None, restart=False, db_path=DB_PATH,
+                 client=None, user_id=None, progress=None, channel_login=None):
+    """
+    バックフィルを実行して結果のサマリーを返す
+
+    登録済みの有効なチャンネルを順に処理する（channel_login で1チャンネルに限定）。
+    progress（SyncProgress）を渡すと進捗を記録し、キャンセル要求でページの区切りで中断する
+    （チェックポイントが残るので次回はその続きから再開できる）。
+    """
+    if client is None:
+        client, user_id = create_client_from_env()
+    if client.stats is None:
+        client.stats = RequestStats()
+    requests_before = client.stats.snapshot()
+    if progress:
+        client.on_throttle = progress.throttle
+
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    try:
+        c = conn.cursor()
+        ensure_sync_schema(c)
+        if channel_login:
+            channels = [register_channel(c, client, login=channel_login)]
+        else:
+            channels = ensure_sync_channels(c, client, user_id)
+        conn.commit()
+
+        results = []
+        cancelled = False
+        try:
+            for channel in channels:
+                broadcaster_id = channel['broadcaster_id']
+                label = channel['login'] or broadcaster_id
+                if 'vods' in streams:
+                    for video_type in VIDEO_TYPES:
+                        if progress:
+                            progress.stage(f"backfill:{label}:vods:{video_type}")
+                        results.append(backfill_videos(conn, client, broadcaster_id, video_type,
+                                                       restart=restart, progress=progress))
+                if 'clips' in streams:
+                    if progress:
+                        progress.stage(f"backfill:{label}:clips", progress=0.0, span=1.0)
+                    results.append(backfill_clips(conn, client, broadcaster_id, since=since,
+                                                  restart=restart, progress=progress))
+        except SyncCancelled as e:
+            logger.warning(str(e))
+            cancelled = True
+
+        linked = relink_clips(c)
+        highlights = rebuild_highlights(c)
+        games = resolve_games(c, client)
+        conn.commit()
+    finally:
+        conn.close()
+
+    requests_after = client.stats.snapshot()
+    summary = {"results": results, "linked": linked, "highlights": highlights, "games": games,
+               "cancelled": cancelled, "api_calls": requests_after['calls'] - requests_before['calls'],
+               "api_bytes": requests_after['bytes'] - requests_before['bytes']}
+    if progress:
+        progress.record_metrics(
+            api_calls=summary['api_calls'], api_bytes=summary['api_bytes'],
+            rows_inserted=sum(result.get('inserted', 0) for result in results),
+            rows_updated=sum(result.get('updated', 0) for result in results),
+            rows_linked=linked
+        )
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Twitchの全履歴をバックフィル")
+    parser.add_argument('--streams', nargs='+', choices=['vods', 'clips'], default=['vods', 'clips'])
+    parser.add_argument('--since', help="クリップの取得開始日 (YYYY-MM-DD)")
+    parser.add_argument('--restart', action='store_true', help="チェックポイントを無視して最初から")
+    parser.add_argument('--channel', help="対象チャンネルのログイン名（省略時は登録済みの全チャンネル）")
+    parser.add_argument('--db', default=DB_PATH)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    since = _from_iso(args.since) if args.since else None
+    # 通常の同期（デーモン・UI）と同じロックを取り、同じテーブルと同期位置を同時に書かないようにする
+    try:
+        with sync_lock(args.db):
+            progress = SyncProgress(args.db, kind='backfill')
+            try:
+                summary = run_backfill(args.streams, since=since, restart=args.restart, db_path=args.db,
+                                       progress=progress, channel_login=args.channel)
+            except Exception as e:
+                progress.finish('failed', message=str(e))
+                raise
+            progress.finish('cancelled' if summary['cancelled'] else 'completed')
+            summary['run_id'] = progress.run_id
+    except SyncAlreadyRunning as e:
+        summary = {"success": False, "skipped": True, "error": str(e)}
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
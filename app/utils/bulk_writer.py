@@ -0,0 +1,165 @@
+"""
+bulk_writer.py - Twitch APIのページ単位バルク書き込み
+1ページ分のVOD/クリップをまとめて INSERT ... ON CONFLICT(twitch_id) で反映する
+"""
+
+import hashlib
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 書き込み候補のカラム（実テーブルに存在するものだけが使われる）
+VOD_FIELDS = [
+    'twitch_id', 'title', 'url', 'created_at', 'category', 'type',
+    'duration', 'view_count', 'game_name', 'thumbnail_url', 'broadcaster_id', 'content_hash'
+]
+
+CLIP_FIELDS = [
+    'twitch_id', 'title', 'url', 'created_at', 'category', 'vod_twitch_id',
+    'thumbnail_url', 'duration', 'view_count', 'game_name', 'creator_name',
+    'is_favorite', 'vod_offset', 'broadcaster_id', 'content_hash'
+]
+
+# 同期のたびに変わり得るカラム（content_hashの対象）
+VOD_MUTABLE_FIELDS = ['title', 'view_count', 'thumbnail_url', 'duration', 'game_name']
+# vod_offsetはTwitch側の処理が終わるまでnullのことがあるため、後から埋まる値として扱う
+CLIP_MUTABLE_FIELDS = ['title', 'view_count', 'thumbnail_url', 'duration', 'game_name', 'vod_offset']
+
+# content_hashが変わった行だけを書き換える条件
+VOD_CHANGED_WHERE = "vods.content_hash IS NOT excluded.content_hash"
+CLIP_CHANGED_WHERE = "clips.content_hash IS NOT excluded.content_hash"
+
+def content_hash(record, fields):
+    """可変カラムの値からハッシュを計算"""
+    payload = json.dumps([record.get(f) for f in fields], ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def vod_record(video, vod_type='archive'):
+    """Helix /videos の1件をvodsテーブル用の辞書に変換"""
+    record = {
+        'twitch_id': video.get('id'),
+        'title': video.get('title', ''),
+        'url': video.get('url', ''),
+        'created_at': video.get('created_at'),
+        'category': video.get('game_id', ''),
+        'type': vod_type,
+        'duration': video.get('duration', ''),
+        'view_count': video.get('view_count', 0),
+        'game_name': video.get('game_name', ''),
+        'thumbnail_url': video.get('thumbnail_url', ''),
+        'broadcaster_id': video.get('user_id'),
+    }
+    record['content_hash'] = content_hash(record, VOD_MUTABLE_FIELDS)
+    return record
+
+
+def clip_record(clip):
+    """Helix /clips の1件をclipsテーブル用の辞書に変換"""
+    record = {
+        'twitch_id': clip.get('id'),
+        'title': clip.get('title', ''),
+        'url': clip.get('url', ''),
+        'created_at': clip.get('created_at'),
+        'category': clip.get('game_id', ''),
+        'vod_twitch_id': clip.get('video_id') or None,
+        'thumbnail_url': clip.get('thumbnail_url', ''),
+        'duration': clip.get('duration', 0),
+        'view_count': clip.get('view_count', 0),
+        'game_name': clip.get('game_name', ''),
+        'creator_name': clip.get('creator_name', ''),
+        'is_favorite': False,
+        'vod_offset': clip.get('vod_offset'),
+        'broadcaster_id': clip.get('broadcaster_id'),
+    }
+    record['content_hash'] = content_hash(record, CLIP_MUTABLE_FIELDS)
+    return record
+
+
+class BulkUpserter:
+    """
+    1ページ分のレコードをステージし、executemany 1回でアップサートする
+
+    カラム一覧とSQLは生成時に1度だけ組み立てる。反映は「追加（DO NOTHING）」と「更新（DO UPDATE）」の
+    2回の executemany で、それぞれの changes() の合計がそのまま追加件数・更新件数になる。
+    update_columns / update_expressions を省略すると既存行には触れない（DO NOTHING）。
+    update_expressions は {カラム: SQL式} で、単純な上書き以外の更新に使う。
+    """
+
+    def __init__(self, cursor, table, fields, update_columns=None, update_where=None,
+                 update_expressions=None):
+        self.cursor = cursor
+        self.table = table
+
+        cursor.execute(f"PRAGMA table_info({table})")
+        existing = {row[1] for row in cursor.fetchall()}
+        self.columns = [f for f in fields if f in existing]
+        self.update_columns = [c for c in (update_columns or []) if c in self.columns]
+
+        column_sql = ', '.join(self.columns)
+        placeholders = ', '.join('?' for _ in self.columns)
+        assignments = [f"{c} = excluded.{c}" for c in self.update_columns]
+        # 値が変わらない更新は行わない（件数にも数えない）
+        differs = [f"{table}.{c} IS NOT excluded.{c}" for c in self.update_columns]
+        for column, expression in (update_expressions or {}).items():
+            if column in self.columns and column not in self.update_columns:
+                assignments.append(f"{column} = {expression}")
+                differs.append(f"{table}.{column} IS NOT ({expression})")
+
+        insert_sql = f"INSERT INTO {table} ({column_sql}) VALUES ({placeholders}) ON CONFLICT(twitch_id)"
+        # 1回目: 新しい行だけを追加する
+        self.insert_sql = f"{insert_sql} DO NOTHING"
+        # 2回目: 既存の行を更新する（1回目で追加した行は値が同じなので条件に合わず、触れない）
+        self.update_sql = None
+        if assignments:
+            self.update_sql = (
+                f"{insert_sql} DO UPDATE SET {', '.join(assignments)} "
+                f"WHERE {update_where or ' OR '.join(differs)}"
+            )
+        self._staged = {}
+
+    def stage(self, records):
+        """レコードをステージ（同一twitch_idは後勝ち）"""
+        for record in records:
+            twitch_id = record.get('twitch_id')
+            if not twitch_id:
+                logger.warning(f"twitch_idがないためスキップ: {record}")
+                continue
+            self._staged[twitch_id] = tuple(record.get(c) for c in self.columns)
+
+    def flush(self):
+        """ステージ済みのレコードを反映し、追加/更新件数を返す"""
+        if not self._staged:
+            return {"inserted": 0, "updated": 0}
+
+        rows = list(self._staged.values())
+        self._staged = {}
+
+        # executemanyのrowcountは各文のchanges()の合計（トリガーでの変更は含まない）。
+        # total_changes はデータバージョンのトリガーの分も数えてしまうので使わない
+        self.cursor.executemany(self.insert_sql, rows)
+        inserted = max(self.cursor.rowcount, 0)
+        updated = 0
+        # 全件が新規なら既存の行はないので、更新のパスは省く
+        if self.update_sql and inserted < len(rows):
+            self.cursor.executemany(self.update_sql, rows)
+            updated = max(self.cursor.rowcount, 0)
+        return {"inserted": inserted, "updated": updated}
+
+    def write(self, records):
+        """stage + flush をまとめて実行"""
+        self.stage(records)
+        return self.flush()
+
+
+def relink_clips(cursor):
+    """vod_twitch_idを持つ未紐づけクリップをまとめてVODに紐づけ、件数を返す"""
+    cursor.execute("""
+        UPDATE clips
+        SET vod_id = (SELECT v.id FROM vods v WHERE v.twitch_id = clips.vod_twitch_id)
+        WHERE vod_id IS NULL
+          AND vod_twitch_id IS NOT NULL
+          AND EXISTS (SELECT 1 FROM vods v WHERE v.twitch_id = clips.vod_twitch_id)
+    """)
+    return max(cursor.rowcount, 0)
@@ -0,0 +1,216 @@
+"""
+catalog.py - カタログ（VOD・クリップ）の読み取り専用クエリ
+一覧はキーセット方式のカーソル（created_at, id の降順）でページングする。
+OFFSETと違い、深いページでも読み飛ばしが発生せず、途中に行が追加されても重複・欠落しない
+比較と並び順は素の created_at のまま書き、(created_at, id) のインデックスで読む
+（NULLはマイグレーションで '' にそろえる。schema.migrate_database_if_needed）
+Streamlitに依存しないので、APIやエクスポートからも利用できる
+"""
+
+import base64
+import json
+import sqlite3
+
+from app.utils.details import CLIP_DETAIL_TABLES, MAX_ROW_ID, VOD_DETAIL_TABLES, get_vod_detail, get_clip_detail
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+# エンドポイントごとに依存するテーブル（ETagのもとになるデータバージョン）
+VOD_LIST_TABLES = ('vods', 'games', 'youtube_links', 'clips')
+CLIP_LIST_TABLES = ('clips', 'vods', 'games', 'youtube_links')
+STATS_TABLES = ('vods', 'clips', 'youtube_links')
+VOD_TABLES = VOD_DETAIL_TABLES
+CLIP_TABLES = CLIP_DETAIL_TABLES
+
+
+class InvalidCursor(ValueError):
+    """カーソルの形式が不正"""
+
+
+def connect_readonly(db_path):
+    """読み取り専用で開く（APIやエクスポートからは書き込めない）"""
+    return sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+
+
+def encode_cursor(created_at, row_id):
+    """一覧の最後の行から次ページのカーソルを作る（URLにそのまま載せられる文字列）"""
+    data = json.dumps([created_at or '', row_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """カーソルを (created_at, id) に戻す"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        row_id = int(row_id)
+    except (ValueError, TypeError, UnicodeError):
+        raise InvalidCursor(cursor)
+    if not 0 <= row_id <= MAX_ROW_ID:
+        raise InvalidCursor(cursor)
+    return str(created_at), row_id
+
+
+def clamp_limit(limit):
+    """件数の指定を 1〜MAX_LIMIT に丸める（未指定・不正ならDEFAULT_LIMIT）"""
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        return DEFAULT_LIMIT
+    return min(max(limit, 1), MAX_LIMIT)
+
+
+def _page(cursor, query, params, limit, to_item):
+    """limit+1件を読んで、次ページがあればカーソルを返す"""
+    cursor.execute(query, params + [limit + 1])
+    rows = cursor.fetchall()
+    items = [to_item(row) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(last[3], last[0])
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def list_vods(cursor, q=None, category=None, broadcaster_id=None, after=None, limit=DEFAULT_LIMIT):
+    """
+    VODを新しい順に取得（タイトル検索・カテゴリ・チャンネルで絞り込み）
+
+    Returns: {"items": [...], "next_cursor": str or None}
+    """
+    where, params = [], []
+    if q:
+        where.append("v.title LIKE ?")
+        params.append(f"%{q}%")
+    if category:
+        where.append("COALESCE(g.name, v.category) LIKE ?")
+        params.append(f"%{category}%")
+    if broadcaster_id:
+        where.append("v.broadcaster_id = ?")
+        params.append(broadcaster_id)
+    if after:
+        created_at, row_id = decode_cursor(after)
+        where.append("(v.created_at, v.id) < (?, ?)")
+        params.extend([created_at, row_id])
+
+    query = f"""
+        SELECT v.id, v.title, COALESCE(g.name, v.category), v.created_at, v.url, v.broadcaster_id,
+               (SELECT yl.video_id FROM youtube_links yl
+                WHERE yl.vod_id = v.id AND yl.video_id IS NOT NULL AND yl.video_id != ''
+                ORDER BY yl.id LIMIT 1)
+        FROM vods v LEFT JOIN games g ON g.id = v.category
+        {"WHERE " + " AND ".join(where) if where else ""}
+        ORDER BY v.created_at DESC, v.id DESC
+        LIMIT ?
+    """
+    page = _page(cursor, query, params, limit, lambda row: {
+        "id": row[0], "title": row[1], "category": row[2], "created_at": row[3] or None, "url": row[4],
+        "broadcaster_id": row[5], "youtube_video_id": row[6],
+    })
+    # クリップ数は返すページの行だけ数える（候補の行すべてに相関サブクエリを走らせない）
+    counts = _clip_counts(cursor, [item["id"] for item in page["items"]])
+    for item in page["items"]:
+        item["clip_count"] = counts.get(item["id"], 0)
+    return page
+
+
+def _clip_counts(cursor, vod_ids):
+    """VODごとのクリップ数（idx_clips_vod_offset で数える）"""
+    if not vod_ids:
+        return {}
+    cursor.execute(f"""
+        SELECT vod_id, COUNT(*) FROM clips
+        WHERE vod_id IN ({", ".join("?" for _ in vod_ids)})
+        GROUP BY vod_id
+    """, vod_ids)
+    return dict(cursor.fetchall())
+
+
+def list_clips(cursor, q=None, vod_id=None, broadcaster_id=None, after=None, limit=DEFAULT_LIMIT):
+    """
+    クリップを新しい順に取得（タイトル検索・元VOD・チャンネルで絞り込み）
+
+    Returns: {"items": [...], "next_cursor": str or None}
+    """
+    where, params = [], []
+    if q:
+        where.append("c.title LIKE ?")
+        params.append(f"%{q}%")
+    if vod_id:
+        where.append("c.vod_id = ?")
+        params.append(vod_id)
+    if broadcaster_id:
+        where.append("c.broadcaster_id = ?")
+        params.append(broadcaster_id)
+    if after:
+        created_at, row_id = decode_cursor(after)
+        where.append("(c.created_at, c.id) < (?, ?)")
+        params.extend([created_at, row_id])
+
+    query = f"""
+        SELECT c.id, c.title, COALESCE(g.name, NULLIF(c.category, ''), v.category), c.created_at,
+               c.url, c.thumbnail_url, c.vod_id, c.vod_offset, v.title, c.broadcaster_id
+        FROM clips c
+        LEFT JOIN vods v ON v.id = c.vod_id
+        LEFT JOIN games g ON g.id = COALESCE(NULLIF(c.category, ''), v.category)
+        {"WHERE " + " AND ".join(where) if where else ""}
+        ORDER BY c.created_at DESC, c.id DESC
+        LIMIT ?
+    """
+    return _page(cursor, query, params, limit, lambda row: {
+        "id": row[0], "title": row[1], "category": row[2], "created_at": row[3] or None, "url": row[4],
+        "thumbnail_url": row[5], "vod_id": row[6], "vod_offset": row[7], "vod_title": row[8],
+        "broadcaster_id": row[9],
+    })
+
+
+def vod_detail(cursor, vod_id):
+    """VOD詳細（YouTubeリンク・クリップ・ハイライト付き）を辞書で返す（なければNone）"""
+    detail = get_vod_detail(cursor, vod_id)
+    if not detail:
+        return None
+    vod_id, title, category, created_at, game_name, url = detail["vod"]
+    return {
+        "id": vod_id, "title": title, "category": game_name or category, "created_at": created_at, "url": url,
+        "youtube_links": [
+            {"id": link_id, "url": link_url, "title": link_title, "video_id": video_id}
+            for link_id, link_url, link_title, video_id in detail["youtube_links"]
+        ],
+        "clips": [
+            {"id": clip_id, "title": clip_title, "created_at": clip_created_at, "thumbnail_url": thumbnail_url,
+             "vod_offset": vod_offset}
+            for clip_id, clip_title, clip_created_at, thumbnail_url, _, vod_offset in detail["clips"]
+        ],
+        "highlights": detail["highlights"],
+    }
+
+
+def clip_detail(cursor, clip_id):
+    """クリップ詳細（元VOD付き）を辞書で返す（なければNone）"""
+    detail = get_clip_detail(cursor, clip_id)
+    if not detail:
+        return None
+    clip_id, title, category, created_at, thumbnail_url, url, vod_id = detail["clip"]
+    vod = None
+    if detail["vod_info"]:
+        vod = {"id": detail["vod_info"][0], "title": detail["vod_info"][1], "created_at": detail["vod_info"][2],
+               "youtube_video_id": detail["vod_video_id"]}
+    return {
+        "id": clip_id, "title": title, "category": category, "created_at": created_at,
+        "thumbnail_url": thumbnail_url, "url": url, "vod_id": vod_id, "vod": vod,
+    }
+
+
+def catalog_stats(cursor):
+    """件数と最新の追加日時"""
+    cursor.execute("SELECT COUNT(*), MAX(created_at) FROM vods")
+    vods_count, latest_vod = cursor.fetchone()
+    cursor.execute("SELECT COUNT(*), MAX(created_at), COUNT(vod_id) FROM clips")
+    clips_count, latest_clip, linked_clips = cursor.fetchone()
+    cursor.execute("SELECT COUNT(*) FROM youtube_links")
+    youtube_count = cursor.fetchone()[0]
+    return {
+        "vods_count": vods_count, "clips_count": clips_count, "linked_clips_count": linked_clips,
+        "youtube_count": youtube_count, "latest_vod": latest_vod, "latest_clip": latest_clip,
+    }
@@ -0,0 +1,304 @@
+"""
+catalog_export.py - カタログ（vods / clips / youtube_links）の一括エクスポート
+CSV・JSONL・Parquet で、行をチャンクごとに読み出して書き出す。全件をメモリに載せないので、
+カタログの大きさに関係なく使用メモリは1チャンク分で一定
+
+読み出しはIDのキーセット方式（id > 最後のID）で、チャンクごとに短いクエリを実行する。
+長い読み取りトランザクションを開いたままにしないので、エクスポート中も同期を止めない。
+Parquet には pyarrow が必要（なければ CSV / JSONL のみ）。1チャンクが1つの row group になる。
+
+使い方:
+    python -m app.utils.catalog_export clips --format csv --out clips.csv
+    python -m app.utils.catalog_export vods --format jsonl --broadcaster-id 123 --since 2024-01-01
+    python -m app.utils.catalog_export youtube_links --format parquet --out links.parquet
+"""
+
+import argparse
+import csv
+import io
+import json
+import logging
+import sys
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrowがない環境ではParquetを出力できない
+    pa = None
+    pq = None
+
+from app.utils.catalog import connect_readonly
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = "vods.db"
+DEFAULT_CHUNK_SIZE = 1000
+
+# テーブルごとの出力カラムと型（Parquetのスキーマに使う）。内部用のカラム（content_hashなど）は出さない
+EXPORT_COLUMNS = {
+    'vods': [
+        ('id', 'int'), ('twitch_id', 'text'), ('title', 'text'), ('category', 'text'), ('game_name', 'text'),
+        ('url', 'text'), ('created_at', 'text'), ('type', 'text'), ('duration', 'text'),
+        ('view_count', 'int'), ('thumbnail_url', 'text'), ('broadcaster_id', 'text'),
+    ],
+    'clips': [
+        ('id', 'int'), ('twitch_id', 'text'), ('title', 'text'), ('category', 'text'), ('game_name', 'text'),
+        ('url', 'text'), ('created_at', 'text'), ('vod_id', 'int'), ('vod_twitch_id', 'text'),
+        ('vod_offset', 'int'), ('duration', 'real'), ('view_count', 'int'), ('creator_name', 'text'),
+        ('thumbnail_url', 'text'), ('broadcaster_id', 'text'),
+    ],
+    'youtube_links': [
+        ('id', 'int'), ('vod_id', 'int'), ('url', 'text'), ('title', 'text'), ('video_id', 'text'),
+        ('created_at', 'text'),
+    ],
+}
+EXPORT_FORMATS = ('csv', 'jsonl', 'parquet')
+MIME_TYPES = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+
+class ExportError(ValueError):
+    """テーブル・形式・絞り込みの指定が不正"""
+
+
+def parquet_available():
+    return pq is not None
+
+
+def _build_filters(table, columns, broadcaster_id=None, vod_id=None, since=None, until=None, q=None):
+    """絞り込み条件のWHERE句とパラメータ（created_at は since 以上・until 未満）"""
+    where, params = [], []
+    if broadcaster_id:
+        if 'broadcaster_id' in columns:
+            where.append("broadcaster_id = ?")
+        else:
+            # youtube_links は元VODのチャンネルで絞り込む
+            where.append("vod_id IN (SELECT id FROM vods WHERE broadcaster_id = ?)")
+        params.append(broadcaster_id)
+    if vod_id is not None:
+        if 'vod_id' not in columns:
+            raise ExportError(f"{table} は vod_id で絞り込めません")
+        where.append("vod_id = ?")
+        params.append(vod_id)
+    if since:
+        where.append("created_at >= ?")
+        params.append(since)
+    if until:
+        where.append("created_at < ?")
+        params.append(until)
+    if q:
+        where.append("title LIKE ?")
+        params.append(f"%{q}%")
+    return where, params
+
+
+def iter_chunks(cursor, table, chunk_size=DEFAULT_CHUNK_SIZE, **filters):
+    """
+    テーブルの行をIDの昇順にチャンクで返す
+
+    Yields: (カラム名のリスト, 行のリスト)。最初のチャンクが空でも1回は返す（ヘッダーを書くため）
+    """
+    if table not in EXPORT_COLUMNS:
+        raise ExportError(f"エクスポートできないテーブルです: {table}")
+    cursor.execute(f"PRAGMA table_info({table})")
+    existing = {row[1] for row in cursor.fetchall()}
+    # 古いDBでマイグレーション前のカラムは出力しない
+    columns = [name for name, _ in EXPORT_COLUMNS[table] if name in existing]
+    where, params = _build_filters(table, columns, **filters)
+
+    query = f"""
+        SELECT {", ".join(columns)} FROM {table}
+        WHERE id > ? {"AND " + " AND ".join(where) if where else ""}
+        ORDER BY id
+        LIMIT ?
+    """
+    last_id = 0
+    first = True
+    while True:
+        cursor.execute(query, [last_id] + params + [chunk_size])
+        rows = cursor.fetchall()
+        if rows or first:
+            yield columns, rows
+        first = False
+        if len(rows) < chunk_size:
+            return
+        last_id = rows[-1][0]
+
+
+def _csv_chunks(chunks):
+    # Excelで文字化けしないようにBOM付き（お気に入りのCSV出力と同じ）
+    yield '\ufeff'.encode('utf-8')
+    header_written = False
+    for columns, rows in chunks:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if not header_written:
+            writer.writerow(columns)
+            header_written = True
+        writer.writerows(rows)
+        yield buffer.getvalue().encode('utf-8')
+
+
+def _jsonl_chunks(chunks):
+    for columns, rows in chunks:
+        if rows:
+            yield ''.join(
+                json.dumps(dict(zip(columns, row)), ensure_ascii=False) + '\n' for row in rows
+            ).encode('utf-8')
+
+
+class _ChunkSink(io.RawIOBase):
+    """ParquetWriter の出力を受け取り、書けた分だけ取り出せるようにする"""
+
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+
+PARQUET_TYPES = {'int': 'int64', 'real': 'float64', 'text': 'string'}
+
+
+def _parquet_chunks(chunks, table):
+    types = dict(EXPORT_COLUMNS[table])
+    sink = _ChunkSink()
+    writer = None
+    for columns, rows in chunks:
+        if writer is None:
+            schema = pa.schema([(name, PARQUET_TYPES[types[name]]) for name in columns])
+            writer = pq.ParquetWriter(sink, schema, compression='zstd')
+        if rows:
+            # SQLiteは型が緩いので、スキーマと違う値が混ざっていても変換できるよう列ごとに作る
+            arrays = [
+                pa.array([_coerce(row[i], types[name]) for row in rows], type=schema.field(name).type)
+                for i, name in enumerate(columns)
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+        data = sink.drain()
+        if data:
+            yield data
+    writer.close()
+    yield sink.drain()
+
+
+def _coerce(value, column_type):
+    if value is None:
+        return None
+    try:
+        if column_type == 'int':
+            return int(value)
+        if column_type == 'real':
+            return float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if isinstance(value, str) else str(value)
+
+
+def stream_export(table, fmt='csv', db_path=DB_PATH, chunk_size=DEFAULT_CHUNK_SIZE, **filters):
+    """
+    エクスポートをbytesのチャンクで返すジェネレータを作る
+
+    filters: broadcaster_id / vod_id / since / until / q
+    指定の誤りは読み始める前に ExportError にする。
+    接続はジェネレータが終わる（または閉じられる）まで1本だけ使う。
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ExportError(f"対応していない形式です: {fmt}")
+    if fmt == 'parquet' and pq is None:
+        raise ExportError("Parquetの出力には pyarrow が必要です（pip install pyarrow）")
+    if table not in EXPORT_COLUMNS:
+        raise ExportError(f"エクスポートできないテーブルです: {table}")
+    if filters.get('vod_id') is not None and table == 'vods':
+        raise ExportError("vods は vod_id で絞り込めません")
+    return _generate(table, fmt, db_path, chunk_size, filters)
+
+
+def _generate(table, fmt, db_path, chunk_size, filters):
+    conn = connect_readonly(db_path)
+    try:
+        chunks = iter_chunks(conn.cursor(), table, chunk_size=chunk_size, **filters)
+        if fmt == 'csv':
+            yield from _csv_chunks(chunks)
+        elif fmt == 'jsonl':
+            yield from _jsonl_chunks(chunks)
+        else:
+            yield from _parquet_chunks(chunks, table)
+    finally:
+        conn.close()
+
+
+def export_to_file(out, table, fmt='csv', db_path=DB_PATH, chunk_size=DEFAULT_CHUNK_SIZE, **filters):
+    """ファイルオブジェクト（バイナリ）に書き出して、書いたバイト数を返す"""
+    written = 0
+    for data in stream_export(table, fmt, db_path=db_path, chunk_size=chunk_size, **filters):
+        out.write(data)
+        written += len(data)
+    return written
+
+
+def export_file_name(table, fmt, **filters):
+    """ダウンロード用のファイル名（例: clips_123_2024-01-01.csv）"""
+    parts = [table]
+    for key in ('broadcaster_id', 'vod_id', 'since', 'until'):
+        if filters.get(key):
+            parts.append(str(filters[key])[:10])
+    return "_".join(parts) + f".{fmt}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="カタログをCSV / JSONL / Parquetで書き出す")
+    parser.add_argument('table', choices=list(EXPORT_COLUMNS))
+    parser.add_argument('--format', dest='fmt', choices=EXPORT_FORMATS, default='csv')
+    parser.add_argument('--out', help="出力先ファイル（省略時は標準出力）")
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--broadcaster-id')
+    parser.add_argument('--vod-id', type=int)
+    parser.add_argument('--since', help="created_at がこの日時以降（例: 2024-01-01）")
+    parser.add_argument('--until', help="created_at がこの日時より前")
+    parser.add_argument('--q', help="タイトルの部分一致")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, stream=sys.stderr,
+                        format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    filters = {
+        'broadcaster_id': args.broadcaster_id, 'vod_id': args.vod_id,
+        'since': args.since, 'until': args.until, 'q': args.q,
+    }
+    try:
+        chunks = stream_export(args.table, args.fmt, db_path=args.db, chunk_size=max(args.chunk_size, 1), **filters)
+    except ExportError as e:
+        parser.error(str(e))
+    out = open(args.out, 'wb') if args.out else sys.stdout.buffer
+    written = 0
+    try:
+        for data in chunks:
+            out.write(data)
+            written += len(data)
+    finally:
+        if args.out:
+            out.close()
+    print(f"{args.table}: {written} bytes ({args.fmt})", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+channels.py - 取り込み対象チャンネルの管理
+channelsテーブルに登録された有効なチャンネルごとに同期を行う。
+VOD・クリップはbroadcaster_idでチャンネルに紐づけ、一覧はチャンネル単位で絞り込む
+"""
+
+import logging
+import os
+
+from app.utils.schema import ensure_channels_table
+from app.utils.watermarks import VIDEO_TYPES, CLIPS_STREAM, video_stream, clips_stream, to_utc_iso, utcnow
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_COLUMNS = ['broadcaster_id', 'login', 'display_name', 'enabled', 'added_at']
+
+
+def _row_to_channel(row):
+    return dict(zip(CHANNEL_COLUMNS, row)) if row else None
+
+
+def list_channels(cursor, enabled_only=True):
+    """登録済みチャンネルを登録順に返す"""
+    ensure_channels_table(cursor)
+    where = "WHERE enabled = 1" if enabled_only else ""
+    cursor.execute(f"SELECT {', '.join(CHANNEL_COLUMNS)} FROM channels {where} ORDER BY added_at, login")
+    return [_row_to_channel(row) for row in cursor.fetchall()]
+
+
+def get_channel(cursor, broadcaster_id=None, login=None):
+    """broadcaster_id またはログイン名でチャンネルを1件返す（なければNone）"""
+    ensure_channels_table(cursor)
+    if broadcaster_id:
+        cursor.execute(f"SELECT {', '.join(CHANNEL_COLUMNS)} FROM channels WHERE broadcaster_id = ?",
+                       (str(broadcaster_id),))
+    else:
+        cursor.execute(f"SELECT {', '.join(CHANNEL_COLUMNS)} FROM channels WHERE login = ?",
+                       ((login or '').lower(),))
+    return _row_to_channel(cursor.fetchone())
+
+
+def adopt_legacy_data(cursor, broadcaster_id):
+    """
+    単一チャンネル時代のデータを最初に登録されたチャンネルに割り当てる
+
+    broadcaster_idが空のVOD・クリップと、チャンネルなしのストリーム名で保存された
+    ウォーターマーク・チェックポイントを引き継ぐので、登録後も差分同期が続きから動く。
+    """
+    cursor.execute("UPDATE vods SET broadcaster_id = ? WHERE broadcaster_id IS NULL", (broadcaster_id,))
+    vods = cursor.rowcount
+    cursor.execute("UPDATE clips SET broadcaster_id = ? WHERE broadcaster_id IS NULL", (broadcaster_id,))
+    clips = cursor.rowcount
+
+    renames = [(video_stream(t), video_stream(t, broadcaster_id)) for t in VIDEO_TYPES]
+    renames.append((CLIPS_STREAM, clips_stream(broadcaster_id)))
+    for table in ('sync_watermarks', 'sync_checkpoints'):
+        for old, new in renames:
+            cursor.execute(
+                f"UPDATE OR IGNORE {table} SET stream = ? WHERE stream = ?", (new, old)
+            )
+    logger.info(f"既存データをチャンネル {broadcaster_id} に割り当て: VOD {vods}件, クリップ {clips}件")
+
+
+def register_channel(cursor, client, login=None, broadcaster_id=None):
+    """
+    チャンネルを登録（登録済みならそのまま返す）
+
+    /users でログイン名とbroadcaster_idを解決する。最初の1件目の登録時は
+    既存データをそのチャンネルに引き継ぐ。
+    """
+    existing = get_channel(cursor, broadcaster_id=broadcaster_id, login=login)
+    if existing:
+        return existing
+
+    params = {'id': broadcaster_id} if broadcaster_id else {'login': login}
+    users = client.get('users', params).get('data', [])
+    if not users:
+        raise ValueError(f"チャンネル '{login or broadcaster_id}' が見つかりません")
+    user = users[0]
+
+    cursor.execute("SELECT COUNT(*) FROM channels")
+    first = cursor.fetchone()[0] == 0
+
+    cursor.execute("""
+        INSERT INTO channels (broadcaster_id, login, display_name, enabled, added_at)
+        VALUES (?, ?, ?, 1, ?)
+        ON CONFLICT(broadcaster_id) DO NOTHING
+    """, (user['id'], user.get('login', '').lower(), user.get('display_name', ''), to_utc_iso(utcnow())))
+    logger.info(f"チャンネルを登録: {user.get('login')} ({user['id']})")
+
+    if first:
+        adopt_legacy_data(cursor, user['id'])
+    return get_channel(cursor, broadcaster_id=user['id'])
+
+
+def set_channel_enabled(cursor, broadcaster_id, enabled=True):
+    """チャンネルの同期対象を切り替え（データは削除しない）"""
+    cursor.execute("UPDATE channels SET enabled = ? WHERE broadcaster_id = ?",
+                   (1 if enabled else 0, str(broadcaster_id)))
+    return cursor.rowcount > 0
+
+
+def env_channel_logins():
+    """環境変数 TWITCH_CHANNELS（カンマ区切り）のログイン名一覧"""
+    value = os.getenv('TWITCH_CHANNELS', '')
+    return [login.strip().lower() for login in value.split(',') if login.strip()]
+
+
+def ensure_sync_channels(cursor, client, default_user_id=None):
+    """
+    同期対象のチャンネル一覧を返す
+
+    .env の既定チャンネル（TWITCH_CHANNEL_NAME / TWITCH_USER_ID）と TWITCH_CHANNELS を
+    未登録なら登録してから、有効なチャンネルを返す。
+    """
+    if default_user_id:
+        register_channel(cursor, client, broadcaster_id=default_user_id)
+    for login in env_channel_logins():
+        try:
+            register_channel(cursor, client, login=login)
+        except ValueError as e:
+            logger.warning(str(e))
+    return list_channels(cursor)
@@ -0,0 +1,222 @@
+"""
+clip_planner.py - Helix /clips 用の適応的な期間分割
+/clips は1つの期間で辿れるページ数に上限があるため、結果が飽和した期間は半分に分割し、
+空の期間が続いたら期間を広げてまとめて取得する
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 100
+# 1つの期間で取得できるクリップ数の上限（これに達したら飽和とみなす）
+SATURATION_LIMIT = 1000
+# 1期間あたりの目標件数（飽和上限の半分程度に収める）
+TARGET_PER_WINDOW = 500
+
+MIN_SPAN = timedelta(hours=1)
+# 飽和した期間を分割できる最小の幅（Helixの時刻指定は秒単位）。
+# これより短い期間でも飽和した場合は、上限を超えた分を取得できない
+SPLIT_FLOOR = timedelta(minutes=1)
+MAX_SPAN = timedelta(days=60)
+DEFAULT_SPAN = timedelta(days=7)
+
+
+def estimate_clip_density(cursor, lookback_days=180, broadcaster_id=None):
+    """
+    clipsテーブルから1日あたりのクリップ数を推定
+
+    クリップのあった日の件数の90パーセンタイルを返す（データがなければNone）。
+    broadcaster_id を指定するとそのチャンネルのクリップだけで推定する。
+    """
+    since = (datetime.now(timezone.utc) - timedelta(days=lookback_days)).strftime('%Y-%m-%d')
+    params = [since]
+    channel_filter = ""
+    if broadcaster_id:
+        channel_filter = "AND broadcaster_id = ?"
+        params.append(broadcaster_id)
+    cursor.execute(f"""
+        SELECT substr(created_at, 1, 10) AS day, COUNT(*)
+        FROM clips
+        WHERE created_at >= ? {channel_filter}
+        GROUP BY day
+    """, params)
+    daily = sorted(count for _, count in cursor.fetchall())
+    if not daily:
+        return None
+    return float(daily[min(len(daily) - 1, int(len(daily) * 0.9))])
+
+
+def initial_span(clips_per_day):
+    """推定密度から最初の期間の長さを決める"""
+    if not clips_per_day:
+        return DEFAULT_SPAN
+    span = timedelta(days=TARGET_PER_WINDOW / clips_per_day)
+    return min(max(span, MIN_SPAN), MAX_SPAN)
+
+
+class ClipWindowPlanner:
+    """
+    取得期間を古い順に払い出すプランナー
+
+    next_window() で期間を受け取り、取得結果を complete() で報告する。
+    飽和した期間は2分割して先に処理し、空の期間が続くと期間を倍に広げる。
+    SPLIT_FLOOR まで分割しても飽和する期間は取りこぼしがあるので、stats の truncated に数え、
+    complete_until（取りこぼしなく取得できた終端）をその期間の先頭で止める。
+    """
+
+    def __init__(self, start, end, clips_per_day=None, first_window=None):
+        self.start = start
+        self.end = end
+        self.span = initial_span(clips_per_day)
+        self._cursor = start
+        self._pending = []
+        if first_window:
+            # 途中まで取得した期間から再開する場合
+            self._cursor = first_window[1]
+            self._pending.append(first_window)
+        self.stats = {"windows": 0, "splits": 0, "widened": 0, "truncated": 0}
+        # 最初に取りこぼしのあった期間の先頭（なければNone）
+        self.truncated_from = None
+
+    @property
+    def done_until(self):
+        """この時刻より前の期間はすべて取得済み"""
+        if self._pending:
+            return self._pending[-1][0]
+        return self._cursor
+
+    @property
+    def complete_until(self):
+        """この時刻より前は取りこぼしなく取得済み（ウォーターマークはここまでしか進めない）"""
+        if self.truncated_from is not None:
+            return min(self.truncated_from, self.done_until)
+        return self.done_until
+
+    def fraction_done(self):
+        """全期間のうち取得済みの割合（0～1）"""
+        total = (self.end - self.start).total_seconds()
+        if total <= 0:
+            return 1.0
+        return min(max((self.done_until - self.start).total_seconds() / total, 0.0), 1.0)
+
+    def next_window(self):
+        """次に取得する期間 (start, end) を返す（なければNone）"""
+        if self._pending:
+            return self._pending.pop()
+        if self._cursor >= self.end:
+            return None
+        window = (self._cursor, min(self._cursor + self.span, self.end))
+        self._cursor = window[1]
+        return window
+
+    def complete(self, window, count, saturated):
+        """
+        期間の取得結果を報告
+
+        Returns: 期間を分割した場合True（呼び出し側はその期間を取得済みとみなさない）
+        """
+        self.stats["windows"] += 1
+        window_start, window_end = window
+
+        if saturated and window_end - window_start >= SPLIT_FLOOR * 2:
+            middle = window_start + (window_end - window_start) / 2
+            # 古い側を先に処理するため新しい側から積む
+            self._pending.append((middle, window_end))
+            self._pending.append((window_start, middle))
+            self.span = max(self.span / 2, MIN_SPAN)
+            self.stats["splits"] += 1
+            logger.info(f"期間が飽和したため分割: {window_start} ～ {window_end}")
+            return True
+
+        if saturated:
+            self.stats["truncated"] += 1
+            if self.truncated_from is None or window_start < self.truncated_from:
+                self.truncated_from = window_start
+            logger.warning(
+                f"期間を{SPLIT_FLOOR}まで分割しても{SATURATION_LIMIT}件に達したため、"
+                f"一部のクリップを取得できていません: {window_start} ～ {window_end}"
+            )
+            return False
+
+        if count == 0:
+            # 空の期間が続く場合は次の期間をまとめて広げる
+            self.span = min(self.span * 2, MAX_SPAN)
+            self.stats["widened"] += 1
+        elif count < TARGET_PER_WINDOW / 4:
+            self.span = min(self.span * 1.5, MAX_SPAN)
+        return False
+
+
+def _to_iso(dt):
+    return dt.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def fetch_window(get_page, broadcaster_id, window, on_page, after=None):
+    """
+    1つの期間のクリップを全ページ取得
+
+    get_page(params) はHelixのレスポンス(dict)を返す関数、
+    on_page(clips, next_cursor) はページごとに呼ばれる。
+    Returns: (取得件数, 飽和したかどうか, ページ数)
+    """
+    window_start, window_end = window
+    count = 0
+    pages = 0
+
+    while True:
+        params = {
+            'broadcaster_id': broadcaster_id,
+            'first': PAGE_SIZE,
+            'started_at': _to_iso(window_start),
+            'ended_at': _to_iso(window_end)
+        }
+        if after:
+            params['after'] = after
+
+        data = get_page(params)
+        clips = data.get('data', [])
+        next_cursor = data.get('pagination', {}).get('cursor') or None
+        if next_cursor == after:
+            next_cursor = None
+
+        pages += 1
+        count += len(clips)
+        on_page(clips, next_cursor)
+
+        if count >= SATURATION_LIMIT:
+            return count, True, pages
+        if not clips or not next_cursor:
+            return count, False, pages
+        after = next_cursor
+
+
+def fetch_clips_adaptive(get_page, broadcaster_id, start, end, on_page, clips_per_day=None,
+                         on_window=None):
+    """
+    start～endのクリップを適応的な期間分割で取得
+
+    on_window(window, 進捗率) を指定すると各期間の取得前に呼ばれる。
+    Returns: プランナーの統計（windows / splits / widened / truncated / pages / clips）と
+    complete_until（取りこぼしなく取得できた終端。ウォーターマークはここまでしか進めない）
+    """
+    planner = ClipWindowPlanner(start, end, clips_per_day)
+    pages = 0
+    total = 0
+
+    while True:
+        window = planner.next_window()
+        if window is None:
+            break
+        if on_window:
+            on_window(window, planner.fraction_done())
+        count, saturated, window_pages = fetch_window(
+            get_page, broadcaster_id, window,
+            lambda clips, _cursor: on_page(clips)
+        )
+        pages += window_pages
+        total += count
+        planner.complete(window, count, saturated)
+
+    return dict(planner.stats, pages=pages, clips=total, complete_until=planner.complete_until)
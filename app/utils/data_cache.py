@@ -0,0 +1,83 @@
+"""
+data_cache.py - データバージョンをキーにしたキャッシュ（Streamlit用）
+ページのローダーは st.cache_data の引数に data_versions(...) を渡すだけでよい。
+書き込みがあったテーブルのバージョンだけが変わるので、それに依存するエントリだけが
+再計算され、他のページ・他の条件のキャッシュはそのまま残る
+"""
+
+import sqlite3
+
+import streamlit as st
+
+from app.utils.data_version import get_data_versions
+from app.utils.details import CLIP_DETAIL_TABLES, VOD_DETAIL_TABLES, get_clip_detail, get_vod_detail
+from app.utils.schema import ensure_sync_schema
+
+DB_PATH = "vods.db"
+
+
+@st.cache_resource(show_spinner=False)
+def _ensure_versioning(db_path):
+    """プロセスごとに1回だけ、スキーマとバージョン管理用のトリガー（ensure_sync_schemaに含まれる）を用意"""
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    try:
+        c = conn.cursor()
+        ensure_sync_schema(c)
+        conn.commit()
+    finally:
+        conn.close()
+    return True
+
+
+def ensure_database(db_path=DB_PATH):
+    """スキーマを用意（プロセスごとに1回だけ実行される）。キャッシュを使わない読み書きの前に呼ぶ"""
+    _ensure_versioning(db_path)
+
+
+def data_versions(*tables, db_path=DB_PATH):
+    """
+    指定テーブルのバージョンをタプルで取得（キャッシュキーに使う）
+
+    再実行のたびに data_versions を1回読むだけなので、ローダーの結果が変わらない限り
+    一覧やファセットのクエリは実行されない。
+    """
+    _ensure_versioning(db_path)
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    try:
+        versions = get_data_versions(conn.cursor(), tables)
+    finally:
+        conn.close()
+    return tuple(versions[table] for table in tables)
+
+
+@st.cache_data(max_entries=1000, show_spinner=False)
+def _cached_vod_detail(vod_id, versions):
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    try:
+        return get_vod_detail(conn.cursor(), vod_id)
+    finally:
+        conn.close()
+
+
+@st.cache_data(max_entries=1000, show_spinner=False)
+def _cached_clip_detail(clip_id, versions):
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    try:
+        return get_clip_detail(conn.cursor(), clip_id)
+    finally:
+        conn.close()
+
+
+def load_vod_detail(vod_id):
+    """
+    VOD詳細をIDとデータバージョンごとにキャッシュして取得
+
+    同じVODへのアクセスが集中しても、関連テーブルに書き込みがない限り
+    DBは data_versions を読むだけで、詳細はメモリから返す。
+    """
+    return _cached_vod_detail(vod_id, data_versions(*VOD_DETAIL_TABLES))
+
+
+def load_clip_detail(clip_id):
+    """クリップ詳細をIDとデータバージョンごとにキャッシュして取得"""
+    return _cached_clip_detail(clip_id, data_versions(*CLIP_DETAIL_TABLES))
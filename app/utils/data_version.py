@@ -0,0 +1,86 @@
+"""
+data_version.py - テーブルごとのデータバージョン
+書き込みトリガーが data_versions のカウンタを進めるので、読み取り側は
+「依存するテーブルのバージョン」をキャッシュキーに含めるだけで、
+実際に変わったテーブルに依存するエントリだけが無効になる
+Streamlitに依存しないので、同期エンジンやCLIからも利用できる
+"""
+
+import logging
+import sqlite3
+
+logger = logging.getLogger(__name__)
+
+# バージョンを管理するテーブル（存在するものだけトリガーを作る）
+TRACKED_TABLES = ('vods', 'clips', 'youtube_links', 'games', 'vod_highlights', 'channels')
+# 以前はバージョンを管理していたが、読み取り側が使っていないテーブル（トリガーを外す）。
+# favorites は閲覧者ごとに頻繁に書かれるので、共有のカウンタ行への書き込みを増やさない
+RETIRED_TABLES = ('favorites',)
+
+TRIGGER_EVENTS = ('INSERT', 'UPDATE', 'DELETE')
+
+
+def ensure_data_versions(cursor, tables=TRACKED_TABLES):
+    """data_versions テーブルと、各テーブルのバージョンを進めるトリガーを作成"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS data_versions (
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP
+        )
+    """)
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+    existing = {row[0] for row in cursor.fetchall()}
+    for table in RETIRED_TABLES:
+        for event in TRIGGER_EVENTS:
+            cursor.execute(f"DROP TRIGGER IF EXISTS trg_{table}_{event.lower()}_version")
+        cursor.execute("DELETE FROM data_versions WHERE table_name = ?", (table,))
+    for table in tables:
+        if table not in existing:
+            continue
+        cursor.execute("INSERT OR IGNORE INTO data_versions (table_name, version) VALUES (?, 0)", (table,))
+        for event in TRIGGER_EVENTS:
+            # 文単位のトリガーはないので行ごとに進む（値は「変わったかどうか」だけに使う）
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()}_version
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE data_versions
+                    SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+                    WHERE table_name = '{table}';
+                END
+            """)
+
+
+def get_data_versions(cursor, tables=None):
+    """
+    テーブルごとのバージョンを取得
+
+    Returns: {table_name: version}（tablesを指定した場合、未登録のテーブルは0）
+    """
+    try:
+        cursor.execute("SELECT table_name, version FROM data_versions")
+        versions = dict(cursor.fetchall())
+    except sqlite3.OperationalError:
+        versions = {}
+    if tables is None:
+        return versions
+    return {table: versions.get(table, 0) for table in tables}
+
+
+def read_data_versions(db_path="vods.db", tables=None):
+    """DBパスを指定してバージョンを取得（接続を開いてすぐ閉じる）"""
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    try:
+        return get_data_versions(conn.cursor(), tables)
+    finally:
+        conn.close()
+
+
+def bump_data_version(cursor, *tables):
+    """トリガーを経由しない変更（外部ツールでの書き換えなど）の後にバージョンを進める"""
+    for table in tables:
+        cursor.execute("""
+            INSERT INTO data_versions (table_name, version, updated_at) VALUES (?, 1, CURRENT_TIMESTAMP)
+            ON CONFLICT(table_name) DO UPDATE SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+        """, (table,))
@@ -0,0 +1,92 @@
+"""
+details.py - VOD・クリップ詳細ページのデータ取得
+1回の呼び出しで詳細ページの表示に必要な行をまとめて読む（ページ側はこの結果を描画するだけ）
+Streamlitに依存しないので、静的出力やAPIからも利用できる
+"""
+
+from app.utils.highlights import load_highlights
+
+# 詳細が依存するテーブル（このどれかのデータバージョンが進んだら読み直す）
+VOD_DETAIL_TABLES = ('vods', 'games', 'youtube_links', 'clips', 'vod_highlights')
+CLIP_DETAIL_TABLES = ('clips', 'vods', 'games', 'youtube_links')
+# SQLiteの INTEGER の上限（これより大きい値をバインドすると OverflowError になる）
+MAX_ROW_ID = 2 ** 63 - 1
+
+
+def parse_detail_id(value):
+    """クエリパラメータなどのIDを正規化（数字でない・SQLiteの整数に収まらなければNone）"""
+    try:
+        detail_id = int(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+    return detail_id if 0 < detail_id <= MAX_ROW_ID else None
+
+
+def get_vod_detail(cursor, vod_id):
+    """
+    VOD・YouTubeリンク・クリップ・ハイライトをまとめて取得
+
+    Returns: {"vod", "youtube_links", "clips", "highlights"}（VODがなければNone）
+    """
+    cursor.execute("""
+        SELECT v.id, v.title, v.category, v.created_at, g.name, v.url
+        FROM vods v LEFT JOIN games g ON g.id = v.category
+        WHERE v.id = ?
+    """, (vod_id,))
+    vod = cursor.fetchone()
+    if not vod:
+        return None
+
+    # YouTubeリンク（video_idも含む）
+    cursor.execute("SELECT id, url, title, video_id FROM youtube_links WHERE vod_id = ? ORDER BY id", (vod_id,))
+    youtube_links = cursor.fetchall()
+
+    # クリップ（配信内の位置が分かるものは配信の流れ順）
+    cursor.execute("""
+        SELECT id, title, created_at, thumbnail_url,
+               (SELECT yl.video_id FROM youtube_links yl WHERE yl.vod_id = clips.vod_id AND yl.video_id IS NOT NULL LIMIT 1) as youtube_video_id,
+               vod_offset
+        FROM clips
+        WHERE vod_id = ?
+        ORDER BY vod_offset IS NULL, vod_offset, created_at DESC
+    """, (vod_id,))
+    clips = cursor.fetchall()
+
+    return {
+        "vod": vod,
+        "youtube_links": youtube_links,
+        "clips": clips,
+        # ハイライトタイムライン（同期時に集計済みの1行を読むだけ）
+        "highlights": load_highlights(cursor, vod_id),
+    }
+
+
+def get_clip_detail(cursor, clip_id):
+    """
+    クリップと紐づくVOD・そのYouTube動画IDをまとめて取得
+
+    カテゴリはゲーム名に変換して返す（クリップになければ元VODのカテゴリ。一覧と同じ）
+    Returns: {"clip", "vod_info", "vod_video_id"}（クリップがなければNone）
+    """
+    cursor.execute("""
+        SELECT c.id, c.title, COALESCE(g.name, NULLIF(c.category, ''), v.category), c.created_at,
+               c.thumbnail_url, c.url, c.vod_id
+        FROM clips c
+        LEFT JOIN vods v ON v.id = c.vod_id
+        LEFT JOIN games g ON g.id = COALESCE(NULLIF(c.category, ''), v.category)
+        WHERE c.id = ?
+    """, (clip_id,))
+    clip = cursor.fetchone()
+    if not clip:
+        return None
+
+    vod_info = None
+    vod_video_id = None
+    if clip[6]:
+        cursor.execute("SELECT id, title, created_at FROM vods WHERE id = ?", (clip[6],))
+        vod_info = cursor.fetchone()
+        cursor.execute("SELECT video_id FROM youtube_links WHERE vod_id = ? AND video_id IS NOT NULL LIMIT 1",
+                       (clip[6],))
+        row = cursor.fetchone()
+        vod_video_id = row[0] if row else None
+    return {"clip": clip, "vod_info": vod_info, "vod_video_id": vod_video_id}
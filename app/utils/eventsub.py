@@ -0,0 +1,220 @@
+"""
+eventsub.py - Twitch EventSub（Webhook）通知の検証とキュー登録
+stream.offline / channel.update を受け取ったら、そのチャンネルの直近のVODと
+その期間のクリップだけを同期するジョブをsync_queueに積む（同期自体はワーカーが行う）
+"""
+
+import hashlib
+import hmac
+import json
+import logging
+import uuid
+from datetime import timedelta
+
+from app.utils.channels import get_channel
+from app.utils.schema import ensure_eventsub_tables
+from app.utils.watermarks import parse_utc, to_utc_iso, utcnow
+
+logger = logging.getLogger(__name__)
+
+# Twitchが付けるヘッダー
+MESSAGE_ID_HEADER = 'Twitch-Eventsub-Message-Id'
+TIMESTAMP_HEADER = 'Twitch-Eventsub-Message-Timestamp'
+SIGNATURE_HEADER = 'Twitch-Eventsub-Message-Signature'
+MESSAGE_TYPE_HEADER = 'Twitch-Eventsub-Message-Type'
+SUBSCRIPTION_TYPE_HEADER = 'Twitch-Eventsub-Subscription-Type'
+
+# 対象を絞った同期を起動する通知
+SYNC_EVENT_TYPES = ('stream.offline', 'channel.update')
+
+# これより古いタイムスタンプの通知はリプレイとみなして拒否する（Twitchの推奨値）
+MAX_MESSAGE_AGE = timedelta(minutes=10)
+# 受信済みメッセージIDの保持期間（MAX_MESSAGE_AGEより長ければ十分）
+MESSAGE_RETENTION = timedelta(hours=1)
+
+
+class EventSubRejected(Exception):
+    """検証に失敗した通知（status_codeでHTTPのステータスを返す）"""
+
+    def __init__(self, status_code, message):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def compute_signature(secret, message_id, timestamp, body):
+    """EventSubの署名（'sha256=' + HMAC-SHA256(message_id + timestamp + body)）"""
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    digest = hmac.new(secret.encode('utf-8'), message_id.encode('utf-8') + timestamp.encode('utf-8') + body,
+                      hashlib.sha256).hexdigest()
+    return f"sha256={digest}"
+
+
+def _header(headers, name):
+    # http.serverのヘッダーは大文字小文字を区別しないが、dictで渡された場合にも対応する
+    value = headers.get(name)
+    if value is None:
+        value = headers.get(name.lower())
+    return value
+
+
+def verify_message(headers, body, secret, now=None):
+    """
+    署名とタイムスタンプを検証し、(message_id, message_type, timestamp) を返す
+
+    署名不一致・ヘッダー不足は403、古すぎる／未来すぎるタイムスタンプは403で拒否する。
+    """
+    message_id = _header(headers, MESSAGE_ID_HEADER)
+    timestamp = _header(headers, TIMESTAMP_HEADER)
+    signature = _header(headers, SIGNATURE_HEADER)
+    message_type = _header(headers, MESSAGE_TYPE_HEADER)
+    if not (message_id and timestamp and signature and message_type):
+        raise EventSubRejected(403, "EventSubヘッダーがありません")
+
+    expected = compute_signature(secret, message_id, timestamp, body)
+    if not hmac.compare_digest(expected, signature):
+        raise EventSubRejected(403, "署名が一致しません")
+
+    try:
+        sent_at = parse_utc(timestamp)
+    except ValueError:
+        raise EventSubRejected(403, f"タイムスタンプが不正です: {timestamp}")
+    now = now or utcnow()
+    if abs(now - sent_at) > MAX_MESSAGE_AGE:
+        raise EventSubRejected(403, f"タイムスタンプが古すぎます: {timestamp}")
+
+    return message_id, message_type, sent_at
+
+
+def remember_message(cursor, message_id, subscription_type, now=None):
+    """
+    メッセージIDを記録し、初めて受信したものならTrueを返す（再送・リプレイはFalse）
+
+    保持期間を過ぎたIDはここで削除する（それより古い通知はタイムスタンプ検証で弾かれる）。
+    """
+    ensure_eventsub_tables(cursor)
+    now = now or utcnow()
+    cursor.execute("DELETE FROM eventsub_messages WHERE received_at < ?",
+                   (to_utc_iso(now - MESSAGE_RETENTION),))
+    cursor.execute("""
+        INSERT INTO eventsub_messages (message_id, subscription_type, received_at)
+        VALUES (?, ?, ?)
+        ON CONFLICT(message_id) DO NOTHING
+    """, (message_id, subscription_type, to_utc_iso(now)))
+    return cursor.rowcount > 0
+
+
+def enqueue_targeted_sync(cursor, broadcaster_id, reason, event_at):
+    """
+    チャンネルの直近VODを同期するジョブを積む
+
+    同じチャンネルの未処理ジョブがあれば新しく積まずに event_at だけ進める（連続した通知をまとめる）。
+    Returns: ジョブID
+    """
+    ensure_eventsub_tables(cursor)
+    event_iso = to_utc_iso(event_at)
+    cursor.execute("""
+        SELECT id FROM sync_queue
+        WHERE broadcaster_id = ? AND status = 'pending'
+        ORDER BY id LIMIT 1
+    """, (broadcaster_id,))
+    row = cursor.fetchone()
+    if row:
+        cursor.execute("""
+            UPDATE sync_queue SET event_at = MAX(event_at, ?), reason = ?
+            WHERE id = ?
+        """, (event_iso, reason, row[0]))
+        return row[0]
+
+    cursor.execute("""
+        INSERT INTO sync_queue (broadcaster_id, reason, event_at, status, created_at)
+        VALUES (?, ?, ?, 'pending', ?)
+    """, (broadcaster_id, reason, event_iso, to_utc_iso(utcnow())))
+    logger.info(f"対象を絞った同期をキューに追加: {broadcaster_id} ({reason})")
+    return cursor.lastrowid
+
+
+def handle_message(cursor, headers, body, secret, now=None):
+    """
+    受信した1件の通知を処理して (HTTPステータス, 本文, Content-Type) を返す
+
+    - webhook_callback_verification: challengeをそのまま返す
+    - notification: 登録済みチャンネルの対象の通知ならsync_queueに積む（再送は何もせず200）
+    - revocation: ログに残して200
+    コミットは呼び出し側で行う。
+    """
+    try:
+        message_id, message_type, sent_at = verify_message(headers, body, secret, now=now)
+    except EventSubRejected as e:
+        logger.warning(f"EventSub通知を拒否: {e}")
+        return e.status_code, str(e), 'text/plain; charset=utf-8'
+
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return 400, "JSONではありません", 'text/plain; charset=utf-8'
+    subscription_type = payload.get('subscription', {}).get('type', '')
+
+    if not remember_message(cursor, message_id, subscription_type, now=now):
+        logger.info(f"受信済みのEventSub通知を無視: {message_id}")
+        return 200, "duplicate", 'text/plain; charset=utf-8'
+
+    if message_type == 'webhook_callback_verification':
+        return 200, payload.get('challenge', ''), 'text/plain; charset=utf-8'
+
+    if message_type == 'revocation':
+        logger.warning(f"EventSubの購読が取り消されました: {subscription_type} "
+                       f"({payload.get('subscription', {}).get('status')})")
+        return 200, "ok", 'text/plain; charset=utf-8'
+
+    if message_type == 'notification' and subscription_type in SYNC_EVENT_TYPES:
+        event = payload.get('event', {})
+        broadcaster_id = event.get('broadcaster_user_id')
+        channel = get_channel(cursor, broadcaster_id=broadcaster_id) if broadcaster_id else None
+        if not channel or not channel['enabled']:
+            logger.info(f"同期対象外のチャンネルの通知を無視: {broadcaster_id}")
+            return 200, "ignored", 'text/plain; charset=utf-8'
+        job_id = enqueue_targeted_sync(cursor, broadcaster_id, subscription_type, sent_at)
+        return 202, json.dumps({"queued": job_id}), 'application/json'
+
+    return 200, "ignored", 'text/plain; charset=utf-8'
+
+
+def build_notification(secret, subscription_type, broadcaster_id, broadcaster_login='',
+                       message_type='notification', message_id=None, timestamp=None, event=None):
+    """
+    Twitchと同じ形式の署名付き通知を作る（ローカルの通知シミュレーター用）
+
+    Returns: (headers, body)
+    """
+    message_id = message_id or str(uuid.uuid4())
+    timestamp = timestamp or to_utc_iso(utcnow())
+    subscription = {
+        "id": str(uuid.uuid5(uuid.NAMESPACE_URL, f"{subscription_type}:{broadcaster_id}")),
+        "type": subscription_type,
+        "version": "2" if subscription_type == 'channel.update' else "1",
+        "status": "enabled",
+        "condition": {"broadcaster_user_id": broadcaster_id},
+        "transport": {"method": "webhook", "callback": "https://localhost/eventsub"},
+        "created_at": timestamp,
+    }
+    payload = {"subscription": subscription}
+    if message_type == 'webhook_callback_verification':
+        payload["challenge"] = uuid.uuid4().hex
+    else:
+        payload["event"] = dict({
+            "broadcaster_user_id": broadcaster_id,
+            "broadcaster_user_login": broadcaster_login,
+            "broadcaster_user_name": broadcaster_login,
+        }, **(event or {}))
+
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    headers = {
+        MESSAGE_ID_HEADER: message_id,
+        TIMESTAMP_HEADER: timestamp,
+        SIGNATURE_HEADER: compute_signature(secret, message_id, timestamp, body),
+        MESSAGE_TYPE_HEADER: message_type,
+        SUBSCRIPTION_TYPE_HEADER: subscription_type,
+        'Content-Type': 'application/json',
+    }
+    return headers, body
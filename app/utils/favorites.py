@@ -0,0 +1,63 @@
+"""
+favorites.py - 閲覧者ごとのお気に入りクリップ
+favorites テーブル（主キー: owner_token, clip_id）の読み書き。owner_token はブラウザのCookieに
+保存した識別子で、セッションが終わってもお気に入りが残る
+Streamlitに依存しないので、APIやエクスポートからも利用できる
+"""
+
+import re
+from datetime import datetime, timezone
+
+# secrets.token_urlsafe で作った形式の値だけを受け付ける（Cookieは書き換えられるため）
+OWNER_TOKEN_PATTERN = re.compile(r'^[A-Za-z0-9_-]{16,64}$')
+
+
+def is_valid_owner_token(token):
+    return bool(token) and bool(OWNER_TOKEN_PATTERN.match(token))
+
+
+def get_favorite_clip_ids(cursor, owner_token):
+    """お気に入りのクリップIDの集合（主キーの先頭列で引くだけ）"""
+    cursor.execute("SELECT clip_id FROM favorites WHERE owner_token = ?", (owner_token,))
+    return {row[0] for row in cursor.fetchall()}
+
+
+def set_favorite(cursor, owner_token, clip_id, favorite=True):
+    """お気に入りに追加・削除（すでにその状態なら何もしない）"""
+    if favorite:
+        cursor.execute("""
+            INSERT OR IGNORE INTO favorites (owner_token, clip_id, created_at)
+            VALUES (?, ?, ?)
+        """, (owner_token, clip_id, datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')))
+    else:
+        cursor.execute("DELETE FROM favorites WHERE owner_token = ? AND clip_id = ?", (owner_token, clip_id))
+    return cursor.rowcount > 0
+
+
+def add_favorites(cursor, owner_token, clip_ids):
+    """まとめて追加（セッションに残っていた古い形式のお気に入りの移行用）"""
+    now = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    cursor.executemany("""
+        INSERT OR IGNORE INTO favorites (owner_token, clip_id, created_at)
+        SELECT ?, id, ? FROM clips WHERE id = ?
+    """, [(owner_token, now, clip_id) for clip_id in clip_ids])
+
+
+def list_favorite_clips(cursor, owner_token):
+    """
+    お気に入りのクリップを追加が新しい順に取得（1回のクエリ）
+
+    Returns: [(id, title, url, thumbnail_url, created_at, vod_id, youtube_video_id)]
+    youtube_video_id は元VODに紐づくYouTube動画のID（サムネイルの代わりに使う）
+    """
+    cursor.execute("""
+        SELECT c.id, c.title, c.url, c.thumbnail_url, c.created_at, c.vod_id,
+               (SELECT yl.video_id FROM youtube_links yl
+                WHERE yl.vod_id = c.vod_id AND yl.video_id IS NOT NULL AND yl.video_id != ''
+                ORDER BY yl.id LIMIT 1)
+        FROM favorites f
+        JOIN clips c ON c.id = f.clip_id
+        WHERE f.owner_token = ?
+        ORDER BY f.created_at DESC, c.created_at DESC
+    """, (owner_token,))
+    return cursor.fetchall()
@@ -0,0 +1,89 @@
+"""
+games.py - ゲームIDからゲーム名への変換
+同期で保存されるcategoryはHelixのgame_idなので、gamesテーブルに名前をキャッシュし、
+一覧ページではJOINで名前を表示する
+"""
+
+import logging
+
+from app.utils.schema import ensure_games_table
+from app.utils.watermarks import to_utc_iso, utcnow
+
+logger = logging.getLogger(__name__)
+
+# /games に1回で渡せるIDの上限
+GAMES_BATCH_SIZE = 100
+
+
+def category_name_sql(alias):
+    """
+    SELECT句で使う表示用カテゴリの式（gamesを g としてJOINしている前提）
+
+    categoryがgame_idなら名前、それ以外（手入力のカテゴリ）はそのまま。
+    """
+    return f"COALESCE(g.name, {alias}.category)"
+
+
+def games_join_sql(alias):
+    """gamesテーブルをJOINする句"""
+    return f"LEFT JOIN games g ON g.id = {alias}.category"
+
+
+def find_unknown_game_ids(cursor):
+    """vods / clips のcategoryのうち、game_id形式（数字のみ）でgamesに未登録のものを返す"""
+    cursor.execute("""
+        SELECT DISTINCT category FROM (
+            SELECT category FROM vods
+            UNION
+            SELECT category FROM clips
+        )
+        WHERE category != ''
+          AND category NOT GLOB '*[^0-9]*'
+          AND category NOT IN (SELECT id FROM games)
+    """)
+    return [row[0] for row in cursor.fetchall()]
+
+
+def resolve_games(cursor, client, game_ids=None):
+    """
+    未キャッシュのgame_idを /games?id= でまとめて取得し、gamesテーブルに保存
+
+    game_ids を省略すると vods / clips から未登録のIDを探す。
+    Returns: {"requested": 問い合わせたID数, "resolved": 保存した件数, "requests": API呼び出し回数}
+    """
+    ensure_games_table(cursor)
+    if game_ids is None:
+        game_ids = find_unknown_game_ids(cursor)
+    else:
+        game_ids = sorted({str(g) for g in game_ids if g})
+        if game_ids:
+            placeholders = ', '.join('?' for _ in game_ids)
+            cursor.execute(f"SELECT id FROM games WHERE id IN ({placeholders})", game_ids)
+            cached = {row[0] for row in cursor.fetchall()}
+            game_ids = [g for g in game_ids if g not in cached]
+
+    resolved = 0
+    requests_made = 0
+    now = to_utc_iso(utcnow())
+    for i in range(0, len(game_ids), GAMES_BATCH_SIZE):
+        batch = game_ids[i:i + GAMES_BATCH_SIZE]
+        # 同じキーを繰り返して渡す（?id=1&id=2...）
+        data = client.get('games', [('id', game_id) for game_id in batch])
+        requests_made += 1
+        rows = [
+            (game['id'], game.get('name', ''), game.get('box_art_url', ''), now)
+            for game in data.get('data', [])
+        ]
+        cursor.executemany("""
+            INSERT INTO games (id, name, box_art_url, updated_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                name = excluded.name,
+                box_art_url = excluded.box_art_url,
+                updated_at = excluded.updated_at
+        """, rows)
+        resolved += len(rows)
+
+    if game_ids:
+        logger.info(f"ゲーム名を取得: {resolved}/{len(game_ids)}件 ({requests_made}リクエスト)")
+    return {"requested": len(game_ids), "resolved": resolved, "requests": requests_made}
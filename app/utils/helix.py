@@ -0,0 +1,246 @@
+"""
+helix.py - Twitch Helix APIの軽量クライアント
+Streamlitに依存しないので、バックフィルやCLIなどヘッドレス実行でも使える
+"""
+
+import logging
+import os
+import threading
+import time
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+HELIX_BASE_URL = "https://api.twitch.tv/helix"
+AUTH_URL = "https://id.twitch.tv/oauth2/token"
+
+
+def helix_base_url():
+    """Helix APIのベースURL（TWITCH_API_BASE_URL でローカルのシミュレーターなどに差し替え可能）"""
+    return os.getenv('TWITCH_API_BASE_URL') or HELIX_BASE_URL
+
+
+def auth_url():
+    """トークン取得のURL（TWITCH_AUTH_URL で差し替え可能）"""
+    return os.getenv('TWITCH_AUTH_URL') or AUTH_URL
+
+
+class HelixError(Exception):
+    """Helix APIがエラーを返した場合の例外"""
+
+    def __init__(self, status_code, message=""):
+        super().__init__(f"Helix API エラー: {status_code} {message}".strip())
+        self.status_code = status_code
+
+
+class RateBudget:
+    """
+    複数のクライアント（スレッド）で共有するレート制限の予算（トークンバケット）
+
+    Helixのアプリトークンは1分あたり800ポイント。レスポンスの Ratelimit-Remaining /
+    Ratelimit-Reset で実際の残りに合わせて補正する。
+    """
+
+    def __init__(self, points_per_minute=800):
+        self.capacity = float(points_per_minute)
+        self.rate = points_per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """1ポイント消費できるまで待つ。待った秒数を返す"""
+        waited = 0.0
+        while True:
+            with self.lock:
+                self._refill()
+                wait = max(self.blocked_until - time.time(), 0.0)
+                if wait == 0.0 and self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                if wait == 0.0:
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def update(self, remaining, reset_at):
+        """レスポンスヘッダーの残りポイントで予算を補正"""
+        with self.lock:
+            if remaining is not None:
+                self.tokens = min(self.tokens, float(remaining))
+                if float(remaining) < 1 and reset_at:
+                    self.blocked_until = max(self.blocked_until, float(reset_at))
+
+
+class RequestStats:
+    """リクエスト数・受信バイト数の集計（clone()したクライアント間で共有する）"""
+
+    def __init__(self):
+        self.calls = 0
+        self.bytes = 0
+        self.errors = 0
+        self.lock = threading.Lock()
+
+    def add(self, response):
+        with self.lock:
+            self.calls += 1
+            self.bytes += len(response.content or b'')
+            if response.status_code != 200:
+                self.errors += 1
+
+    def snapshot(self):
+        with self.lock:
+            return {"calls": self.calls, "bytes": self.bytes, "errors": self.errors}
+
+
+class HelixClient:
+    """
+    Helix APIクライアント
+
+    429はRatelimit-Resetまで待って、5xxは指数バックオフで再試行する。
+    on_throttle(待機秒数, ステータスコード) を設定すると待機の前に呼ばれる（進捗表示用）。
+    stats（RequestStats）を設定すると再試行を含む全リクエストを数える。
+    """
+
+    def __init__(self, client_id, access_token, base_url=HELIX_BASE_URL,
+                 timeout=30, max_retries=3, on_throttle=None, rate_budget=None, stats=None):
+        self.client_id = client_id
+        self.access_token = access_token
+        self.base_url = base_url.rstrip('/')
+        self.headers = {
+            'Client-ID': client_id,
+            'Authorization': f'Bearer {access_token}'
+        }
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.on_throttle = on_throttle
+        self.rate_budget = rate_budget
+        self.stats = stats
+        self.session = requests.Session()
+
+    def clone(self):
+        """
+        別スレッド用のクライアントを作成
+
+        requests.Sessionはスレッド間で共有しないため、セッションだけ分けて
+        レート予算（rate_budget）・on_throttle・stats は共有する。
+        """
+        return HelixClient(
+            self.client_id, self.access_token, base_url=self.base_url,
+            timeout=self.timeout, max_retries=self.max_retries,
+            on_throttle=self.on_throttle, rate_budget=self.rate_budget, stats=self.stats
+        )
+
+    def _wait(self, seconds, status_code):
+        if self.on_throttle:
+            self.on_throttle(seconds, status_code)
+        time.sleep(seconds)
+
+    def get(self, path, params=None):
+        """GETリクエストを送ってJSONを返す"""
+        url = f"{self.base_url}/{path.lstrip('/')}"
+
+        for attempt in range(self.max_retries + 1):
+            if self.rate_budget:
+                waited = self.rate_budget.acquire()
+                if waited >= 1.0 and self.on_throttle:
+                    self.on_throttle(waited, 'budget')
+
+            response = self.session.get(url, headers=self.headers, params=params, timeout=self.timeout)
+            if self.stats:
+                self.stats.add(response)
+
+            if self.rate_budget:
+                self.rate_budget.update(
+                    response.headers.get('Ratelimit-Remaining'),
+                    response.headers.get('Ratelimit-Reset')
+                )
+
+            if response.status_code == 200:
+                return response.json()
+
+            if attempt < self.max_retries and response.status_code == 429:
+                reset_at = response.headers.get('Ratelimit-Reset')
+                wait = max(float(reset_at) - time.time(), 1.0) if reset_at else 2 ** attempt
+                logger.warning(f"レート制限に到達: {wait:.1f}秒待機します")
+                self._wait(wait, response.status_code)
+                continue
+
+            if attempt < self.max_retries and response.status_code >= 500:
+                wait = 2 ** attempt
+                logger.warning(f"サーバーエラー {response.status_code}: {wait}秒後に再試行")
+                self._wait(wait, response.status_code)
+                continue
+
+            raise HelixError(response.status_code, response.text[:200])
+
+        raise HelixError(0, "再試行回数の上限に達しました")
+
+    def post(self, path, payload):
+        """POSTリクエスト（EventSubの購読作成など。再試行はしない）"""
+        if self.rate_budget:
+            self.rate_budget.acquire()
+        response = self.session.post(f"{self.base_url}/{path.lstrip('/')}", headers=self.headers,
+                                     json=payload, timeout=self.timeout)
+        if self.stats:
+            self.stats.add(response)
+        if response.status_code not in (200, 202):
+            raise HelixError(response.status_code, response.text[:200])
+        return response.json()
+
+
+def get_app_access_token(client_id, client_secret):
+    """Client Credentials Flowでアクセストークンを取得"""
+    response = requests.post(auth_url(), data={
+        'client_id': client_id,
+        'client_secret': client_secret,
+        'grant_type': 'client_credentials'
+    }, timeout=10)
+
+    if response.status_code != 200:
+        raise HelixError(response.status_code, "トークン取得失敗")
+    return response.json()['access_token']
+
+
+def create_client_from_env():
+    """
+    環境変数（.env）からクライアントと配信者IDを作成
+
+    Returns: (HelixClient, user_id)
+    """
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:
+        pass
+
+    client_id = os.getenv('TWITCH_CLIENT_ID')
+    client_secret = os.getenv('TWITCH_CLIENT_SECRET')
+    access_token = os.getenv('TWITCH_ACCESS_TOKEN')
+    channel_name = os.getenv('TWITCH_CHANNEL_NAME') or os.getenv('TWITCH_USER_LOGIN')
+    user_id = os.getenv('TWITCH_USER_ID')
+
+    if not client_id or not (access_token or client_secret):
+        raise ValueError("TWITCH_CLIENT_ID と TWITCH_CLIENT_SECRET を設定してください")
+
+    if not access_token:
+        access_token = get_app_access_token(client_id, client_secret)
+
+    client = HelixClient(client_id, access_token, base_url=helix_base_url())
+
+    if not user_id:
+        if not channel_name:
+            raise ValueError("TWITCH_CHANNEL_NAME または TWITCH_USER_ID を設定してください")
+        users = client.get('users', {'login': channel_name}).get('data', [])
+        if not users:
+            raise ValueError(f"チャンネル '{channel_name}' が見つかりません")
+        user_id = users[0]['id']
+
+    return client, user_id
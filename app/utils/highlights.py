@@ -0,0 +1,150 @@
+"""
+highlights.py - VODごとのクリップ密度（ハイライトタイムライン）
+クリップのvod_offset（配信開始からの秒数）を固定幅のバケットに集計し、
+VODごとに1行でvod_highlightsテーブルへ保存する。詳細ページはその1行を描画するだけ
+"""
+
+import json
+import logging
+import re
+
+from app.utils.schema import ensure_highlights_table
+from app.utils.watermarks import to_utc_iso, utcnow
+
+try:
+    import numpy as np
+except ImportError:  # numpyがない環境では純Pythonで集計する
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# バケット幅（秒）
+BUCKET_SECONDS = 120
+
+
+def parse_twitch_duration(value):
+    """Helixのduration（'3h2m10s' 形式）を秒に変換（不明ならNone）"""
+    if not value:
+        return None
+    match = re.fullmatch(r'(?:(\d+)h)?(?:(\d+)m)?(?:(\d+)s)?', str(value).strip())
+    if not match or not any(match.groups()):
+        return None
+    hours, minutes, seconds = (int(g or 0) for g in match.groups())
+    return hours * 3600 + minutes * 60 + seconds
+
+
+def bin_offsets(offsets, bucket_seconds=BUCKET_SECONDS, duration=None):
+    """vod_offsetの一覧をバケットごとの件数に集計"""
+    if not offsets:
+        return []
+    max_offset = max(offsets)
+    if duration and duration > max_offset:
+        max_offset = duration
+    bucket_count = int(max_offset // bucket_seconds) + 1
+
+    if np is not None:
+        buckets = np.asarray(offsets, dtype=np.int64) // bucket_seconds
+        return np.bincount(buckets, minlength=bucket_count).tolist()
+
+    counts = [0] * bucket_count
+    for offset in offsets:
+        counts[int(offset // bucket_seconds)] += 1
+    return counts
+
+
+def find_stale_vods(cursor):
+    """クリップ件数が保存済みのタイムラインと食い違うVODのIDを返す"""
+    cursor.execute("""
+        SELECT c.vod_id
+        FROM clips c
+        LEFT JOIN vod_highlights h ON h.vod_id = c.vod_id
+        WHERE c.vod_id IS NOT NULL AND c.vod_offset IS NOT NULL
+        GROUP BY c.vod_id
+        HAVING COUNT(*) != COALESCE(MAX(h.total_clips), -1)
+    """)
+    return [row[0] for row in cursor.fetchall()]
+
+
+def rebuild_highlights(cursor, vod_ids=None, bucket_seconds=BUCKET_SECONDS):
+    """
+    VODのハイライトタイムラインを再計算して保存
+
+    vod_ids を省略するとクリップ件数が変わったVODだけを対象にする。
+    Returns: 更新したVODの件数
+    """
+    ensure_highlights_table(cursor)
+    if vod_ids is None:
+        vod_ids = find_stale_vods(cursor)
+    if not vod_ids:
+        return 0
+
+    now = to_utc_iso(utcnow())
+    rows = []
+    for i in range(0, len(vod_ids), 500):
+        chunk = vod_ids[i:i + 500]
+        placeholders = ', '.join('?' for _ in chunk)
+        cursor.execute(f"SELECT id, duration FROM vods WHERE id IN ({placeholders})", chunk)
+        durations = {vod_id: parse_twitch_duration(duration) for vod_id, duration in cursor.fetchall()}
+
+        cursor.execute(f"""
+            SELECT vod_id, vod_offset FROM clips
+            WHERE vod_id IN ({placeholders}) AND vod_offset IS NOT NULL
+            ORDER BY vod_id
+        """, chunk)
+        offsets_by_vod = {}
+        for vod_id, offset in cursor.fetchall():
+            offsets_by_vod.setdefault(vod_id, []).append(offset)
+
+        for vod_id in chunk:
+            offsets = offsets_by_vod.get(vod_id, [])
+            counts = bin_offsets(offsets, bucket_seconds, durations.get(vod_id))
+            peak = max(range(len(counts)), key=counts.__getitem__) if counts else None
+            rows.append((
+                vod_id, bucket_seconds, json.dumps(counts), len(offsets),
+                peak * bucket_seconds if peak is not None else None, now
+            ))
+
+    cursor.executemany("""
+        INSERT INTO vod_highlights (vod_id, bucket_seconds, counts, total_clips, peak_offset, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(vod_id) DO UPDATE SET
+            bucket_seconds = excluded.bucket_seconds,
+            counts = excluded.counts,
+            total_clips = excluded.total_clips,
+            peak_offset = excluded.peak_offset,
+            updated_at = excluded.updated_at
+    """, rows)
+    logger.info(f"ハイライトタイムラインを更新: {len(rows)}件")
+    return len(rows)
+
+
+def load_highlights(cursor, vod_id):
+    """
+    詳細ページ用にVODのタイムラインを1行読み込む
+
+    Returns: {"bucket_seconds", "counts", "total_clips", "peak_offset"}（なければNone）
+    """
+    try:
+        cursor.execute("""
+            SELECT bucket_seconds, counts, total_clips, peak_offset
+            FROM vod_highlights WHERE vod_id = ?
+        """, (vod_id,))
+    except Exception:
+        return None
+    row = cursor.fetchone()
+    if not row:
+        return None
+    return {
+        "bucket_seconds": row[0],
+        "counts": json.loads(row[1] or '[]'),
+        "total_clips": row[2],
+        "peak_offset": row[3]
+    }
+
+
+def format_offset(seconds):
+    """秒をTwitchのタイムスタンプ形式（1h02m03s）に変換"""
+    seconds = int(seconds or 0)
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{hours}h{minutes:02d}m{secs:02d}s"
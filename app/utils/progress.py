@@ -0,0 +1,406 @@
+"""
+progress.py - 同期の進捗とメトリクスをsync_runsテーブルに書き出す
+同期プロセスが進捗を書き、UIは読むだけ。キャンセルはUIがフラグを立て、
+同期側がページの区切りで確認して中断する（それまでのコミットは残る）。
+終了時にはステージごとの所要時間・API呼び出し数・反映件数などを同じ行に残し、
+管理画面で同期速度の推移を確認できるようにする
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import timedelta
+
+from app.utils.schema import ensure_sync_runs_table
+from app.utils.watermarks import to_utc_iso, utcnow
+
+logger = logging.getLogger(__name__)
+
+# 進捗の書き込み間隔（秒）。ステージ変更や終了時は間隔に関係なく書き込む
+WRITE_INTERVAL = 1.0
+# キャンセル要求を確認する間隔（秒）
+CANCEL_CHECK_INTERVAL = 2.0
+# 実行中の行の updated_at を進める間隔（秒）。進捗の書き込みがない間も生きていることを示す
+HEARTBEAT_INTERVAL = 30.0
+# updated_at がこれより古い実行中の行は、プロセスが異常終了したものとして 'abandoned' にする
+RUN_STALE_AFTER = timedelta(minutes=5)
+# 実行履歴の保持期間（ただし直近 RUN_KEEP_MIN 件は期間に関係なく残す）
+RUN_RETENTION = timedelta(days=90)
+RUN_KEEP_MIN = 200
+# 1回の実行で保存するエラーメッセージの上限
+MAX_STORED_ERRORS = 20
+
+RUN_COLUMNS = [
+    'id', 'kind', 'status', 'stage', 'window_start', 'window_end', 'progress',
+    'pages', 'rows_merged', 'throttle_waits', 'throttle_seconds', 'message',
+    'cancel_requested', 'pid', 'started_at', 'updated_at', 'finished_at'
+]
+
+HISTORY_COLUMNS = [
+    'id', 'kind', 'status', 'started_at', 'finished_at', 'duration_seconds', 'stage_seconds',
+    'channel_seconds', 'pages', 'api_calls', 'api_bytes', 'rows_inserted', 'rows_updated',
+    'rows_linked', 'throttle_waits', 'throttle_seconds', 'error_count', 'errors'
+]
+METRIC_KEYS = ('api_calls', 'api_bytes', 'rows_inserted', 'rows_updated', 'rows_linked', 'errors')
+
+
+class SyncCancelled(Exception):
+    """キャンセル要求によって同期を中断した場合の例外"""
+
+
+class SyncProgress:
+    """
+    1回の同期の進捗を記録する
+
+    データ用とは別の接続（自動コミット）で書き込むので、
+    同期側のトランザクションがコミット前でもUIから進捗が見える。
+    チャンネルごとの並列同期では channels() で作ったビューを各ワーカーに渡す。
+    """
+
+    def __init__(self, db_path, kind='sync'):
+        self.kind = kind
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        ensure_sync_runs_table(self.conn.cursor())
+        expire_abandoned_runs(self.conn.cursor())
+        prune_sync_runs(self.conn.cursor())
+        self.state = {
+            'stage': None, 'window_start': None, 'window_end': None, 'progress': 0.0,
+            'pages': 0, 'rows_merged': 0, 'throttle_waits': 0, 'throttle_seconds': 0.0,
+            'message': None
+        }
+        now = to_utc_iso(utcnow())
+        cursor = self.conn.execute("""
+            INSERT INTO sync_runs (kind, status, pid, started_at, updated_at)
+            VALUES (?, 'running', ?, ?, ?)
+        """, (kind, os.getpid(), now, now))
+        self.run_id = cursor.lastrowid
+        self._stage_base = 0.0
+        self._stage_span = 0.0
+        self._last_write = 0.0
+        self._last_cancel_check = 0.0
+        self._channel_views = []
+        self._cancelled = False
+        # メトリクス（終了時にまとめて書き込む）
+        self.started = time.monotonic()
+        self.stage_seconds = {}
+        self.channel_seconds = {}
+        self.metrics = {}
+        self._current_stage = None
+        self._stage_started = self.started
+        # ワーカースレッドから同時に呼ばれるため、状態と接続の操作はこのロックの中で行う
+        self.lock = threading.RLock()
+        self._stop_heartbeat = threading.Event()
+        threading.Thread(target=self._heartbeat, name=f'sync-run-{self.run_id}', daemon=True).start()
+
+    def _heartbeat(self):
+        while not self._stop_heartbeat.wait(HEARTBEAT_INTERVAL):
+            with self.lock:
+                if self._stop_heartbeat.is_set():
+                    return
+                try:
+                    self.conn.execute("UPDATE sync_runs SET updated_at = ? WHERE id = ?",
+                                      (to_utc_iso(utcnow()), self.run_id))
+                except sqlite3.OperationalError as e:
+                    # 書き込みが混んでいるときは次の間隔で書く
+                    logger.debug(f"[run {self.run_id}] heartbeat: {e}")
+
+    def _write(self, force=False):
+        with self.lock:
+            if not force and time.monotonic() - self._last_write < WRITE_INTERVAL:
+                return
+            self._last_write = time.monotonic()
+            columns = list(self.state)
+            self.conn.execute(
+                f"UPDATE sync_runs SET {', '.join(f'{c} = ?' for c in columns)}, updated_at = ? WHERE id = ?",
+                [self.state[c] for c in columns] + [to_utc_iso(utcnow()), self.run_id]
+            )
+
+    def stage(self, name, progress=None, span=0.0):
+        """
+        ステージ（'vods:archive' / 'clips' など）の開始
+
+        progress はステージ開始時点の全体進捗、span はこのステージが占める割合。
+        """
+        with self.lock:
+            self._close_stage()
+            self._current_stage = name
+            self.state.update(stage=name, window_start=None, window_end=None)
+            if progress is not None:
+                self.state['progress'] = progress
+            self._stage_base = self.state['progress']
+            self._stage_span = span
+            logger.info(f"[run {self.run_id}] {name}")
+            self._write(force=True)
+
+    def _close_stage(self):
+        # 同じ名前のステージが複数回あれば合計する
+        now = time.monotonic()
+        if self._current_stage:
+            elapsed = self.stage_seconds.get(self._current_stage, 0.0) + now - self._stage_started
+            self.stage_seconds[self._current_stage] = round(elapsed, 3)
+        self._stage_started = now
+
+    def channels(self, labels, progress=None, span=0.0):
+        """
+        チャンネルごとの並列同期ステージを開始し、各チャンネル用の進捗ビューを返す
+
+        全体進捗はステージ開始時点 + span × 各チャンネルの進捗の平均。
+        """
+        with self.lock:
+            self.stage('channels', progress=progress, span=span)
+            self._channel_views = [ChannelProgress(self, label) for label in labels]
+            return list(self._channel_views)
+
+    def _channel_update(self, force=False, **state):
+        with self.lock:
+            self.state.update(state)
+            views = self._channel_views
+            if views:
+                mean = sum(view.fraction for view in views) / len(views)
+                self.state['progress'] = self._stage_base + mean * self._stage_span
+            self._write(force=force)
+
+    def window(self, start, end, fraction=None):
+        """処理中の期間（fraction はステージ内の進捗率）"""
+        with self.lock:
+            self.state.update(window_start=to_utc_iso(start), window_end=to_utc_iso(end))
+            if fraction is not None:
+                self.state['progress'] = self._stage_base + fraction * self._stage_span
+            self._write()
+
+    def page(self, rows_merged=0):
+        """1ページ分の取得・書き込みが終わった"""
+        with self.lock:
+            self.state['pages'] += 1
+            self.state['rows_merged'] += rows_merged
+            self._write()
+
+    def throttle(self, seconds, status_code=None):
+        """レート制限・サーバーエラーによる待機（HelixClient.on_throttle 用）"""
+        with self.lock:
+            self.state['throttle_waits'] += 1
+            self.state['throttle_seconds'] += seconds
+            self.state['message'] = f"{status_code} のため {seconds:.1f}秒待機中"
+            self._write(force=True)
+
+    def check_cancel(self):
+        """キャンセル要求があればSyncCancelledを送出（呼び出し側はコミット後に呼ぶ）"""
+        with self.lock:
+            if self._cancelled:
+                raise SyncCancelled(f"同期 #{self.run_id} はキャンセルされました")
+            if time.monotonic() - self._last_cancel_check < CANCEL_CHECK_INTERVAL:
+                return
+            self._last_cancel_check = time.monotonic()
+            row = self.conn.execute(
+                "SELECT cancel_requested FROM sync_runs WHERE id = ?", (self.run_id,)
+            ).fetchone()
+            if row and row[0]:
+                # 他のワーカーも次の確認で止まるように覚えておく
+                self._cancelled = True
+                raise SyncCancelled(f"同期 #{self.run_id} はキャンセルされました")
+
+    def record_metrics(self, **metrics):
+        """
+        実行のメトリクスを記録（finish() でまとめて書き込む）
+
+        キーは api_calls / api_bytes / rows_inserted / rows_updated / rows_linked / errors（リスト）。
+        """
+        with self.lock:
+            self.metrics.update((key, value) for key, value in metrics.items() if key in METRIC_KEYS)
+
+    def finish(self, status='completed', message=None):
+        """終了とメトリクスを記録して接続を閉じる"""
+        with self.lock:
+            self._stop_heartbeat.set()
+            if message is not None:
+                self.state['message'] = message
+            if status == 'completed':
+                self.state['progress'] = 1.0
+            self._close_stage()
+            self._current_stage = None
+            self._write(force=True)
+            errors = list(self.metrics.get('errors') or [])
+            self.conn.execute("""
+                UPDATE sync_runs SET status = ?, finished_at = ?, duration_seconds = ?,
+                    stage_seconds = ?, channel_seconds = ?, api_calls = ?, api_bytes = ?,
+                    rows_inserted = ?, rows_updated = ?, rows_linked = ?, error_count = ?, errors = ?
+                WHERE id = ?
+            """, (
+                status, to_utc_iso(utcnow()), round(time.monotonic() - self.started, 3),
+                json.dumps(self.stage_seconds, ensure_ascii=False),
+                json.dumps(self.channel_seconds, ensure_ascii=False),
+                self.metrics.get('api_calls', 0), self.metrics.get('api_bytes', 0),
+                self.metrics.get('rows_inserted', 0), self.metrics.get('rows_updated', 0),
+                self.metrics.get('rows_linked', 0), len(errors),
+                json.dumps(errors[:MAX_STORED_ERRORS], ensure_ascii=False) if errors else None,
+                self.run_id
+            ))
+            self.conn.close()
+
+
+class ChannelProgress:
+    """
+    並列同期の1チャンネル分の進捗ビュー（SyncProgressと同じ呼び出し方ができる）
+
+    ステージ名にチャンネル名を付け、進捗率はチャンネル内の値として親に渡す。
+    ページ数・待機・キャンセルは親の実行全体で共有する。
+    """
+
+    def __init__(self, parent, label):
+        self.parent = parent
+        self.label = label
+        self.fraction = 0.0
+        self._stage_base = 0.0
+        self._stage_span = 0.0
+        self.started = time.monotonic()
+
+    @property
+    def run_id(self):
+        return self.parent.run_id
+
+    def stage(self, name, progress=None, span=0.0):
+        if progress is not None:
+            self.fraction = progress
+        self._stage_base = self.fraction
+        self._stage_span = span
+        logger.info(f"[run {self.run_id}] {self.label}: {name}")
+        self.parent._channel_update(force=True, stage=f"{self.label}:{name}",
+                                    window_start=None, window_end=None)
+
+    def window(self, start, end, fraction=None):
+        if fraction is not None:
+            self.fraction = self._stage_base + fraction * self._stage_span
+        self.parent._channel_update(window_start=to_utc_iso(start), window_end=to_utc_iso(end))
+
+    def done(self):
+        """このチャンネルの同期が終わった（チャンネルごとの所要時間を記録）"""
+        self.fraction = 1.0
+        with self.parent.lock:
+            self.parent.channel_seconds[self.label] = round(time.monotonic() - self.started, 3)
+        self.parent._channel_update()
+
+    def page(self, rows_merged=0):
+        self.parent.page(rows_merged)
+
+    def throttle(self, seconds, status_code=None):
+        self.parent.throttle(seconds, status_code)
+
+    def check_cancel(self):
+        self.parent.check_cancel()
+
+
+def _row_to_run(row):
+    return dict(zip(RUN_COLUMNS, row)) if row else None
+
+
+def prune_sync_runs(cursor, retention=RUN_RETENTION, keep_min=RUN_KEEP_MIN):
+    """
+    保持期間を過ぎた実行履歴を削除（実行中の行と直近 keep_min 件は残す）
+
+    Returns: 削除した件数
+    """
+    cursor.execute("""
+        DELETE FROM sync_runs
+        WHERE started_at < ?
+          AND status != 'running'
+          AND id < (SELECT COALESCE(MIN(id), 0) FROM (SELECT id FROM sync_runs ORDER BY id DESC LIMIT ?))
+    """, (to_utc_iso(utcnow() - retention), keep_min))
+    if cursor.rowcount > 0:
+        logger.info(f"古い同期履歴を削除: {cursor.rowcount}件")
+    return max(cursor.rowcount, 0)
+
+
+def expire_abandoned_runs(cursor, stale_after=RUN_STALE_AFTER):
+    """
+    updated_at が stale_after より古い実行中の行を 'abandoned' にする
+
+    プロセスが異常終了（強制終了・OOMなど）すると finish() が呼ばれず 'running' のまま残るため。
+    実行中のプロセスは HEARTBEAT_INTERVAL ごとに updated_at を進めている。
+    Returns: 更新した件数
+    """
+    cursor.execute("""
+        UPDATE sync_runs
+        SET status = 'abandoned', finished_at = updated_at,
+            message = '応答がなくなったため中断とみなしました（プロセスの異常終了）'
+        WHERE status = 'running' AND updated_at < ?
+    """, (to_utc_iso(utcnow() - stale_after),))
+    if cursor.rowcount > 0:
+        logger.warning(f"応答のない同期を中断扱いにしました: {cursor.rowcount}件")
+    return max(cursor.rowcount, 0)
+
+
+def get_latest_run(db_path):
+    """
+    最新の実行を1件返す（UIのポーリング用。テーブルがなければNone）
+
+    応答のなくなった実行中の行は、ここで 'abandoned' にしてから返す。
+    """
+    if not os.path.exists(db_path):
+        return None
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    try:
+        query = f"SELECT {', '.join(RUN_COLUMNS)} FROM sync_runs ORDER BY id DESC LIMIT 1"
+        row = conn.execute(query).fetchone()
+        run = _row_to_run(row)
+        if run and run['status'] == 'running' and run['updated_at'] < to_utc_iso(utcnow() - RUN_STALE_AFTER):
+            expire_abandoned_runs(conn.cursor())
+            conn.commit()
+            row = conn.execute(query).fetchone()
+    except sqlite3.OperationalError:
+        row = None
+    finally:
+        conn.close()
+    return _row_to_run(row)
+
+
+def request_cancel(db_path, run_id):
+    """実行中の同期にキャンセルを要求（同期側が次のページ区切りで中断する）"""
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    try:
+        cursor = conn.execute(
+            "UPDATE sync_runs SET cancel_requested = 1 WHERE id = ? AND status = 'running'",
+            (run_id,)
+        )
+        conn.commit()
+        return cursor.rowcount > 0
+    finally:
+        conn.close()
+
+
+def get_run_history(db_path, limit=100, kinds=None):
+    """
+    終了した実行のメトリクスを古い順に返す（管理画面の推移グラフ用）
+
+    メトリクスのない 'abandoned' の行は含めない。stage_seconds / channel_seconds / errors はJSONを展開して返す。
+    """
+    if not os.path.exists(db_path):
+        return []
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    try:
+        where = "status NOT IN ('running', 'abandoned')"
+        params = []
+        if kinds:
+            where += f" AND kind IN ({', '.join('?' for _ in kinds)})"
+            params.extend(kinds)
+        rows = conn.execute(
+            f"SELECT {', '.join(HISTORY_COLUMNS)} FROM sync_runs WHERE {where} ORDER BY id DESC LIMIT ?",
+            params + [limit]
+        ).fetchall()
+    except sqlite3.OperationalError:
+        rows = []
+    finally:
+        conn.close()
+
+    history = []
+    for row in reversed(rows):
+        run = dict(zip(HISTORY_COLUMNS, row))
+        for key, default in (('stage_seconds', {}), ('channel_seconds', {}), ('errors', [])):
+            try:
+                run[key] = json.loads(run[key]) if run[key] else default
+            except ValueError:
+                run[key] = default
+        history.append(run)
+    return history
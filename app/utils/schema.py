@@ -0,0 +1,433 @@
+"""
+schema.py - SQLiteスキーマの作成とマイグレーション
+Streamlitに依存しないので、同期エンジンやCLIからも利用できる
+"""
+
+import logging
+
+from app.utils.data_version import ensure_data_versions
+
+logger = logging.getLogger(__name__)
+
+
+def get_table_columns(cursor, table_name):
+    """テーブルのカラム情報を取得"""
+    try:
+        cursor.execute(f"PRAGMA table_info({table_name})")
+        columns = [row[1] for row in cursor.fetchall()]
+        return columns
+    except Exception as e:
+        logger.error(f"テーブル情報取得エラー ({table_name}): {str(e)}")
+        return []
+
+
+def create_base_tables(cursor):
+    """vods / clips / youtube_links / sync_log を作成（既存テーブルはそのまま）"""
+    # vodsテーブル
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS vods (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            twitch_id TEXT UNIQUE,
+            title TEXT NOT NULL,
+            category TEXT,
+            url TEXT,
+            created_at TIMESTAMP,
+            type TEXT DEFAULT 'archive',
+            content_hash TEXT
+        )
+    """)
+
+    # clipsテーブル
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS clips (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            twitch_id TEXT UNIQUE,
+            title TEXT NOT NULL,
+            category TEXT,
+            url TEXT,
+            created_at TIMESTAMP,
+            vod_twitch_id TEXT,
+            vod_id INTEGER,
+            thumbnail_url TEXT,
+            content_hash TEXT,
+            FOREIGN KEY (vod_id) REFERENCES vods (id)
+        )
+    """)
+
+    # youtube_linksテーブル
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS youtube_links (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            vod_id INTEGER,
+            url TEXT NOT NULL,
+            title TEXT,
+            video_id TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (vod_id) REFERENCES vods (id)
+        )
+    """)
+
+    # sync_logテーブル（種類ごとの最終同期。実行ごとの履歴はsync_runsに残す）
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sync_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            sync_type TEXT NOT NULL,
+            last_sync_time TEXT NOT NULL,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    ensure_sync_log_unique(cursor)
+
+
+def ensure_sync_log_unique(cursor):
+    """
+    sync_logを種類ごとに1行にする
+
+    以前は同期のたびに行を追加していたため際限なく増えていた。
+    最新の行だけを残してから sync_type に一意インデックスを張る。
+    """
+    cursor.execute("""
+        SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_sync_log_type'
+    """)
+    if cursor.fetchone():
+        return
+    cursor.execute("""
+        DELETE FROM sync_log
+        WHERE id NOT IN (SELECT MAX(id) FROM sync_log GROUP BY sync_type)
+    """)
+    if cursor.rowcount > 0:
+        logger.info(f"sync_logの古い行を削除: {cursor.rowcount}件")
+    cursor.execute("DROP INDEX IF EXISTS idx_sync_log_type_created")
+    cursor.execute("CREATE UNIQUE INDEX idx_sync_log_type ON sync_log (sync_type)")
+    # 最終同期の表示は created_at の降順で1件だけ読む
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sync_log_created ON sync_log (created_at)")
+
+
+def migrate_database_if_needed(cursor):
+    """データベースのマイグレーション（既存構造に必要なカラムを追加）"""
+    try:
+        # vodsテーブルのカラムチェック・追加
+        vods_columns = get_table_columns(cursor, 'vods')
+        logger.info(f"既存のvodsカラム: {vods_columns}")
+
+        if 'duration' not in vods_columns:
+            logger.info("vodsテーブルにdurationカラムを追加中...")
+            cursor.execute("ALTER TABLE vods ADD COLUMN duration TEXT")
+
+        if 'view_count' not in vods_columns:
+            logger.info("vodsテーブルにview_countカラムを追加中...")
+            cursor.execute("ALTER TABLE vods ADD COLUMN view_count INTEGER DEFAULT 0")
+
+        if 'game_name' not in vods_columns:
+            logger.info("vodsテーブルにgame_nameカラムを追加中...")
+            cursor.execute("ALTER TABLE vods ADD COLUMN game_name TEXT")
+
+        if 'thumbnail_url' not in vods_columns:
+            logger.info("vodsテーブルにthumbnail_urlカラムを追加中...")
+            cursor.execute("ALTER TABLE vods ADD COLUMN thumbnail_url TEXT")
+
+        if 'content_hash' not in vods_columns:
+            logger.info("vodsテーブルにcontent_hashカラムを追加中...")
+            cursor.execute("ALTER TABLE vods ADD COLUMN content_hash TEXT")
+
+        # clipsテーブルのカラムチェック・追加
+        clips_columns = get_table_columns(cursor, 'clips')
+        logger.info(f"既存のclipsカラム: {clips_columns}")
+
+        if 'duration' not in clips_columns:
+            logger.info("clipsテーブルにdurationカラムを追加中...")
+            cursor.execute("ALTER TABLE clips ADD COLUMN duration REAL")
+
+        if 'view_count' not in clips_columns:
+            logger.info("clipsテーブルにview_countカラムを追加中...")
+            cursor.execute("ALTER TABLE clips ADD COLUMN view_count INTEGER DEFAULT 0")
+
+        if 'game_name' not in clips_columns:
+            logger.info("clipsテーブルにgame_nameカラムを追加中...")
+            cursor.execute("ALTER TABLE clips ADD COLUMN game_name TEXT")
+
+        if 'creator_name' not in clips_columns:
+            logger.info("clipsテーブルにcreator_nameカラムを追加中...")
+            cursor.execute("ALTER TABLE clips ADD COLUMN creator_name TEXT")
+
+        if 'content_hash' not in clips_columns:
+            logger.info("clipsテーブルにcontent_hashカラムを追加中...")
+            cursor.execute("ALTER TABLE clips ADD COLUMN content_hash TEXT")
+
+        if 'vod_offset' not in clips_columns:
+            logger.info("clipsテーブルにvod_offsetカラムを追加中...")
+            cursor.execute("ALTER TABLE clips ADD COLUMN vod_offset INTEGER")
+
+        # 配信者（チャンネル）ID。複数チャンネルの取り込みで一覧をチャンネルごとに絞り込む
+        if 'broadcaster_id' not in vods_columns:
+            logger.info("vodsテーブルにbroadcaster_idカラムを追加中...")
+            cursor.execute("ALTER TABLE vods ADD COLUMN broadcaster_id TEXT")
+
+        if 'broadcaster_id' not in clips_columns:
+            logger.info("clipsテーブルにbroadcaster_idカラムを追加中...")
+            cursor.execute("ALTER TABLE clips ADD COLUMN broadcaster_id TEXT")
+
+        # 一覧のキーセット（created_at, id の降順）は素の created_at で比べてインデックスで読む。
+        # NULLは比較から漏れるので、並び順の変わらない ''（どの日時よりも前）にそろえておく
+        for table in ('vods', 'clips'):
+            cursor.execute(f"UPDATE {table} SET created_at = '' WHERE created_at IS NULL")
+            if cursor.rowcount > 0:
+                logger.info(f"{table}の created_at が空の行を '' にそろえました: {cursor.rowcount}件")
+
+        # 一覧（新しい順）とチャンネル別一覧用。(broadcaster_id, created_at) は id まで含めたものに置き換える
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_vods_created_id ON vods (created_at, id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_clips_created_id ON clips (created_at, id)")
+        cursor.execute("DROP INDEX IF EXISTS idx_vods_broadcaster_created")
+        cursor.execute("DROP INDEX IF EXISTS idx_clips_broadcaster_created")
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_vods_broadcaster_created_id ON vods (broadcaster_id, created_at, id)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_clips_broadcaster_created_id ON clips (broadcaster_id, created_at, id)"
+        )
+
+        # VOD詳細ページでのクリップ一覧・タイムライン集計用
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_clips_vod_offset ON clips (vod_id, vod_offset)")
+
+        logger.info("データベースマイグレーション完了")
+
+    except Exception as e:
+        logger.error(f"データベースマイグレーションエラー: {str(e)}")
+
+
+def ensure_checkpoint_table(cursor):
+    """バックフィル用のチェックポイントテーブルを作成"""
+    # stream: 'vods:archive:<broadcaster_id>' / 'clips:<broadcaster_id>' など
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sync_checkpoints (
+            stream TEXT PRIMARY KEY,
+            cursor TEXT,
+            window_start TEXT,
+            window_end TEXT,
+            range_end TEXT,
+            pages INTEGER DEFAULT 0,
+            rows INTEGER DEFAULT 0,
+            status TEXT DEFAULT 'running',
+            updated_at TEXT
+        )
+    """)
+
+
+def ensure_watermark_table(cursor):
+    """差分同期用の最終取得位置（ハイウォーターマーク）テーブルを作成"""
+    # high_water はUTCのISO形式（'YYYY-MM-DDTHH:MM:SSZ'）で保存する
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sync_watermarks (
+            stream TEXT PRIMARY KEY,
+            high_water TEXT NOT NULL,
+            updated_at TEXT
+        )
+    """)
+
+
+# sync_runsに後から追加したメトリクスのカラム
+SYNC_RUN_METRIC_COLUMNS = {
+    'duration_seconds': 'REAL',
+    'stage_seconds': 'TEXT',
+    'channel_seconds': 'TEXT',
+    'api_calls': 'INTEGER DEFAULT 0',
+    'api_bytes': 'INTEGER DEFAULT 0',
+    'rows_inserted': 'INTEGER DEFAULT 0',
+    'rows_updated': 'INTEGER DEFAULT 0',
+    'rows_linked': 'INTEGER DEFAULT 0',
+    'error_count': 'INTEGER DEFAULT 0',
+    'errors': 'TEXT',
+}
+
+
+def ensure_sync_runs_table(cursor):
+    """
+    同期の実行状況（進捗・キャンセル要求）と実行ごとのメトリクスを記録するテーブルを作成
+
+    stage_seconds / channel_seconds / errors はJSON。
+    """
+    # status: 'running' / 'completed' / 'failed' / 'cancelled' / 'abandoned'（応答がなくなった）
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sync_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'running',
+            stage TEXT,
+            window_start TEXT,
+            window_end TEXT,
+            progress REAL DEFAULT 0,
+            pages INTEGER DEFAULT 0,
+            rows_merged INTEGER DEFAULT 0,
+            throttle_waits INTEGER DEFAULT 0,
+            throttle_seconds REAL DEFAULT 0,
+            message TEXT,
+            cancel_requested INTEGER DEFAULT 0,
+            pid INTEGER,
+            started_at TEXT,
+            updated_at TEXT,
+            finished_at TEXT
+        )
+    """)
+    columns = get_table_columns(cursor, 'sync_runs')
+    for column, column_type in SYNC_RUN_METRIC_COLUMNS.items():
+        if column not in columns:
+            cursor.execute(f"ALTER TABLE sync_runs ADD COLUMN {column} {column_type}")
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_sync_runs_status
+        ON sync_runs (status, id)
+    """)
+    # 種類別の推移グラフ用
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_sync_runs_kind
+        ON sync_runs (kind, id)
+    """)
+    # 保持期間を過ぎた実行の削除用
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_sync_runs_started
+        ON sync_runs (started_at)
+    """)
+
+
+def ensure_games_table(cursor):
+    """game_id → ゲーム名のキャッシュテーブルを作成"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS games (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            box_art_url TEXT,
+            updated_at TEXT
+        )
+    """)
+
+
+def ensure_highlights_table(cursor):
+    """VODごとのクリップ密度（ハイライトタイムライン）テーブルを作成"""
+    # counts はバケットごとのクリップ数のJSON配列
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS vod_highlights (
+            vod_id INTEGER PRIMARY KEY,
+            bucket_seconds INTEGER NOT NULL,
+            counts TEXT NOT NULL,
+            total_clips INTEGER DEFAULT 0,
+            peak_offset INTEGER,
+            updated_at TEXT,
+            FOREIGN KEY (vod_id) REFERENCES vods (id)
+        )
+    """)
+
+
+def ensure_channels_table(cursor):
+    """取り込み対象のチャンネル（配信者）テーブルを作成"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS channels (
+            broadcaster_id TEXT PRIMARY KEY,
+            login TEXT UNIQUE,
+            display_name TEXT,
+            enabled INTEGER DEFAULT 1,
+            added_at TEXT
+        )
+    """)
+
+
+def ensure_eventsub_tables(cursor):
+    """EventSub受信用のテーブル（受信済みメッセージ・対象を絞った同期のキュー）を作成"""
+    # 再送・リプレイ検出用。一定期間より古い行は受信時に削除する
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS eventsub_messages (
+            message_id TEXT PRIMARY KEY,
+            subscription_type TEXT,
+            received_at TEXT NOT NULL
+        )
+    """)
+    # status: 'pending' / 'running' / 'done' / 'failed'
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sync_queue (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            broadcaster_id TEXT NOT NULL,
+            reason TEXT NOT NULL,
+            event_at TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER DEFAULT 0,
+            message TEXT,
+            created_at TEXT,
+            started_at TEXT,
+            finished_at TEXT
+        )
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_sync_queue_status
+        ON sync_queue (status, broadcaster_id)
+    """)
+
+
+def ensure_youtube_match_table(cursor):
+    """YouTubeエクスポートの一括マッチングで自動確定しなかった候補（管理者の確認待ち）"""
+    # status: 'pending' / 'accepted' / 'rejected'
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS youtube_match_queue (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            video_id TEXT NOT NULL UNIQUE,
+            title TEXT,
+            published_at TEXT,
+            vod_id INTEGER,
+            score REAL,
+            title_score REAL,
+            date_score REAL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            created_at TEXT,
+            decided_at TEXT,
+            FOREIGN KEY (vod_id) REFERENCES vods (id)
+        )
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_youtube_match_queue_status
+        ON youtube_match_queue (status, score)
+    """)
+    # 登録済みの動画を除外するための検索用
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_youtube_links_video_id
+        ON youtube_links (video_id)
+    """)
+
+
+def ensure_favorites_table(cursor):
+    """閲覧者ごとのお気に入りクリップ（owner_token はブラウザのCookieに保存した識別子）"""
+    # 主キーが (owner_token, clip_id) なので、1人分の一覧・判定はこのインデックスだけで引ける
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS favorites (
+            owner_token TEXT NOT NULL,
+            clip_id INTEGER NOT NULL,
+            created_at TEXT,
+            PRIMARY KEY (owner_token, clip_id),
+            FOREIGN KEY (clip_id) REFERENCES clips (id)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_favorites_clip
+        ON favorites (clip_id)
+    """)
+    # クリップを削除したらお気に入りからも外す（同期エンジン・管理画面のどちらから削除しても）
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_clips_delete_favorites
+        AFTER DELETE ON clips
+        BEGIN
+            DELETE FROM favorites WHERE clip_id = OLD.id;
+        END
+    """)
+
+
+def ensure_sync_schema(cursor):
+    """同期エンジンに必要なテーブル・カラムをすべて用意"""
+    create_base_tables(cursor)
+    migrate_database_if_needed(cursor)
+    ensure_checkpoint_table(cursor)
+    ensure_watermark_table(cursor)
+    ensure_sync_runs_table(cursor)
+    ensure_games_table(cursor)
+    ensure_highlights_table(cursor)
+    ensure_channels_table(cursor)
+    ensure_eventsub_tables(cursor)
+    ensure_youtube_match_table(cursor)
+    ensure_favorites_table(cursor)
+    # トリガーは対象テーブルがそろってから作る
+    ensure_data_versions(cursor)
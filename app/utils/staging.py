@@ -0,0 +1,167 @@
+"""
+staging.py - TEMPステージングテーブル経由の取り込み
+取得したページは接続ごとのTEMPテーブルに貯めるだけで本テーブルには触れない。
+全ページの取得後、1回の短いトランザクションで vods / clips へのアップサート、
+クリップの紐づけ、派生カラム（ハイライト）の更新をまとめて行う
+"""
+
+import logging
+import threading
+
+from app.utils.bulk_writer import (
+    VOD_FIELDS, CLIP_FIELDS, VOD_MUTABLE_FIELDS, CLIP_MUTABLE_FIELDS,
+    VOD_CHANGED_WHERE, CLIP_CHANGED_WHERE, relink_clips
+)
+from app.utils.highlights import rebuild_highlights
+
+logger = logging.getLogger(__name__)
+
+
+class StagingArea:
+    """
+    取り込み中のVOD・クリップを貯めるTEMPテーブルと、その一括反映
+
+    TEMPテーブルは接続専用のデータベースに作られるので、append() の間は本テーブルの
+    ロックを取らない（ページごとにコミットして読み取りロックも残さない）。
+    複数のワーカースレッドから append() してよい。merge() はコミットしないので、
+    呼び出し側がウォーターマークの更新などを同じトランザクションに含めてからコミットする。
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.lock = threading.Lock()
+        self.tables = {}
+
+    def define(self, table, fields, update_columns=None, update_where=None, update_expressions=None):
+        """
+        ステージするテーブルと反映ルールを登録（BulkUpserterと同じ指定方法）
+
+        update_where / update_expressions では本テーブルの行をテーブル名、ステージした行を
+        excluded で参照する（BulkUpserterと同じ式がそのまま使える）。
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(f"PRAGMA main.table_info({table})")
+        existing = {row[1] for row in cursor.fetchall()}
+        columns = [f for f in fields if f in existing]
+        update_columns = [c for c in (update_columns or []) if c in columns]
+
+        assignments = [f"{c} = excluded.{c}" for c in update_columns]
+        # 値が変わらない更新は行わない（件数にも数えない）
+        differs = [f"{table}.{c} IS NOT excluded.{c}" for c in update_columns]
+        for column, expression in (update_expressions or {}).items():
+            if column in columns and column not in update_columns:
+                assignments.append(f"{column} = {expression}")
+                differs.append(f"{table}.{column} IS NOT ({expression})")
+
+        stage = f"stage_{table}"
+        column_sql = ', '.join(columns)
+        other_columns = ', '.join(c for c in columns if c != 'twitch_id')
+        cursor.execute(f"DROP TABLE IF EXISTS temp.{stage}")
+        cursor.execute(f"CREATE TEMP TABLE {stage} (twitch_id TEXT PRIMARY KEY, {other_columns})")
+        self.conn.commit()
+
+        # チャンネル別の件数を返せるよう、反映はチャンネルごとに行う
+        # （SELECT付きのUPSERTは構文の曖昧さを避けるため WHERE が必要）
+        by_broadcaster = 'broadcaster_id' in columns
+        merge_sql = (
+            f"INSERT INTO main.{table} ({column_sql}) "
+            f"SELECT {column_sql} FROM temp.{stage} WHERE {'broadcaster_id IS ?' if by_broadcaster else 'true'} "
+            f"ON CONFLICT(twitch_id)"
+        )
+        self.tables[table] = {
+            "stage": stage,
+            "columns": columns,
+            "by_broadcaster": by_broadcaster,
+            "stage_sql": f"INSERT OR REPLACE INTO temp.{stage} ({column_sql}) VALUES ({', '.join('?' for _ in columns)})",
+            # 1回目: 新しい行だけを追加する
+            "insert_sql": f"{merge_sql} DO NOTHING",
+            # 2回目: 既存の行を更新する（1回目で追加した行は値が同じなので条件に合わず、触れない）
+            "update_sql": (
+                f"{merge_sql} DO UPDATE SET {', '.join(assignments)} WHERE {update_where or ' OR '.join(differs)}"
+                if assignments else None
+            ),
+        }
+
+    def append(self, table, records):
+        """ページ分のレコードをステージ（同一twitch_idは後勝ち）。ステージした件数を返す"""
+        spec = self.tables[table]
+        rows = [tuple(r.get(c) for c in spec["columns"]) for r in records if r.get('twitch_id')]
+        if not rows:
+            return 0
+        with self.lock:
+            self.conn.executemany(spec["stage_sql"], rows)
+            self.conn.commit()
+        return len(rows)
+
+    def staged_count(self, table):
+        with self.lock:
+            return self.conn.execute(f"SELECT COUNT(*) FROM temp.{self.tables[table]['stage']}").fetchone()[0]
+
+    def _merge_table(self, cursor, table):
+        spec = self.tables[table]
+        stage = spec["stage"]
+        if spec["by_broadcaster"]:
+            cursor.execute(f"SELECT DISTINCT broadcaster_id FROM temp.{stage}")
+            groups = [(row[0],) for row in cursor.fetchall()]
+        else:
+            groups = [()]
+
+        # 追加と更新の2回のアップサートで、それぞれの changes()（rowcount）をそのまま件数にする
+        # （BulkUpserterと同じ。トリガーでの変更は含まない）
+        by_broadcaster = {}
+        for params in groups:
+            cursor.execute(spec["insert_sql"], params)
+            inserted = max(cursor.rowcount, 0)
+            updated = 0
+            if spec["update_sql"]:
+                cursor.execute(spec["update_sql"], params)
+                updated = max(cursor.rowcount, 0)
+            key = (params[0] if params else None) or ''
+            counts = by_broadcaster.setdefault(key, {"inserted": 0, "updated": 0})
+            counts["inserted"] += inserted
+            counts["updated"] += updated
+
+        cursor.execute(f"DELETE FROM temp.{stage}")
+        return {
+            "inserted": sum(v["inserted"] for v in by_broadcaster.values()),
+            "updated": sum(v["updated"] for v in by_broadcaster.values()),
+            "by_broadcaster": by_broadcaster,
+        }
+
+    def merge(self, rebuild=True):
+        """
+        ステージした行を本テーブルへ反映（コミットはしない）
+
+        BEGIN IMMEDIATEで書き込みロックを先に取り、アップサート・紐づけ・ハイライト更新を
+        続けて行う。ネットワーク待ちはこの中に入らないので、ロックを持つ時間は短い。
+        Returns: {"vods": {...}, "clips": {...}, "linked", "highlights"}
+        """
+        with self.lock:
+            cursor = self.conn.cursor()
+            if self.conn.in_transaction:
+                self.conn.commit()
+            cursor.execute("BEGIN IMMEDIATE")
+            result = {}
+            # VODを先に反映してからクリップを紐づける
+            for table in ('vods', 'clips'):
+                if table in self.tables:
+                    result[table] = self._merge_table(cursor, table)
+            result['linked'] = relink_clips(cursor)
+            result['highlights'] = rebuild_highlights(cursor) if rebuild else 0
+            logger.info(
+                "ステージングを反映: " + ", ".join(
+                    f"{table} 追加{stats['inserted']}件/更新{stats['updated']}件"
+                    for table, stats in result.items() if isinstance(stats, dict)
+                ) + f", 紐づけ{result['linked']}件"
+            )
+            return result
+
+
+def create_sync_staging(conn):
+    """同期エンジン用の標準ルール（content_hashが変わった行だけ更新）でステージングを用意"""
+    staging = StagingArea(conn)
+    staging.define('vods', VOD_FIELDS, update_columns=VOD_MUTABLE_FIELDS + ['content_hash'],
+                   update_where=VOD_CHANGED_WHERE)
+    staging.define('clips', CLIP_FIELDS, update_columns=CLIP_MUTABLE_FIELDS + ['content_hash'],
+                   update_where=CLIP_CHANGED_WHERE)
+    return staging
@@ -0,0 +1,428 @@
+"""
+static_export.py - アーカイブ全体を静的サイト（HTML / JSON）として書き出す
+Videos・Clipsの一覧、すべてのVOD・クリップの詳細ページ、検索用のJSONインデックスを
+ディレクトリに出力する。閲覧だけなら任意の静的ファイルホストで配信できる
+
+書き出しは差分のみ:
+  - 前回のデータバージョン（ウォーターマーク）から変わっていなければ何もしない
+  - 変わっていれば、ページごとに元データのハッシュを前回と比べ、変わったページだけ描画して書き直す
+  - なくなったVOD・クリップのページは削除する
+
+使い方:
+    python -m app.utils.static_export --out public
+    python -m app.utils.static_export --out public --full     # すべて書き直す
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import math
+import os
+import sqlite3
+import sys
+import tempfile
+from html import escape
+
+from app.utils.data_version import get_data_versions
+from app.utils.highlights import format_offset
+from app.utils.schema import ensure_sync_schema
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = "vods.db"
+# 出力が依存するテーブル（ウォーターマークとして状態ファイルに残す）
+EXPORT_TABLES = ('vods', 'clips', 'youtube_links', 'games', 'vod_highlights')
+STATE_FILE = '.export-state.json'
+# テンプレートを変えたら上げる（全ページを描画し直す）
+TEMPLATE_VERSION = 1
+PAGE_SIZE = 60
+SEARCH_INDEX = 'search-index.json'
+
+STYLE = """
+body { font-family: -apple-system, "Segoe UI", "Hiragino Sans", Meiryo, sans-serif; margin: 0; color: #262730; }
+header { padding: 12px 24px; border-bottom: 1px solid #e0e0e0; display: flex; gap: 16px; align-items: center; }
+header a { color: #1f77b4; text-decoration: none; font-weight: bold; }
+main { padding: 16px 24px; max-width: 1400px; margin: 0 auto; }
+.grid { display: grid; grid-template-columns: repeat(4, minmax(0, 1fr)); gap: 16px; }
+@media (max-width: 900px) { .grid { grid-template-columns: repeat(2, minmax(0, 1fr)); } }
+.card { display: block; color: inherit; text-decoration: none; border: 1px solid #e0e0e0; border-radius: 8px; overflow: hidden; }
+.card:hover { box-shadow: 0 3px 6px rgba(0,0,0,0.15); }
+.thumb { width: 100%; aspect-ratio: 16 / 9; background: #f0f0f0; display: flex; align-items: center; justify-content: center; color: #666; }
+.thumb img { width: 100%; height: 100%; object-fit: cover; display: block; }
+.card-body { padding: 8px 12px; }
+.title { font-weight: bold; color: #1f77b4; margin-bottom: 4px; overflow-wrap: anywhere; }
+.meta { color: #666; font-size: 12px; }
+.tag { display: inline-block; background: #f0f2f6; padding: 2px 6px; margin: 2px 2px 0 0; border-radius: 3px; font-size: 11px; }
+.pager { display: flex; gap: 12px; justify-content: center; margin: 20px 0; }
+.clip-list { list-style: none; padding: 0; }
+.clip-list li { padding: 6px 0; border-bottom: 1px solid #f0f0f0; }
+.timeline { display: flex; align-items: flex-end; gap: 1px; height: 60px; margin: 8px 0; }
+.timeline span { flex: 1; background: #9146ff; min-height: 1px; }
+#results li { margin: 4px 0; }
+"""
+
+SEARCH_SCRIPT = """
+<script>
+(function () {
+    var input = document.getElementById("q");
+    var list = document.getElementById("results");
+    var index = null;
+    function render() {
+        var q = input.value.trim().toLowerCase();
+        list.innerHTML = "";
+        if (!q || !index) { return; }
+        var hits = [];
+        index.vods.forEach(function (v) {
+            if (v[1].toLowerCase().indexOf(q) >= 0) { hits.push(["vod", v]); }
+        });
+        index.clips.forEach(function (c) {
+            if (c[1].toLowerCase().indexOf(q) >= 0) { hits.push(["clip", c]); }
+        });
+        hits.slice(0, 100).forEach(function (hit) {
+            var li = document.createElement("li");
+            var a = document.createElement("a");
+            a.href = hit[0] + "/" + hit[1][0] + ".html";
+            a.textContent = (hit[0] === "vod" ? "📺 " : "✂️ ") + hit[1][1] + " (" + (hit[1][2] || "").slice(0, 10) + ")";
+            li.appendChild(a);
+            list.appendChild(li);
+        });
+    }
+    fetch("search-index.json").then(function (r) { return r.json(); }).then(function (data) {
+        index = data;
+        render();
+    });
+    input.addEventListener("input", render);
+})();
+</script>
+"""
+
+
+def load_archive(cursor):
+    """
+    書き出しに必要な行をまとめて読み込む（テーブルごとに1クエリ）
+
+    Returns: {"vods": [...], "clips": [...], "links": {vod_id: [...]}, "highlights": {vod_id: {...}}}
+    """
+    cursor.execute("""
+        SELECT v.id, v.title, COALESCE(g.name, v.category), v.created_at, v.url
+        FROM vods v LEFT JOIN games g ON g.id = v.category
+        ORDER BY v.created_at DESC, v.id DESC
+    """)
+    vods = [
+        {"id": row[0], "title": row[1] or "", "category": row[2], "created_at": row[3], "url": row[4]}
+        for row in cursor.fetchall()
+    ]
+
+    links = {}
+    cursor.execute("SELECT vod_id, url, title, video_id FROM youtube_links WHERE vod_id IS NOT NULL ORDER BY id")
+    for vod_id, url, title, video_id in cursor.fetchall():
+        links.setdefault(vod_id, []).append({"url": url, "title": title, "video_id": video_id})
+
+    cursor.execute("""
+        SELECT c.id, c.title, COALESCE(g.name, NULLIF(c.category, ''), v.category), c.created_at,
+               c.url, c.thumbnail_url, c.vod_id, c.vod_offset
+        FROM clips c
+        LEFT JOIN vods v ON v.id = c.vod_id
+        LEFT JOIN games g ON g.id = COALESCE(NULLIF(c.category, ''), v.category)
+        ORDER BY c.created_at DESC, c.id DESC
+    """)
+    clips = [
+        {"id": row[0], "title": row[1] or "", "category": row[2], "created_at": row[3], "url": row[4],
+         "thumbnail_url": row[5], "vod_id": row[6], "vod_offset": row[7]}
+        for row in cursor.fetchall()
+    ]
+
+    highlights = {}
+    cursor.execute("SELECT vod_id, bucket_seconds, counts, total_clips, peak_offset FROM vod_highlights")
+    for vod_id, bucket_seconds, counts, total_clips, peak_offset in cursor.fetchall():
+        highlights[vod_id] = {
+            "bucket_seconds": bucket_seconds, "counts": json.loads(counts or '[]'),
+            "total_clips": total_clips, "peak_offset": peak_offset
+        }
+    return {"vods": vods, "clips": clips, "links": links, "highlights": highlights}
+
+
+def _video_id(links):
+    for link in links or []:
+        if link["video_id"]:
+            return link["video_id"]
+    return None
+
+
+def _youtube_thumbnail(video_id):
+    return f"https://img.youtube.com/vi/{video_id}/mqdefault.jpg" if video_id else None
+
+
+def _date(value):
+    return escape(str(value or "")[:10])
+
+
+def _tags(category):
+    tags = [tag.strip() for tag in (category or "").split("|") if tag.strip()]
+    return "".join(f'<span class="tag">🎮 {escape(tag)}</span>' for tag in tags[:2])
+
+
+def _layout(title, body, root="../", script=""):
+    return (
+        '<!DOCTYPE html><html lang="ja"><head><meta charset="utf-8">'
+        '<meta name="viewport" content="width=device-width, initial-scale=1">'
+        f'<title>{escape(title)} - VOD Finder</title><link rel="stylesheet" href="{root}style.css"></head><body>'
+        f'<header><a href="{root}index.html">🎥 VOD Finder</a><a href="{root}videos/1.html">📺 Videos</a>'
+        f'<a href="{root}clips/1.html">✂️ Clips</a></header><main>{body}</main>{script}</body></html>'
+    )
+
+
+def _card(href, thumbnail_url, title, meta_html):
+    thumb = (
+        f'<img src="{escape(thumbnail_url)}" alt="" width="320" height="180" loading="lazy" decoding="async">'
+        if thumbnail_url else '📺'
+    )
+    return (
+        f'<a class="card" href="{href}"><div class="thumb">{thumb}</div>'
+        f'<div class="card-body"><div class="title">{escape(title)}</div>{meta_html}</div></a>'
+    )
+
+
+def _pager(page, total_pages):
+    links = []
+    if page > 1:
+        links.append(f'<a href="{page - 1}.html">◀️ 前へ</a>')
+    links.append(f'<span>{page} / {total_pages}</span>')
+    if page < total_pages:
+        links.append(f'<a href="{page + 1}.html">次へ ▶️</a>')
+    return f'<nav class="pager">{"".join(links)}</nav>'
+
+
+def render_vod_list(cards, page, total_pages, total_count):
+    items = "".join(
+        _card(f'../vod/{card["id"]}.html', _youtube_thumbnail(card["video_id"]), card["title"],
+              f'<div class="meta">📅 {_date(card["created_at"])} ・ ✂️ {card["clip_count"]}件</div>'
+              f'{_tags(card["category"])}')
+        for card in cards
+    )
+    body = (f'<h1>📺 Videos</h1><p class="meta">全{total_count}件</p>'
+            f'<div class="grid">{items}</div>{_pager(page, total_pages)}')
+    return _layout(f"Videos {page}/{total_pages}", body)
+
+
+def render_clip_list(cards, page, total_pages, total_count):
+    items = "".join(
+        _card(f'../clip/{card["id"]}.html', card["thumbnail_url"] or _youtube_thumbnail(card["video_id"]),
+              card["title"], f'<div class="meta">📅 {_date(card["created_at"])}</div>{_tags(card["category"])}')
+        for card in cards
+    )
+    body = (f'<h1>✂️ Clips</h1><p class="meta">全{total_count}件</p>'
+            f'<div class="grid">{items}</div>{_pager(page, total_pages)}')
+    return _layout(f"Clips {page}/{total_pages}", body)
+
+
+def render_vod_page(vod, links, clips, highlight):
+    video_id = _video_id(links)
+    parts = [f'<h1>{escape(vod["title"])}</h1>',
+             f'<p class="meta">📅 {escape(str(vod["created_at"] or ""))} {_tags(vod["category"])}</p>']
+    if video_id:
+        parts.append(
+            f'<iframe width="640" height="360" src="https://www.youtube.com/embed/{escape(video_id)}" '
+            'loading="lazy" allowfullscreen style="max-width: 100%; border: 0;"></iframe>'
+        )
+    link_items = "".join(
+        f'<li><a href="{escape(link["url"])}">▶️ {escape(link["title"] or link["url"])}</a></li>' for link in links
+    )
+    if vod["url"]:
+        link_items += f'<li><a href="{escape(vod["url"])}">🟣 Twitch</a></li>'
+    if link_items:
+        parts.append(f'<ul>{link_items}</ul>')
+    if highlight and highlight["counts"]:
+        peak = max(highlight["counts"]) or 1
+        bars = "".join(f'<span style="height: {round(100 * count / peak)}%"></span>' for count in highlight["counts"])
+        parts.append(f'<h2>🔥 ハイライト</h2><div class="timeline">{bars}</div>')
+    clip_items = "".join(
+        f'<li><a href="../clip/{clip["id"]}.html">{escape(clip["title"])}</a> '
+        f'<span class="meta">{format_offset(clip["vod_offset"]) if clip["vod_offset"] is not None else _date(clip["created_at"])}</span></li>'
+        for clip in clips
+    )
+    parts.append(f'<h2>✂️ クリップ（{len(clips)}件）</h2><ul class="clip-list">{clip_items}</ul>')
+    return _layout(vod["title"], "".join(parts))
+
+
+def render_clip_page(clip, vod, video_id):
+    parts = [f'<h1>{escape(clip["title"])}</h1>',
+             f'<p class="meta">📅 {escape(str(clip["created_at"] or ""))} {_tags(clip["category"])}</p>']
+    thumbnail_url = clip["thumbnail_url"] or _youtube_thumbnail(video_id)
+    if thumbnail_url:
+        parts.append(f'<img src="{escape(thumbnail_url)}" alt="" width="480" height="272" style="max-width: 100%; height: auto;">')
+    if clip["url"]:
+        parts.append(f'<p><a href="{escape(clip["url"])}">🟣 Twitchで見る</a></p>')
+    if vod:
+        position = f' （{format_offset(clip["vod_offset"])}）' if clip["vod_offset"] is not None else ""
+        parts.append(f'<p>📺 <a href="../vod/{vod["id"]}.html">{escape(vod["title"])}</a>{position}</p>')
+    return _layout(clip["title"], "".join(parts))
+
+
+def render_index(vod_count, clip_count):
+    body = (
+        f'<h1>🎥 VOD Finder</h1><p class="meta">VOD {vod_count}件 / クリップ {clip_count}件</p>'
+        '<input id="q" type="search" placeholder="タイトルで検索..." style="width: 100%; padding: 8px; font-size: 16px;">'
+        '<ul id="results"></ul>'
+    )
+    return _layout("VOD Finder", body, root="", script=SEARCH_SCRIPT)
+
+
+def iter_pages(archive):
+    """
+    出力するページを (パス, 元データ, 描画関数) で列挙
+
+    元データのハッシュが前回と同じページは描画しない（描画関数は呼ばれない）。
+    """
+    vods, clips, links, highlights = archive["vods"], archive["clips"], archive["links"], archive["highlights"]
+    vods_by_id = {vod["id"]: vod for vod in vods}
+    clips_by_vod = {}
+    for clip in clips:
+        if clip["vod_id"] in vods_by_id:
+            clips_by_vod.setdefault(clip["vod_id"], []).append(clip)
+    # VOD詳細のクリップは配信の流れ順（位置が分からないものは後ろに新しい順）
+    for vod_clips in clips_by_vod.values():
+        vod_clips.sort(key=lambda clip: (clip["vod_offset"] is None, clip["vod_offset"] or 0))
+
+    yield "style.css", STYLE, lambda: STYLE
+    yield "index.html", (len(vods), len(clips)), lambda: render_index(len(vods), len(clips))
+
+    search_index = {
+        "vods": [[vod["id"], vod["title"], vod["created_at"], vod["category"]] for vod in vods],
+        "clips": [[clip["id"], clip["title"], clip["created_at"], clip["vod_id"]] for clip in clips],
+    }
+    yield SEARCH_INDEX, search_index, lambda: json.dumps(search_index, ensure_ascii=False, separators=(',', ':'))
+
+    vod_cards = [
+        {"id": vod["id"], "title": vod["title"], "category": vod["category"], "created_at": vod["created_at"],
+         "video_id": _video_id(links.get(vod["id"])), "clip_count": len(clips_by_vod.get(vod["id"], []))}
+        for vod in vods
+    ]
+    total_pages = max(math.ceil(len(vod_cards) / PAGE_SIZE), 1)
+    for page in range(1, total_pages + 1):
+        cards = vod_cards[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]
+        yield (f"videos/{page}.html", (cards, total_pages, len(vod_cards)),
+               lambda cards=cards, page=page: render_vod_list(cards, page, total_pages, len(vod_cards)))
+
+    clip_cards = [
+        {"id": clip["id"], "title": clip["title"], "category": clip["category"], "created_at": clip["created_at"],
+         "thumbnail_url": clip["thumbnail_url"], "video_id": _video_id(links.get(clip["vod_id"]))}
+        for clip in clips
+    ]
+    total_clip_pages = max(math.ceil(len(clip_cards) / PAGE_SIZE), 1)
+    for page in range(1, total_clip_pages + 1):
+        cards = clip_cards[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]
+        yield (f"clips/{page}.html", (cards, total_clip_pages, len(clip_cards)),
+               lambda cards=cards, page=page: render_clip_list(cards, page, total_clip_pages, len(clip_cards)))
+
+    for vod in vods:
+        payload = (vod, links.get(vod["id"], []), clips_by_vod.get(vod["id"], []), highlights.get(vod["id"]))
+        yield f"vod/{vod['id']}.html", payload, lambda payload=payload: render_vod_page(*payload)
+
+    for clip in clips:
+        vod = vods_by_id.get(clip["vod_id"])
+        payload = (clip, vod and {"id": vod["id"], "title": vod["title"]}, _video_id(links.get(clip["vod_id"])))
+        yield f"clip/{clip['id']}.html", payload, lambda payload=payload: render_clip_page(*payload)
+
+
+def _digest(path, payload):
+    data = json.dumps([TEMPLATE_VERSION, path, payload], ensure_ascii=False, default=str, sort_keys=True)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def _write_atomic(path, text):
+    """一時ファイルに書いてから置き換える（配信中のホストに書きかけのファイルを見せない）"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
+def read_export_state(out_dir):
+    """前回の書き出し状態（ウォーターマークとページごとのハッシュ）を読み込む"""
+    try:
+        with open(os.path.join(out_dir, STATE_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def export_site(out_dir, db_path=DB_PATH, full=False):
+    """
+    静的サイトを差分で書き出す
+
+    Returns: {"skipped", "written", "unchanged", "removed", "versions"}
+    """
+    state = {} if full else read_export_state(out_dir)
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    try:
+        c = conn.cursor()
+        ensure_sync_schema(c)
+        conn.commit()
+        # バージョンと行を同じスナップショットから読む（書き出し中の書き込みは次回に回る）
+        c.execute("BEGIN")
+        versions = get_data_versions(c, EXPORT_TABLES)
+        if state.get("versions") == versions and state.get("template") == TEMPLATE_VERSION:
+            conn.rollback()
+            logger.info("前回の書き出しから変更がないためスキップしました")
+            return {"skipped": True, "written": 0, "unchanged": len(state.get("pages", {})),
+                    "removed": 0, "versions": versions}
+        archive = load_archive(c)
+        conn.rollback()
+    finally:
+        conn.close()
+
+    previous = state.get("pages", {})
+    pages = {}
+    written = unchanged = 0
+    for path, payload, render in iter_pages(archive):
+        digest = _digest(path, payload)
+        pages[path] = digest
+        target = os.path.join(out_dir, path)
+        if previous.get(path) == digest and os.path.exists(target):
+            unchanged += 1
+            continue
+        _write_atomic(target, render())
+        written += 1
+
+    # 削除されたVOD・クリップ、減った一覧ページ
+    removed = 0
+    for path in set(previous) - set(pages):
+        try:
+            os.remove(os.path.join(out_dir, path))
+            removed += 1
+        except FileNotFoundError:
+            pass
+
+    # 状態ファイルは最後に書く（途中で失敗したら次回もう一度比較する）
+    _write_atomic(os.path.join(out_dir, STATE_FILE), json.dumps(
+        {"template": TEMPLATE_VERSION, "versions": versions, "pages": pages}, ensure_ascii=False
+    ))
+    logger.info(f"静的サイトを書き出し: 更新{written}件 / 変更なし{unchanged}件 / 削除{removed}件")
+    return {"skipped": False, "written": written, "unchanged": unchanged, "removed": removed, "versions": versions}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="アーカイブを静的サイトとして書き出す")
+    parser.add_argument('--out', required=True, help="出力先ディレクトリ")
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--full', action='store_true', help="前回の状態を無視してすべて書き直す")
+    parser.add_argument('-v', '--verbose', action='store_true')
+    args = parser.parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        stream=sys.stderr,
+        format='%(asctime)s %(levelname)s %(name)s: %(message)s'
+    )
+    print(json.dumps(export_site(args.out, db_path=args.db, full=args.full), ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,656 @@
+"""
+sync_engine.py - Twitch → SQLite の同期エンジン
+Streamlitに依存しないので、CLI（python -m app.sync）やスケジューラからそのまま実行できる
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+from app.utils.bulk_writer import vod_record, clip_record
+from app.utils.channels import ensure_sync_channels
+from app.utils.clip_planner import estimate_clip_density, fetch_clips_adaptive
+from app.utils.games import resolve_games
+from app.utils.helix import RateBudget, RequestStats, create_client_from_env
+from app.utils.progress import SyncCancelled
+from app.utils.schema import ensure_sync_schema
+from app.utils.staging import create_sync_staging
+from app.utils.watermarks import (
+    VIDEO_TYPES, CLIPS_STREAM, VOD_OVERLAP, CLIP_OVERLAP,
+    video_stream, clips_stream, fetch_since, advance_watermark, record_sync_log,
+    utcnow, to_utc_iso, parse_utc
+)
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = "vods.db"
+# これより古いロックファイルは異常終了の残骸とみなす
+LOCK_STALE_SECONDS = 2 * 60 * 60
+# 実行中はこの間隔でロックファイルの更新日時を進める（長いバックフィルが古いロックとみなされないように）
+LOCK_HEARTBEAT_SECONDS = 60
+# 同時に同期するチャンネル数の上限（レート制限の予算は全ワーカーで共有）
+MAX_CHANNEL_WORKERS = 4
+# ワーカー同士の書き込みが重なったときに待つ秒数
+BUSY_TIMEOUT = 60
+# EventSub由来のジョブの最大試行回数
+MAX_JOB_ATTEMPTS = 3
+
+
+class SyncAlreadyRunning(Exception):
+    """別の同期プロセスが実行中の場合の例外"""
+
+
+@contextmanager
+def sync_lock(db_path=DB_PATH):
+    """
+    同じDBに対する同期の多重実行を防ぐロック（ロックファイル方式）
+
+    保持している間はバックグラウンドのスレッドが LOCK_HEARTBEAT_SECONDS ごとに更新日時を進めるので、
+    LOCK_STALE_SECONDS より長い実行でも他のプロセスに奪われない。
+    """
+    lock_path = f"{db_path}.sync.lock"
+    try:
+        if time.time() - os.path.getmtime(lock_path) > LOCK_STALE_SECONDS:
+            logger.warning(f"古いロックファイルを削除します: {lock_path}")
+            os.remove(lock_path)
+    except OSError:
+        pass
+
+    try:
+        fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        raise SyncAlreadyRunning(f"同期は既に実行中です ({lock_path})")
+
+    stop = threading.Event()
+
+    def heartbeat():
+        while not stop.wait(LOCK_HEARTBEAT_SECONDS):
+            try:
+                os.utime(lock_path)
+            except OSError:
+                pass
+
+    try:
+        os.write(fd, str(os.getpid()).encode())
+        os.close(fd)
+        threading.Thread(target=heartbeat, name='sync-lock-heartbeat', daemon=True).start()
+        yield
+    finally:
+        stop.set()
+        try:
+            os.remove(lock_path)
+        except OSError:
+            pass
+
+
+def is_sync_running(db_path=DB_PATH):
+    """同期プロセスが実行中かどうか"""
+    lock_path = f"{db_path}.sync.lock"
+    try:
+        return time.time() - os.path.getmtime(lock_path) <= LOCK_STALE_SECONDS
+    except OSError:
+        return False
+
+
+def sync_videos(client, user_id, staging, date_range=None, limit=100, video_type='archive', since=None,
+                progress=None):
+    """
+    VODを取得してステージングに貯める（日付指定対応）
+
+    since を指定すると、その時刻より古いVODが現れた時点で取得を打ち切る（差分同期）。
+    本テーブルへの反映は呼び出し側が staging.merge() で行う。
+    戻り値の newest は取得したVODの最新の作成日時（ウォーターマーク用）。
+    2ページ目以降の取得エラーや、since まで届かずにページ数の上限で止まった場合は errors に入れる
+    （呼び出し側はウォーターマークを進めないので、間のVODを取りこぼさない）。
+    progress（SyncProgress）を渡すとページごとに進捗を記録し、キャンセルを確認する。
+    """
+    newest = None
+    errors = []
+    try:
+        # パラメータを設定
+        params = {
+            'user_id': user_id,
+            'type': video_type,
+            'first': min(limit, 100)  # APIの上限は100
+        }
+
+        # 日付範囲が指定されている場合
+        if date_range:
+            start_iso = datetime.combine(date_range['start_date'], datetime.min.time()).isoformat() + 'Z'
+            end_iso = datetime.combine(date_range['end_date'], datetime.max.time()).isoformat() + 'Z'
+
+            params['started_at'] = start_iso
+            params['ended_at'] = end_iso
+
+            logger.info(f"VOD取得期間: {start_iso} ～ {end_iso}")
+
+        staged_count = 0
+        fetched_count = 0
+
+        # 日付指定時・差分同期時は複数ページを取得（最大10ページまで）
+        max_pages = 10 if (date_range or since) else 1
+        page_count = 0
+        # since まで、またはページ送りの終わりまで読めたか
+        complete = False
+
+        while page_count < max_pages:
+            if page_count > 0:
+                logger.info(f"追加ページを取得中... (ページ {page_count + 1})")
+
+            try:
+                data = client.get('videos', params)
+            except Exception as e:
+                if page_count == 0:
+                    raise
+                logger.warning(f"追加ページ取得エラー: {str(e)}")
+                errors.append(f"VOD同期エラー({video_type}): {page_count + 1}ページ目の取得に失敗: {str(e)}")
+                break
+
+            videos = data.get('data', [])
+            if not videos:
+                complete = True
+                break
+
+            page_count += 1
+            fetched_count += len(videos)
+
+            # TEMPテーブルに貯めるだけなので本テーブルはロックしない
+            staged = staging.append('vods', [vod_record(video, video_type) for video in videos])
+            staged_count += staged
+            if progress:
+                progress.page(staged)
+                progress.check_cancel()
+
+            # /videos は新しい順に返るので、since より古いVODが出たら以降は取得済み
+            reached_since = False
+            for video in videos:
+                created = parse_utc(video['created_at'])
+                if newest is None or created > newest:
+                    newest = created
+                if since and created < since:
+                    reached_since = True
+            if reached_since:
+                complete = True
+                break
+
+            next_cursor = data.get('pagination', {}).get('cursor')
+            if not next_cursor or len(videos) < params['first']:
+                complete = True
+                break
+            params['after'] = next_cursor
+
+        logger.info(f"取得したVOD数({video_type}): {fetched_count} (ステージ {staged_count}件, {page_count}リクエスト)")
+        # 初回（since なし）は最新の1ページだけ取る仕様なので、上限で止まっても欠落扱いにしない
+        if not complete and not errors and since:
+            errors.append(
+                f"VOD同期({video_type}): {max_pages}ページの上限までに前回位置に届きませんでした"
+                "（間のVODはバックフィルで取得してください）"
+            )
+
+        return {"staged": staged_count, "errors": errors, "newest": newest}
+
+    except SyncCancelled:
+        raise
+    except Exception as e:
+        return {"staged": 0, "errors": [f"VOD同期エラー({video_type}): {str(e)}"]}
+
+
+def sync_clips(client, user_id, cursor, staging, date_range=None, since=None, progress=None):
+    """
+    クリップを取得してステージングに貯める（日付指定対応）
+
+    since を指定すると since ～ 現在 の差分だけを取得する。
+    cursor は期間の初期幅を決めるための既存データの読み取りだけに使う。
+    戻り値の watermark は取りこぼしなく取得できた終端（ウォーターマーク用）。
+    """
+    staged_count = 0
+    try:
+        # 日付範囲を設定（指定なし・初回は過去7日間）
+        if date_range:
+            start_dt = datetime.combine(date_range['start_date'], datetime.min.time()).replace(tzinfo=timezone.utc)
+            end_dt = datetime.combine(date_range['end_date'], datetime.max.time()).replace(tzinfo=timezone.utc)
+        else:
+            end_dt = utcnow()
+            start_dt = since or end_dt - timedelta(days=7)
+
+        logger.info(f"クリップ取得期間: {start_dt.isoformat()} ～ {end_dt.isoformat()}")
+
+        def on_page(clips):
+            nonlocal staged_count
+            staged = staging.append('clips', [clip_record(clip) for clip in clips])
+            staged_count += staged
+            if progress:
+                progress.page(staged)
+                progress.check_cancel()
+
+        def on_window(window, fraction):
+            if progress:
+                progress.window(window[0], window[1], fraction=fraction)
+
+        # 飽和した期間は分割、空の期間はまとめて取得（期間の初期幅は既存データの密度から推定）
+        stats = fetch_clips_adaptive(
+            lambda params: client.get('clips', params), user_id, start_dt, end_dt, on_page,
+            clips_per_day=estimate_clip_density(cursor, broadcaster_id=user_id), on_window=on_window
+        )
+
+        logger.info(
+            f"取得したクリップ数: {stats['clips']} (ステージ {staged_count}件, "
+            f"{stats['pages']}リクエスト, 分割 {stats['splits']}回)"
+        )
+        if stats['truncated']:
+            # 取りこぼした期間より先には位置を進めない（次回の同期でその期間から取り直す）
+            logger.warning(
+                f"クリップを取得しきれなかった期間が{stats['truncated']}件あります "
+                f"(位置は {stats['complete_until'].isoformat()} まで)"
+            )
+
+        return {"staged": staged_count, "errors": [], "truncated": stats['truncated'],
+                "watermark": min(stats['complete_until'], end_dt)}
+
+    except SyncCancelled:
+        raise
+    except Exception as e:
+        return {"staged": staged_count, "errors": [f"クリップ同期エラー: {str(e)}"]}
+
+
+def sync_channel(client, broadcaster_id, cursor, staging, date_range=None, progress=None):
+    """
+    1チャンネル分のVOD（タイプ別）とクリップを取得してステージングに貯める
+
+    cursor は前回位置などの読み取りだけに使い、本テーブルには書き込まない。
+    ウォーターマークはチャンネルごとのストリーム名で管理する。キャンセルされた場合は
+    それまでに完了したストリームの位置だけを返す。
+    Returns: {"videos_staged", "clips_staged", "errors", "marks": {stream: 新しい位置}, "cancelled"}
+    """
+    result = {'videos_staged': 0, 'clips_staged': 0, 'errors': [], 'marks': {}, 'cancelled': False}
+    # チャンネル内の進捗の配分（VOD各タイプ10%、クリップ70%）
+    vod_span = 0.1
+
+    try:
+        # VOD同期（タイプごとに前回位置から差分取得）
+        for index, video_type in enumerate(VIDEO_TYPES):
+            stream = video_stream(video_type, broadcaster_id)
+            logger.info(f"VODデータを同期中... ({stream})")
+            if progress:
+                progress.stage(video_stream(video_type), progress=index * vod_span, span=vod_span)
+            since = None if date_range else fetch_since(cursor, stream, VOD_OVERLAP)
+            vod_result = sync_videos(client, broadcaster_id, staging, date_range=date_range,
+                                     video_type=video_type, since=since, progress=progress)
+            result['videos_staged'] += vod_result['staged']
+            if vod_result.get('errors'):
+                result['errors'].extend(vod_result['errors'])
+            elif not date_range and vod_result.get('newest'):
+                result['marks'][stream] = vod_result['newest']
+
+        # クリップ同期
+        stream = clips_stream(broadcaster_id)
+        logger.info(f"クリップデータを同期中... ({stream})")
+        if progress:
+            clips_base = len(VIDEO_TYPES) * vod_span
+            progress.stage(CLIPS_STREAM, progress=clips_base, span=1.0 - clips_base)
+        since = None if date_range else fetch_since(cursor, stream, CLIP_OVERLAP)
+        clip_result = sync_clips(client, broadcaster_id, cursor, staging, date_range=date_range, since=since,
+                                 progress=progress)
+        result['clips_staged'] = clip_result['staged']
+        if clip_result.get('errors'):
+            result['errors'].extend(clip_result['errors'])
+        elif not date_range:
+            result['marks'][stream] = clip_result['watermark']
+    except SyncCancelled as e:
+        # 途中のストリームは位置を進めない（ステージ済みのページは反映する）
+        logger.warning(str(e))
+        result['cancelled'] = True
+
+    return result
+
+
+def _channel_worker(db_path, client, channel, staging, date_range, progress):
+    """ワーカースレッド: 読み取り専用の接続で1チャンネル分を取得し、共有のステージングに貯める"""
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+    try:
+        result = sync_channel(client, channel['broadcaster_id'], conn.cursor(), staging,
+                              date_range=date_range, progress=progress)
+    finally:
+        conn.close()
+    if progress:
+        progress.done()
+    return result
+
+
+def run_sync(date_range=None, db_path=DB_PATH, client=None, user_id=None, progress=None,
+             channels=None, max_workers=MAX_CHANNEL_WORKERS):
+    """
+    登録済みの全チャンネルのVOD（タイプ別）とクリップを同期して結果を返す
+
+    チャンネルごとに1ワーカーで並列に取得し、Helixのレート制限は全ワーカーで
+    1つの予算（RateBudget）を共有する。取得したページはTEMPのステージングテーブルに貯め、
+    全ワーカーの終了後に1回の短いトランザクションで本テーブルへの反映・紐づけ・ハイライト・
+    ウォーターマークの更新を行う（UIからは同期結果がまとめて見え、取得中に待たされない）。
+    ゲーム名の解決はHTTPを伴うので反映後に別に行う。
+    date_range を省略すると前回のウォーターマークからの差分同期。
+    progress（SyncProgress）を渡すと進捗をsync_runsに記録し、キャンセル要求で中断する。
+    中断した場合も、それまでに取得したデータと完了したストリームの位置は反映する。
+    Returns: {"success", "result", "details"}（sync_twitch_data_direct と同じ形式）
+    """
+    started = time.monotonic()
+    if client is None:
+        client, user_id = create_client_from_env()
+    if client.rate_budget is None:
+        client.rate_budget = RateBudget()
+    if client.stats is None:
+        client.stats = RequestStats()
+    requests_before = client.stats.snapshot()
+    if progress:
+        client.on_throttle = progress.throttle
+
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+    try:
+        c = conn.cursor()
+        # 同期中もUIから読めるようにWALにする（設定はDBファイルに残る）
+        c.execute("PRAGMA journal_mode=WAL")
+        ensure_sync_schema(c)
+        if channels is None:
+            channels = ensure_sync_channels(c, client, user_id)
+        conn.commit()
+        staging = create_sync_staging(conn)
+
+        results = {
+            'videos_added': 0,
+            'videos_updated': 0,
+            'clips_added': 0,
+            'clips_updated': 0,
+            'linked': 0,
+            'errors': [],
+            'channels': {},
+            'date_range': {k: str(v) for k, v in date_range.items()} if date_range else None
+        }
+        cancelled = False
+        marks = {}
+
+        if date_range:
+            logger.info(f"日付指定同期: {date_range['start_date']} ～ {date_range['end_date']}")
+        else:
+            logger.info("通常同期: 前回同期からの差分")
+        if not channels:
+            results['errors'].append("同期対象のチャンネルがありません")
+
+        labels = [channel['login'] or channel['broadcaster_id'] for channel in channels]
+        views = progress.channels(labels, progress=0.0, span=0.9) if progress and channels else None
+
+        if channels:
+            workers = max(1, min(max_workers, len(channels)))
+            logger.info(f"{len(channels)}チャンネルを{workers}並列で同期します")
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='sync') as pool:
+                futures = {
+                    pool.submit(_channel_worker, db_path, client.clone(), channel, staging, date_range,
+                                views[i] if views else None): channel
+                    for i, channel in enumerate(channels)
+                }
+                for future in as_completed(futures):
+                    channel = futures[future]
+                    label = channel['login'] or channel['broadcaster_id']
+                    results['channels'][label] = {
+                        'videos_added': 0, 'videos_updated': 0, 'clips_added': 0, 'clips_updated': 0,
+                        'cancelled': False
+                    }
+                    try:
+                        channel_result = future.result()
+                    except Exception as e:
+                        logger.exception(f"{label}: 同期エラー")
+                        results['errors'].append(f"[{label}] 同期エラー: {str(e)}")
+                        continue
+                    results['errors'].extend(f"[{label}] {error}" for error in channel_result['errors'])
+                    cancelled = cancelled or channel_result['cancelled']
+                    results['channels'][label]['cancelled'] = channel_result['cancelled']
+                    marks.update(channel_result['marks'])
+
+        # ステージした全チャンネル分を1トランザクションで反映（紐づけ・ハイライト・位置の更新を含む）
+        if progress:
+            progress.stage('merge')
+        merged = staging.merge()
+        for stream, mark in marks.items():
+            advance_watermark(c, stream, mark)
+        conn.commit()
+
+        for channel in channels:
+            label = channel['login'] or channel['broadcaster_id']
+            if label not in results['channels']:
+                continue
+            vods = merged['vods']['by_broadcaster'].get(channel['broadcaster_id'], {})
+            clips = merged['clips']['by_broadcaster'].get(channel['broadcaster_id'], {})
+            results['channels'][label].update({
+                'videos_added': vods.get('inserted', 0), 'videos_updated': vods.get('updated', 0),
+                'clips_added': clips.get('inserted', 0), 'clips_updated': clips.get('updated', 0),
+            })
+        results['videos_added'] = merged['vods']['inserted']
+        results['videos_updated'] = merged['vods']['updated']
+        results['clips_added'] = merged['clips']['inserted']
+        results['clips_updated'] = merged['clips']['updated']
+        results['linked'] = merged['linked']
+        results['highlights'] = merged['highlights']
+
+        # 未登録のgame_idだけをまとめて名前解決（失敗しても同期結果には影響させない）
+        if progress:
+            progress.stage('games')
+        try:
+            results['games_resolved'] = resolve_games(c, client)['resolved']
+        except Exception as e:
+            results['errors'].append(f"ゲーム名取得エラー: {str(e)}")
+
+        record_sync_log(c, "日付指定同期" if date_range else "通常同期")
+        conn.commit()
+    finally:
+        conn.close()
+
+    results['duration_seconds'] = round(time.monotonic() - started, 2)
+    results['cancelled'] = cancelled
+    requests_after = client.stats.snapshot()
+    results['api_calls'] = requests_after['calls'] - requests_before['calls']
+    results['api_bytes'] = requests_after['bytes'] - requests_before['bytes']
+    if progress:
+        progress.record_metrics(
+            api_calls=results['api_calls'], api_bytes=results['api_bytes'],
+            rows_inserted=results['videos_added'] + results['clips_added'],
+            rows_updated=results['videos_updated'] + results['clips_updated'],
+            rows_linked=results['linked'], errors=results['errors']
+        )
+
+    if date_range:
+        period_info = f" ({date_range['start_date']} ～ {date_range['end_date']})"
+    else:
+        period_info = " (前回同期からの差分)"
+
+    result_msg = (
+        f"VOD: {results['videos_added']}件追加/{results['videos_updated']}件更新, "
+        f"クリップ: {results['clips_added']}件追加/{results['clips_updated']}件更新{period_info}"
+    )
+    if len(results['channels']) > 1:
+        result_msg += f" [{len(results['channels'])}チャンネル]"
+    if cancelled:
+        result_msg += "\n途中でキャンセルされました（取得済みのデータは反映済み）"
+    if results['errors']:
+        result_msg += f"\n警告: {len(results['errors'])}件のエラーが発生"
+
+    return {"success": True, "result": result_msg, "details": results}
+
+
+def sync_vod_window(client, broadcaster_id, cursor, progress=None):
+    """
+    チャンネルの直近のVOD1件と、その配信開始以降のクリップだけを同期（EventSub通知用）
+
+    7日分を走査する通常同期と違い、通知のあった配信の分だけを取得する。
+    取得分はステージングに貯めて最後に1回で反映する。
+    ウォーターマークは進めない（通常同期の差分範囲はそのまま）。
+    Returns: {"vod", "videos_added", "videos_updated", "clips_added", "clips_updated", "errors"}
+    """
+    result = {"vod": None, "videos_added": 0, "videos_updated": 0, "clips_added": 0,
+              "clips_updated": 0, "errors": []}
+    videos = client.get('videos', {'user_id': broadcaster_id, 'type': 'archive', 'first': 1}).get('data', [])
+    if not videos:
+        return result
+    video = videos[0]
+    result['vod'] = video['id']
+
+    staging = create_sync_staging(cursor.connection)
+    staging.append('vods', [vod_record(video, 'archive')])
+
+    # 配信開始 ～ 現在（配信終了直後の通知なので、ほぼ配信期間そのもの）
+    clip_result = sync_clips(client, broadcaster_id, cursor, staging, since=parse_utc(video['created_at']),
+                             progress=progress)
+    result['errors'].extend(clip_result.get('errors', []))
+
+    merged = staging.merge()
+    cursor.connection.commit()
+    result['videos_added'] = merged['vods']['inserted']
+    result['videos_updated'] = merged['vods']['updated']
+    result['clips_added'] = merged['clips']['inserted']
+    result['clips_updated'] = merged['clips']['updated']
+    try:
+        resolve_games(cursor, client, [video.get('game_id')])
+    except Exception as e:
+        result['errors'].append(f"ゲーム名取得エラー: {str(e)}")
+    cursor.connection.commit()
+    return result
+
+
+def reclaim_running_jobs(cursor):
+    """
+    'running' のまま残ったジョブを未処理に戻す（試行回数を使い切ったものは失敗にする）
+
+    ジョブは sync_lock を持つプロセスだけが実行するので、ロックを取った時点で 'running' の
+    ジョブは、取り出したプロセスが途中で異常終了したもの。ロックを取ってから呼ぶこと。
+    Returns: 未処理に戻した件数
+    """
+    now = to_utc_iso(utcnow())
+    cursor.execute("""
+        UPDATE sync_queue SET status = 'failed', finished_at = ?,
+            message = '実行中にプロセスが終了しました（再試行の上限に達したため失敗）'
+        WHERE status = 'running' AND attempts >= ?
+    """, (now, MAX_JOB_ATTEMPTS))
+    cursor.execute("""
+        UPDATE sync_queue SET status = 'pending', message = '実行中にプロセスが終了したため再試行します'
+        WHERE status = 'running'
+    """)
+    if cursor.rowcount > 0:
+        logger.warning(f"途中で止まったジョブを未処理に戻しました: {cursor.rowcount}件")
+    return max(cursor.rowcount, 0)
+
+
+def claim_queued_job(cursor):
+    """sync_queueから未処理のジョブを1件取り出して実行中にする（なければNone）"""
+    cursor.execute("""
+        SELECT id, broadcaster_id, reason, event_at, attempts FROM sync_queue
+        WHERE status = 'pending' ORDER BY id LIMIT 1
+    """)
+    row = cursor.fetchone()
+    if not row:
+        return None
+    cursor.execute("""
+        UPDATE sync_queue SET status = 'running', started_at = ?, attempts = attempts + 1
+        WHERE id = ? AND status = 'pending'
+    """, (to_utc_iso(utcnow()), row[0]))
+    if cursor.rowcount == 0:
+        return None
+    return dict(zip(['id', 'broadcaster_id', 'reason', 'event_at', 'attempts'], row))
+
+
+def process_sync_queue(db_path=DB_PATH, client=None, max_jobs=None):
+    """
+    EventSub通知で積まれたジョブ（チャンネルの直近VODの同期）を順に実行
+
+    呼び出し側で sync_lock を取っておくこと。失敗したジョブは MAX_JOB_ATTEMPTS 回まで再試行する。
+    前回のプロセスが異常終了して 'running' のまま残ったジョブも、最初に未処理に戻して再試行する。
+    Returns: 処理したジョブの結果のリスト
+    """
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+    processed = []
+    try:
+        c = conn.cursor()
+        ensure_sync_schema(c)
+        reclaim_running_jobs(c)
+        conn.commit()
+        while max_jobs is None or len(processed) < max_jobs:
+            job = claim_queued_job(c)
+            conn.commit()
+            if not job:
+                break
+
+            logger.info(f"対象を絞った同期: {job['broadcaster_id']} ({job['reason']})")
+            try:
+                if client is None:
+                    # キューが空のときはトークンを取得しない
+                    client, _ = create_client_from_env()
+                job_result = sync_vod_window(client, job['broadcaster_id'], c)
+                status = 'failed' if job_result['errors'] else 'done'
+                message = summary_json(job_result)
+            except Exception as e:
+                conn.rollback()
+                logger.exception("対象を絞った同期でエラー")
+                job_result = {"errors": [str(e)]}
+                status = 'pending' if job['attempts'] + 1 < MAX_JOB_ATTEMPTS else 'failed'
+                message = str(e)
+
+            c.execute("""
+                UPDATE sync_queue SET status = ?, message = ?, finished_at = ?
+                WHERE id = ?
+            """, (status, message, to_utc_iso(utcnow()), job['id']))
+            conn.commit()
+            processed.append(dict(job, status=status, result=job_result))
+            if status == 'pending':
+                # 再試行は次回の呼び出しに回す（同じジョブを続けて叩かない）
+                break
+    finally:
+        conn.close()
+    return processed
+
+
+def get_sync_status(db_path=DB_PATH):
+    """
+    UI表示用の同期状態（読み取りのみ）
+
+    Returns: {"running", "watermarks", "last_sync", "channels"}
+    """
+    status = {"running": is_sync_running(db_path), "watermarks": {}, "last_sync": None, "channels": []}
+    if not os.path.exists(db_path):
+        return status
+
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    try:
+        c = conn.cursor()
+        try:
+            c.execute("SELECT stream, high_water FROM sync_watermarks ORDER BY stream")
+            status["watermarks"] = dict(c.fetchall())
+        except sqlite3.OperationalError:
+            pass
+        try:
+            c.execute("""
+                SELECT sync_type, last_sync_time FROM sync_log
+                ORDER BY created_at DESC LIMIT 1
+            """)
+            row = c.fetchone()
+            if row:
+                status["last_sync"] = {"sync_type": row[0], "time": row[1]}
+        except sqlite3.OperationalError:
+            pass
+        try:
+            c.execute("SELECT broadcaster_id, login, display_name, enabled FROM channels ORDER BY added_at")
+            status["channels"] = [
+                {"broadcaster_id": row[0], "login": row[1], "display_name": row[2], "enabled": bool(row[3])}
+                for row in c.fetchall()
+            ]
+        except sqlite3.OperationalError:
+            pass
+    finally:
+        conn.close()
+    return status
+
+
+def summary_json(summary):
+    """CLI出力用にJSON文字列へ変換"""
+    return json.dumps(summary, ensure_ascii=False, default=str)
@@ -0,0 +1,102 @@
+"""
+watermarks.py - 差分同期のハイウォーターマーク
+ストリーム（'vods:archive' / 'vods:upload' / 'vods:highlight' / 'clips'）とチャンネルごとに
+取得済みの最新時刻をUTCで保存し、次回の同期ではその時刻以降だけを取得する
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+
+logger = logging.getLogger(__name__)
+
+VIDEO_TYPES = ['archive', 'upload', 'highlight']
+CLIPS_STREAM = 'clips'
+
+# 取りこぼし防止のために前回位置から少し遡る幅
+# VODは配信中に長さ・再生数が変わるため長めに取る
+VOD_OVERLAP = timedelta(days=1)
+CLIP_OVERLAP = timedelta(hours=1)
+
+
+def video_stream(video_type, broadcaster_id=None):
+    """VODタイプ（とチャンネル）に対応するストリーム名"""
+    stream = f"vods:{video_type}"
+    return f"{stream}:{broadcaster_id}" if broadcaster_id else stream
+
+
+def clips_stream(broadcaster_id=None):
+    """チャンネルのクリップのストリーム名"""
+    return f"{CLIPS_STREAM}:{broadcaster_id}" if broadcaster_id else CLIPS_STREAM
+
+
+def utcnow():
+    return datetime.now(timezone.utc).replace(microsecond=0)
+
+
+def to_utc_iso(dt):
+    """datetimeをUTCのISO文字列に変換（naiveはUTCとして扱う）"""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def parse_utc(value):
+    """ISO文字列をUTCのaware datetimeに変換（タイムゾーンなしはUTCとして扱う）"""
+    if isinstance(value, datetime):
+        dt = value
+    else:
+        dt = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def get_watermark(cursor, stream):
+    """ストリームのハイウォーターマークを返す（未同期ならNone）"""
+    cursor.execute("SELECT high_water FROM sync_watermarks WHERE stream = ?", (stream,))
+    row = cursor.fetchone()
+    return parse_utc(row[0]) if row else None
+
+
+def get_all_watermarks(cursor):
+    """全ストリームのハイウォーターマークを {stream: datetime} で返す"""
+    cursor.execute("SELECT stream, high_water FROM sync_watermarks ORDER BY stream")
+    return {stream: parse_utc(value) for stream, value in cursor.fetchall()}
+
+
+def fetch_since(cursor, stream, overlap):
+    """差分取得の開始時刻（前回位置 - overlap）。未同期ならNone"""
+    mark = get_watermark(cursor, stream)
+    return mark - overlap if mark else None
+
+
+def advance_watermark(cursor, stream, value):
+    """
+    ハイウォーターマークを進める（後退はしない）
+
+    データのコミット後に呼び出し、同じトランザクションかその直後にコミットすること。
+    """
+    if value is None:
+        return
+    new_value = to_utc_iso(value)
+    # 同一形式のISO文字列なので文字列比較で前後関係が決まる
+    cursor.execute("""
+        INSERT INTO sync_watermarks (stream, high_water, updated_at)
+        VALUES (?, ?, ?)
+        ON CONFLICT(stream) DO UPDATE SET
+            high_water = MAX(sync_watermarks.high_water, excluded.high_water),
+            updated_at = excluded.updated_at
+    """, (stream, new_value, to_utc_iso(utcnow())))
+    logger.info(f"ウォーターマーク更新: {stream} -> {new_value}")
+
+
+def record_sync_log(cursor, sync_type, sync_time=None):
+    """種類ごとの最終同期時刻を記録（UTC。sync_logは種類ごとに1行）"""
+    now = to_utc_iso(sync_time or utcnow())
+    cursor.execute("""
+        INSERT INTO sync_log (sync_type, last_sync_time, created_at)
+        VALUES (?, ?, ?)
+        ON CONFLICT(sync_type) DO UPDATE SET
+            last_sync_time = excluded.last_sync_time,
+            created_at = excluded.created_at
+    """, (sync_type, now, now))
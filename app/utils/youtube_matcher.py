@@ -0,0 +1,415 @@
+"""
+youtube_matcher.py - YouTubeチャンネルのエクスポートとVODの一括マッチング
+エクスポート（JSON/CSV: 動画ID・タイトル・公開日時）の各動画について、
+公開日時が近いVODの中からタイトルの類似度（文字bigramのTF-IDF）と日付の近さで候補を採点し、
+確度の高いものはyoutube_linksにまとめて登録、それ以外は管理者の確認待ちキューに入れる
+
+使い方:
+    python -m app.utils.youtube_matcher export.json              # マッチングして登録
+    python -m app.utils.youtube_matcher videos.csv --dry-run     # 結果の確認だけ
+"""
+
+import argparse
+import csv
+import io
+import json
+import logging
+import math
+import re
+import sqlite3
+import unicodedata
+import zlib
+from bisect import bisect_left, bisect_right
+from datetime import timedelta
+
+from app.utils.schema import ensure_sync_schema
+from app.utils.watermarks import parse_utc, to_utc_iso, utcnow
+
+try:
+    import numpy as np
+except ImportError:  # numpyがない環境では純Pythonで採点する
+    np = None
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = "vods.db"
+
+# VODの配信開始からYouTube公開までの許容範囲（予約公開・時差のずれを少し見込む）
+MIN_UPLOAD_DELAY = timedelta(days=-1)
+MAX_UPLOAD_DELAY = timedelta(days=30)
+# 日付スコアが 1/e になる経過日数（配信開始より前の公開は時差程度しかありえないので急に下げる）
+DATE_DECAY_DAYS = 3.0
+EARLY_DECAY_DAYS = 0.25
+# 総合スコアの重み（タイトル / 日付）
+TITLE_WEIGHT = 0.7
+DATE_WEIGHT = 0.3
+# これ以上のスコアで、次点との差も十分なら自動で確定
+AUTO_ACCEPT_SCORE = 0.75
+AUTO_ACCEPT_MARGIN = 0.1
+# タイトル特徴量のハッシュ次元
+HASH_DIM = 2048
+# 行列積を行うYouTube動画のまとまり
+CHUNK_SIZE = 256
+
+# エクスポートの列名の揺れ（YouTube Data API / Takeout のCSV / 独自形式）
+ID_KEYS = ('video_id', 'videoid', 'video id', 'id', '動画id', 'コンテンツ')
+TITLE_KEYS = ('title', 'video title', 'video title (original)', 'タイトル', '動画のタイトル')
+PUBLISHED_KEYS = ('published_at', 'publishedat', 'publish_time', 'video publish timestamp',
+                  'video create timestamp', '公開日時', '動画公開時刻')
+
+_VIDEO_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{11}$')
+
+
+def _pick(row, keys):
+    lowered = {str(k).strip().lower(): v for k, v in row.items()}
+    for key in keys:
+        value = lowered.get(key)
+        if value not in (None, ''):
+            return value
+    return None
+
+
+def normalize_video(row):
+    """エクスポートの1行を {"video_id", "title", "published_at"} にそろえる（使えない行はNone）"""
+    # YouTube Data API の videos/playlistItems 形式
+    snippet = row.get('snippet') if isinstance(row.get('snippet'), dict) else None
+    if snippet:
+        content = row.get('contentDetails') or {}
+        video_id = content.get('videoId') or (snippet.get('resourceId') or {}).get('videoId')
+        if not video_id and isinstance(row.get('id'), str):
+            video_id = row['id']
+        title = snippet.get('title')
+        published = content.get('videoPublishedAt') or snippet.get('publishedAt')
+    else:
+        video_id = _pick(row, ID_KEYS)
+        title = _pick(row, TITLE_KEYS)
+        published = _pick(row, PUBLISHED_KEYS)
+
+    video_id = str(video_id or '').strip()
+    if not _VIDEO_ID_PATTERN.match(video_id) or not published:
+        return None
+    try:
+        published_at = parse_utc(str(published).strip())
+    except ValueError:
+        return None
+    return {"video_id": video_id, "title": str(title or '').strip(), "published_at": published_at}
+
+
+def load_export(data, filename=''):
+    """
+    エクスポート（JSON/CSVのテキストまたはバイト列）を読み込む
+
+    JSONは動画の配列、または {"items": [...]}（YouTube Data API のレスポンス形式）。
+    Returns: normalize_video() の結果のリスト（同じ動画IDは1件にまとめる）
+    """
+    if isinstance(data, bytes):
+        data = data.decode('utf-8-sig')
+    text = data.lstrip('\ufeff')
+
+    if filename.lower().endswith('.json') or text.lstrip().startswith(('[', '{')):
+        payload = json.loads(text)
+        rows = payload.get('items', []) if isinstance(payload, dict) else payload
+    else:
+        rows = list(csv.DictReader(io.StringIO(text)))
+
+    videos = {}
+    skipped = 0
+    for row in rows:
+        video = normalize_video(row) if isinstance(row, dict) else None
+        if video:
+            videos[video['video_id']] = video
+        else:
+            skipped += 1
+    if skipped:
+        logger.info(f"動画ID・公開日時のない行をスキップ: {skipped}件")
+    return list(videos.values())
+
+
+def normalize_title(title):
+    """全角半角・大文字小文字をそろえ、空白と記号を除いたタイトル"""
+    text = unicodedata.normalize('NFKC', title or '').lower()
+    return ''.join(ch for ch in text if ch.isalnum())
+
+
+def _bigrams(title):
+    text = normalize_title(title)
+    if len(text) < 2:
+        return [text] if text else []
+    return [text[i:i + 2] for i in range(len(text) - 1)]
+
+
+def title_features(titles):
+    """
+    タイトルごとの特徴量（文字bigramをハッシュしたTF-IDF、L2正規化済み）
+
+    日本語のタイトルでも分かち書きなしで比較できるよう文字bigramを使う。
+    Returns: [{次元: 重み}, ...]
+    """
+    grams = [[zlib.crc32(g.encode('utf-8')) % HASH_DIM for g in _bigrams(title)] for title in titles]
+    df = {}
+    for buckets in grams:
+        for bucket in set(buckets):
+            df[bucket] = df.get(bucket, 0) + 1
+    total = len(titles)
+
+    features = []
+    for buckets in grams:
+        weights = {}
+        for bucket in buckets:
+            weights[bucket] = weights.get(bucket, 0.0) + 1.0
+        for bucket in weights:
+            weights[bucket] *= math.log((1 + total) / (1 + df[bucket])) + 1.0
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        features.append({bucket: w / norm for bucket, w in weights.items()})
+    return features
+
+
+def date_score(delay_days):
+    """配信開始から公開までの日数のスコア（配信後すぐの公開ほど1に近い）"""
+    if delay_days < 0:
+        return math.exp(delay_days / EARLY_DECAY_DAYS)
+    return math.exp(-delay_days / DATE_DECAY_DAYS)
+
+
+def load_vods(cursor):
+    """マッチング対象のVOD（id, title, 配信開始のUTC秒）を配信開始の古い順に返す"""
+    cursor.execute("SELECT id, title, created_at FROM vods WHERE created_at IS NOT NULL")
+    vods = []
+    for vod_id, title, created_at in cursor.fetchall():
+        try:
+            vods.append((vod_id, title or '', parse_utc(str(created_at)).timestamp()))
+        except ValueError:
+            continue
+    vods.sort(key=lambda vod: vod[2])
+    return vods
+
+
+def _score_chunk_numpy(video_features, video_times, vod_matrix, vod_times, lo, hi):
+    """1まとまりのYouTube動画 × 公開日時の範囲内のVODを行列積で採点"""
+    chunk = np.zeros((len(video_features), HASH_DIM), dtype=np.float32)
+    for row, weights in enumerate(video_features):
+        if weights:
+            chunk[row, list(weights)] = list(weights.values())
+    title = chunk @ vod_matrix[lo:hi].T
+
+    delay = (np.asarray(video_times)[:, None] - vod_times[None, lo:hi]) / 86400.0
+    in_window = (delay >= MIN_UPLOAD_DELAY.days) & (delay <= MAX_UPLOAD_DELAY.days)
+    dates = np.where(delay < 0, np.exp(np.minimum(delay, 0.0) / EARLY_DECAY_DAYS),
+                     np.exp(-np.maximum(delay, 0.0) / DATE_DECAY_DAYS))
+    total = np.where(in_window, TITLE_WEIGHT * title + DATE_WEIGHT * dates, -1.0)
+    return total, title, dates
+
+
+def score_candidates(videos, vods):
+    """
+    動画ごとに上位2件のVOD候補を採点
+
+    公開日時の順に並べた動画を CHUNK_SIZE 件ずつ、その公開日時の範囲に入るVODとだけ比較する。
+    numpyがあれば行列積、なければ同じ計算を純Pythonで行う。
+    Returns: {video_id: [(score, vod_id, title_score, date_score), ...]}（スコアの高い順、最大2件）
+    """
+    features = title_features([video['title'] for video in videos] + [vod[1] for vod in vods])
+    video_features = features[:len(videos)]
+    vod_features = features[len(videos):]
+    vod_times = [vod[2] for vod in vods]
+
+    order = sorted(range(len(videos)), key=lambda i: videos[i]['published_at'])
+    results = {}
+
+    vod_matrix = None
+    if np is not None and vods:
+        vod_matrix = np.zeros((len(vods), HASH_DIM), dtype=np.float32)
+        for row, weights in enumerate(vod_features):
+            if weights:
+                vod_matrix[row, list(weights)] = list(weights.values())
+        vod_times_array = np.asarray(vod_times, dtype=np.float64)
+
+    for start in range(0, len(order), CHUNK_SIZE):
+        indexes = order[start:start + CHUNK_SIZE]
+        times = [videos[i]['published_at'].timestamp() for i in indexes]
+        # 公開日時の範囲に配信開始が入るVODだけ（VODは配信開始順に並んでいる）
+        lo = bisect_left(vod_times, times[0] - MAX_UPLOAD_DELAY.total_seconds())
+        hi = bisect_right(vod_times, times[-1] - MIN_UPLOAD_DELAY.total_seconds())
+        if lo >= hi:
+            continue
+
+        if vod_matrix is not None:
+            total, title, dates = _score_chunk_numpy(
+                [video_features[i] for i in indexes], times, vod_matrix, vod_times_array, lo, hi
+            )
+            top = np.argsort(-total, axis=1)[:, :2]
+            for row, i in enumerate(indexes):
+                candidates = [
+                    (float(total[row, col]), vods[lo + col][0], float(title[row, col]), float(dates[row, col]))
+                    for col in top[row] if total[row, col] >= 0
+                ]
+                if candidates:
+                    results[videos[i]['video_id']] = candidates
+            continue
+
+        for row, i in enumerate(indexes):
+            weights = video_features[i]
+            candidates = []
+            for col in range(lo, hi):
+                delay = (times[row] - vod_times[col]) / 86400.0
+                if not MIN_UPLOAD_DELAY.days <= delay <= MAX_UPLOAD_DELAY.days:
+                    continue
+                other = vod_features[col]
+                small, large = (weights, other) if len(weights) < len(other) else (other, weights)
+                title = sum(w * large.get(bucket, 0.0) for bucket, w in small.items())
+                dates = date_score(delay)
+                candidates.append((TITLE_WEIGHT * title + DATE_WEIGHT * dates, vods[col][0], title, dates))
+            candidates.sort(reverse=True)
+            if candidates:
+                results[videos[i]['video_id']] = candidates[:2]
+    return results
+
+
+def match_export(cursor, videos, auto_score=AUTO_ACCEPT_SCORE, auto_margin=AUTO_ACCEPT_MARGIN, dry_run=False):
+    """
+    エクスポートの動画をVODに対応づけ、確度の高いものをyoutube_linksに一括登録
+
+    登録済み（youtube_links にある）動画は対象外。自動確定は1つのVODに1本まで（スコアの高い順）。
+    それ以外はベストの候補（なければ候補なし）と一緒に youtube_match_queue に入れる。
+    コミットは呼び出し側で行う。
+    Returns: {"videos", "already_linked", "linked", "queued", "unmatched", "matches"}
+    """
+    ensure_sync_schema(cursor)
+    cursor.execute("SELECT video_id FROM youtube_links WHERE video_id IS NOT NULL")
+    linked_ids = {row[0] for row in cursor.fetchall()}
+    cursor.execute("SELECT vod_id FROM youtube_links WHERE vod_id IS NOT NULL")
+    linked_vods = {row[0] for row in cursor.fetchall()}
+    cursor.execute("SELECT video_id FROM youtube_match_queue WHERE status != 'pending'")
+    decided_ids = {row[0] for row in cursor.fetchall()}
+
+    targets = [video for video in videos if video['video_id'] not in linked_ids | decided_ids]
+    vods = load_vods(cursor)
+    candidates = score_candidates(targets, vods)
+
+    # 確度の高い順に、まだ使われていないVODへ割り当てる
+    accepted = {}
+    ranked = sorted(
+        ((cands[0], video_id) for video_id, cands in candidates.items()), reverse=True
+    )
+    for (score, vod_id, _, _), video_id in ranked:
+        cands = candidates[video_id]
+        margin = score - cands[1][0] if len(cands) > 1 else score
+        if score >= auto_score and margin >= auto_margin and vod_id not in linked_vods:
+            accepted[video_id] = vod_id
+            linked_vods.add(vod_id)
+
+    now = to_utc_iso(utcnow())
+    link_rows = []
+    queue_rows = []
+    for video in targets:
+        video_id = video['video_id']
+        best = candidates.get(video_id, [(None, None, None, None)])[0]
+        if video_id in accepted:
+            link_rows.append((accepted[video_id], f"https://www.youtube.com/watch?v={video_id}",
+                              video['title'], video_id))
+        else:
+            queue_rows.append((video_id, video['title'], to_utc_iso(video['published_at']),
+                               best[1], best[0], best[2], best[3], now))
+
+    summary = {
+        "videos": len(videos),
+        "already_linked": len(videos) - len(targets),
+        "linked": len(link_rows),
+        "queued": sum(1 for row in queue_rows if row[3] is not None),
+        "unmatched": sum(1 for row in queue_rows if row[3] is None),
+        "matches": [{"video_id": row[3], "vod_id": row[0], "title": row[2]} for row in link_rows],
+    }
+    if dry_run:
+        return summary
+
+    cursor.executemany("""
+        INSERT INTO youtube_links (vod_id, url, title, video_id)
+        VALUES (?, ?, ?, ?)
+    """, link_rows)
+    cursor.executemany("""
+        DELETE FROM youtube_match_queue WHERE video_id = ?
+    """, [(row[3],) for row in link_rows])
+    # 再実行時は確認待ちの候補を新しい採点で置き換える
+    cursor.executemany("""
+        INSERT INTO youtube_match_queue
+            (video_id, title, published_at, vod_id, score, title_score, date_score, status, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, 'pending', ?)
+        ON CONFLICT(video_id) DO UPDATE SET
+            title = excluded.title, published_at = excluded.published_at, vod_id = excluded.vod_id,
+            score = excluded.score, title_score = excluded.title_score, date_score = excluded.date_score
+        WHERE youtube_match_queue.status = 'pending'
+    """, queue_rows)
+    logger.info(
+        f"YouTubeマッチング: {summary['linked']}件を登録, {summary['queued']}件を確認待ち, "
+        f"候補なし{summary['unmatched']}件"
+    )
+    return summary
+
+
+def list_review_queue(cursor, limit=50):
+    """確認待ちの候補をスコアの高い順に返す（候補のVODのタイトル・配信日付き）"""
+    cursor.execute("""
+        SELECT q.id, q.video_id, q.title, q.published_at, q.vod_id, v.title, v.created_at,
+               q.score, q.title_score, q.date_score
+        FROM youtube_match_queue q
+        LEFT JOIN vods v ON v.id = q.vod_id
+        WHERE q.status = 'pending'
+        ORDER BY q.score IS NULL, q.score DESC
+        LIMIT ?
+    """, (limit,))
+    columns = ['id', 'video_id', 'title', 'published_at', 'vod_id', 'vod_title', 'vod_created_at',
+               'score', 'title_score', 'date_score']
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def accept_match(cursor, queue_id, vod_id=None):
+    """確認待ちの候補を確定してyoutube_linksに登録（vod_id で別のVODを指定可能）"""
+    cursor.execute("SELECT video_id, title, vod_id FROM youtube_match_queue WHERE id = ?", (queue_id,))
+    row = cursor.fetchone()
+    if not row or not (vod_id or row[2]):
+        return False
+    video_id, title, candidate = row
+    cursor.execute("""
+        INSERT INTO youtube_links (vod_id, url, title, video_id)
+        VALUES (?, ?, ?, ?)
+    """, (vod_id or candidate, f"https://www.youtube.com/watch?v={video_id}", title, video_id))
+    cursor.execute("""
+        UPDATE youtube_match_queue SET status = 'accepted', vod_id = ?, decided_at = ?
+        WHERE id = ?
+    """, (vod_id or candidate, to_utc_iso(utcnow()), queue_id))
+    return True
+
+
+def reject_match(cursor, queue_id):
+    """確認待ちの候補を却下（次回のマッチングでも対象外になる）"""
+    cursor.execute("""
+        UPDATE youtube_match_queue SET status = 'rejected', decided_at = ?
+        WHERE id = ? AND status = 'pending'
+    """, (to_utc_iso(utcnow()), queue_id))
+    return cursor.rowcount > 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="YouTubeのエクスポートとVODを一括マッチング")
+    parser.add_argument('export', help="エクスポートファイル（.json / .csv）")
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--dry-run', action='store_true', help="登録せずに結果だけ表示")
+    parser.add_argument('--auto-score', type=float, default=AUTO_ACCEPT_SCORE)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    with open(args.export, 'rb') as f:
+        videos = load_export(f.read(), filename=args.export)
+
+    conn = sqlite3.connect(args.db, check_same_thread=False)
+    try:
+        summary = match_export(conn.cursor(), videos, auto_score=args.auto_score, dry_run=args.dry_run)
+        conn.commit()
+    finally:
+        conn.close()
+    summary.pop('matches')
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
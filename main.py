@@ -1,732 +1,575 @@
-# メインエントリーポイント: main.py (修正版 - 日付指定同期機能付き)
-import streamlit as st
-import sys
-import os
-import sqlite3
-from datetime import datetime, timedelta
-
-# パス設定
-sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
-
-# データ同期管理（修正版）
-from app.utils.update_manager import (
-    refresh_data, 
-    get_database_stats, 
-    clear_cache, 
-    add_sidebar_sync_controls,
-    check_api_configuration,
-    show_config_guide,
-    test_twitch_connection
-)
-
-# ページ設定 - デフォルトのサイドバーを無効化
-st.set_page_config(
-    page_title="配信アーカイブ共有サイト",
-    page_icon="🎥",
-    layout="wide",
-    initial_sidebar_state="collapsed"  # デフォルトのサイドバーを非表示
-)
-
-# 修正されたCSSとTwitchボタン部分
-st.markdown("""
-<style>
-    .stAppDeployButton {
-        display: none;
-    }
-    
-    section[data-testid="stSidebar"] > div:first-child {
-        padding-top: 0rem;
-    }
-    
-    /* デフォルトのページナビゲーションを完全に非表示 */
-    section[data-testid="stSidebar"] .stSelectbox {
-        display: none !important;
-    }
-    
-    /* デフォルトのページリストを非表示 */
-    section[data-testid="stSidebar"] ul {
-        display: none !important;
-    }
-    
-    /* ページナビゲーション全体を非表示 */
-    section[data-testid="stSidebar"] nav {
-        display: none !important;
-    }
-    
-    /* ページセレクタのコンテナを非表示 */
-    section[data-testid="stSidebar"] > div > div:first-child {
-        display: none !important;
-    }
-    
-    /* Streamlitのデフォルトナビゲーションクラスを非表示 */
-    .css-1d391kg, .css-1y0tads, .e1fqkh3o0, .css-17lntkn {
-        display: none !important;
-    }
-    
-    /* セレクトボックス全般を非表示 */
-    .stSelectbox > div > div > div {
-        display: none !important;
-    }
-    
-    /* Twitchボタンを右上に固定（修正版） */
-    .twitch-button-container {
-        position: fixed;
-        top: 20px;
-        right: 30px;
-        z-index: 9999 !important;
-        max-width: 200px;
-        pointer-events: auto;
-    }
-    
-    .twitch-button {
-        background: linear-gradient(135deg, #9146ff, #772ce8);
-        color: white !important;
-        padding: 10px 18px;
-        border-radius: 20px;
-        text-decoration: none !important;
-        font-weight: bold;
-        font-size: 13px;
-        display: inline-block;
-        box-shadow: 0 4px 12px rgba(145, 70, 255, 0.3);
-        transition: all 0.3s ease;
-        border: none;
-        white-space: nowrap;
-        width: 100%;
-        text-align: center;
-        box-sizing: border-box;
-        cursor: pointer !important;
-        pointer-events: auto !important;
-        position: relative;
-        z-index: 10000 !important;
-    }
-    
-    .twitch-button:hover {
-        background: linear-gradient(135deg, #772ce8, #5c2099);
-        transform: translateY(-2px);
-        box-shadow: 0 6px 16px rgba(145, 70, 255, 0.4);
-        color: white !important;
-        text-decoration: none !important;
-    }
-    
-    .twitch-button:visited {
-        color: white !important;
-    }
-    
-    .twitch-button:active {
-        color: white !important;
-        transform: translateY(0px);
-    }
-    
-    /* Streamlit要素との重複を避ける */
-    .stApp > header {
-        z-index: 1 !important;
-    }
-    
-    .stApp > div {
-        z-index: 1 !important;
-    }
-    
-    /* レスポンシブ対応 */
-    @media (max-width: 768px) {
-        .twitch-button-container {
-            position: fixed;
-            top: 15px;
-            right: 15px;
-            max-width: 150px;
-        }
-        
-        .twitch-button {
-            font-size: 12px;
-            padding: 8px 14px;
-        }
-    }
-    
-    @media (max-width: 480px) {
-        .twitch-button-container {
-            position: fixed;
-            top: 10px;
-            right: 10px;
-            max-width: 120px;
-        }
-        
-        .twitch-button {
-            font-size: 11px;
-            padding: 6px 12px;
-            border-radius: 15px;
-        }
-    }
-    
-    /* メインコンテンツエリアに余白を追加（ボタンとの重複回避） */
-    .main > div {
-        padding-top: 10px;
-    }
-    
-    /* Streamlitのヘッダー部分との重複を避ける */
-    header[data-testid="stHeader"] {
-        background: transparent;
-        z-index: 1 !important;
-    }
-    
-    /* 更新ボタン用スタイル */
-    .update-section {
-        background: linear-gradient(135deg, #f8f9fa 0%, #ffffff 100%);
-        border: 1px solid #e0e0e0;
-        border-radius: 12px;
-        padding: 20px;
-        margin: 20px 0;
-        box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-    }
-    
-    .stats-grid {
-        display: grid;
-        grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-        gap: 15px;
-        margin: 20px 0;
-    }
-    
-    .stat-card {
-        background: linear-gradient(135deg, #ffffff 0%, #f8f9fa 100%);
-        border: 1px solid #e0e0e0;
-        border-radius: 10px;
-        padding: 20px;
-        text-align: center;
-        box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-        transition: transform 0.2s ease;
-    }
-    
-    .stat-card:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 4px 12px rgba(0,0,0,0.15);
-    }
-    
-    .stat-number {
-        font-size: 2.2em;
-        font-weight: bold;
-        color: #1f4e79;
-        margin-bottom: 8px;
-        text-shadow: 1px 1px 2px rgba(0,0,0,0.1);
-    }
-    
-    .stat-label {
-        color: #666;
-        font-size: 0.95em;
-        font-weight: 500;
-    }
-    
-    .last-update {
-        color: #666;
-        font-size: 0.85em;
-        margin-top: 10px;
-        font-style: italic;
-    }
-    
-    .status-indicator {
-        display: inline-block;
-        width: 10px;
-        height: 10px;
-        border-radius: 50%;
-        margin-right: 8px;
-    }
-    
-    .status-ok { background-color: #28a745; }
-    .status-warning { background-color: #ffc107; }
-    .status-error { background-color: #dc3545; }
-    
-    /* 日付指定セクション用スタイル */
-    .date-range-section {
-        background: linear-gradient(135deg, #e3f2fd 0%, #f3e5f5 100%);
-        border: 1px solid #b3d9ff;
-        border-radius: 10px;
-        padding: 15px;
-        margin: 15px 0;
-    }
-    
-    .sync-mode-tabs {
-        display: flex;
-        gap: 10px;
-        margin-bottom: 15px;
-    }
-    
-    .sync-mode-tab {
-        flex: 1;
-        padding: 8px 12px;
-        border: 2px solid #ddd;
-        border-radius: 8px;
-        background: #f8f9fa;
-        cursor: pointer;
-        text-align: center;
-        transition: all 0.3s ease;
-    }
-    
-    .sync-mode-tab.active {
-        border-color: #007bff;
-        background: #007bff;
-        color: white;
-        font-weight: bold;
-    }
-    
-    .sync-mode-tab:hover {
-        border-color: #007bff;
-        background: #e7f3ff;
-    }
-    
-    .sync-mode-tab.active:hover {
-        background: #0056b3;
-    }
-</style>
-
-<script>
-// JavaScriptでクリックイベントを強制的に有効化
-document.addEventListener('DOMContentLoaded', function() {
-    function ensureTwitchButtonWorks() {
-        const twitchButton = document.querySelector('.twitch-button');
-        if (twitchButton) {
-            // 既存のイベントリスナーをクリア
-            twitchButton.onclick = null;
-            
-            // 新しいクリックイベントを追加
-            twitchButton.addEventListener('click', function(e) {
-                e.preventDefault();
-                e.stopPropagation();
-                
-                const url = this.getAttribute('href');
-                if (url) {
-                    window.open(url, '_blank', 'noopener,noreferrer');
-                }
-                
-                // デバッグ用
-                console.log('Twitch button clicked:', url);
-            }, true);
-            
-            // マウスオーバーイベントも追加（動作確認用）
-            twitchButton.addEventListener('mouseover', function() {
-                console.log('Twitch button hover detected');
-            });
-        }
-    }
-    
-    // 初期実行
-    ensureTwitchButtonWorks();
-    
-    // Streamlitの再描画後にも実行
-    setTimeout(ensureTwitchButtonWorks, 500);
-    setInterval(ensureTwitchButtonWorks, 2000);
-});
-</script>
-""", unsafe_allow_html=True)
-
-# Twitchボタンを右上に配置（修正版 - JavaScriptでも動作するように）
-twitch_url = "https://www.twitch.tv/midorokun"  # ← 適宜変更可
-st.markdown(
-    f'''
-    <div class="twitch-button-container">
-        <a href="{twitch_url}" target="_blank" class="twitch-button" 
-           onclick="window.open('{twitch_url}', '_blank', 'noopener,noreferrer'); return false;">
-            Twitch
-        </a>
-    </div>
-    ''',
-    unsafe_allow_html=True
-)
-
-# 手動更新機能（改良版 - 日付指定機能付き）
-def add_manual_update_section():
-    """手動更新セクションを追加（日付指定機能付き）"""
-    
-    st.markdown('<div class="update-section">', unsafe_allow_html=True)
-    
-    # API設定状態チェック
-    config_ok, config_msg = check_api_configuration()
-    
-    # セクションタイトル
-    st.markdown("### 🔄 データ更新")
-    
-    # 同期モード選択
-    sync_mode = st.radio(
-        "同期モード",
-        ["通常同期 (過去7日)", "日付指定同期"],
-        horizontal=True,
-        key="sync_mode_selector",
-        help="通常同期: 過去7日間のデータを取得\n日付指定同期: 指定した日付からのデータを取得"
-    )
-    
-    # 日付指定セクション
-    date_range_params = None
-    if sync_mode == "日付指定同期":
-        st.markdown('<div class="date-range-section">', unsafe_allow_html=True)
-        
-        col_date1, col_date2 = st.columns(2)
-        
-        with col_date1:
-            start_date = st.date_input(
-                "開始日",
-                value=datetime.now().date() - timedelta(days=30),
-                max_value=datetime.now().date(),
-                help="この日付以降のデータを取得します"
-            )
-        
-        with col_date2:
-            end_date = st.date_input(
-                "終了日",
-                value=datetime.now().date(),
-                min_value=start_date,
-                max_value=datetime.now().date(),
-                help="この日付までのデータを取得します"
-            )
-        
-        # 日付範囲の確認
-        days_diff = (end_date - start_date).days
-        if days_diff > 90:
-            st.warning("⚠️ 90日以上の期間が指定されています。API制限により、データ取得に時間がかかる可能性があります。")
-        elif days_diff <= 0:
-            st.error("❌ 開始日は終了日より前である必要があります。")
-        else:
-            st.info(f"📅 取得期間: {days_diff + 1}日間 ({start_date} ～ {end_date})")
-        
-        date_range_params = {
-            'start_date': start_date,
-            'end_date': end_date
-        }
-        
-        st.markdown('</div>', unsafe_allow_html=True)
-    
-    # API設定状態とボタン配置
-    col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
-    
-    with col1:
-        # API設定状態表示
-        if config_ok:
-            st.markdown('<span class="status-indicator status-ok"></span>**API設定**: 正常', unsafe_allow_html=True)
-        else:
-            st.markdown('<span class="status-indicator status-error"></span>**API設定**: エラー', unsafe_allow_html=True)
-            st.caption(config_msg)
-        
-        # 最終更新時刻の表示
-        if "last_manual_refresh" not in st.session_state:
-            st.session_state.last_manual_refresh = datetime.now()
-        
-        last_update = st.session_state.last_manual_refresh.strftime('%Y-%m-%d %H:%M:%S')
-        st.markdown(f'<div class="last-update">最終更新: {last_update}</div>', unsafe_allow_html=True)
-    
-    with col2:
-        sync_button_text = "🔄 Twitch同期" if sync_mode == "通常同期 (過去7日)" else "📅 日付指定同期"
-        sync_disabled = not config_ok or (sync_mode == "日付指定同期" and date_range_params and (date_range_params['end_date'] - date_range_params['start_date']).days <= 0)
-        
-        if st.button(sync_button_text, key="manual_refresh_main", use_container_width=True, type="primary", disabled=sync_disabled):
-            if config_ok:
-                spinner_text = "📡 Twitchからデータを同期中..." if sync_mode == "通常同期 (過去7日)" else f"📅 指定期間のデータを同期中... ({date_range_params['start_date']} ～ {date_range_params['end_date']})"
-                
-                with st.spinner(spinner_text):
-                    result = refresh_data(date_range=date_range_params)
-
-                if result.get("success"):
-                    st.success("✅ データを更新しました！")
-                    
-                    # 結果詳細を表示
-                    if "result" in result:
-                        st.info(f"📊 {result['result']}")
-                    
-                    # 統計キャッシュをクリア
-                    get_database_stats.clear()
-                    st.session_state.last_manual_refresh = datetime.now()
-                    st.rerun()
-                else:
-                    st.error("❌ 更新に失敗しました")
-                    error_msg = result.get("error", "不明なエラー")
-                    st.caption(error_msg)
-                    
-                    # 設定エラーの場合はガイドを表示
-                    if "設定" in error_msg or "API" in error_msg:
-                        if st.expander("🔧 設定ヘルプ", expanded=True):
-                            show_config_guide()
-            else:
-                st.error("API設定を完了してください")
-    
-    with col3:
-        if st.button("🧪 接続テスト", key="test_connection_main", use_container_width=True):
-            test_twitch_connection()
-    
-    with col4:
-        if st.button("🗑️ キャッシュクリア", key="clear_cache_main", use_container_width=True):
-            clear_cache()
-            st.info("🔄 キャッシュをクリアしました")
-            st.rerun()
-    
-    st.markdown('</div>', unsafe_allow_html=True)
-
-# データベース統計表示（改良版）
-def show_database_overview():
-    """データベース概要を表示"""
-    
-    st.markdown("### 📊 データベース概要")
-    
-    stats = get_database_stats()
-    
-    if "error" in stats:
-        st.error(f"❌ データベース接続エラー: {stats['error']}")
-        
-        # データベースファイルの存在確認
-        if not os.path.exists("vods.db"):
-            st.warning("⚠️ データベースファイルが存在しません。初回同期を実行してください。")
-        
-        return
-    
-    # 統計カードを表示
-    st.markdown('<div class="stats-grid">', unsafe_allow_html=True)
-    
-    # メインの統計
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        st.markdown(f'''
-        <div class="stat-card">
-            <div class="stat-number">{stats["vods_count"]}</div>
-            <div class="stat-label">📺 配信動画</div>
-        </div>
-        ''', unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown(f'''
-        <div class="stat-card">
-            <div class="stat-number">{stats["clips_count"]}</div>
-            <div class="stat-label">✂️ クリップ</div>
-        </div>
-        ''', unsafe_allow_html=True)
-    
-    with col3:
-        st.markdown(f'''
-        <div class="stat-card">
-            <div class="stat-number">{stats["youtube_count"]}</div>
-            <div class="stat-label">🎥 YouTubeリンク</div>
-        </div>
-        ''', unsafe_allow_html=True)
-    
-    with col4:
-        st.markdown(f'''
-        <div class="stat-card">
-            <div class="stat-number">{stats["total_items"]}</div>
-            <div class="stat-label">📚 総コンテンツ数</div>
-        </div>
-        ''', unsafe_allow_html=True)
-    
-    st.markdown('</div>', unsafe_allow_html=True)
-    
-    # 今日の追加数
-    if stats["today_vods"] > 0 or stats["today_clips"] > 0:
-        st.success(f"🆕 本日追加: VOD {stats['today_vods']}件、クリップ {stats['today_clips']}件")
-    
-    # 最新更新情報
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        if stats["latest_vod"]:
-            vod_time = stats['latest_vod']
-            try:
-                # 日時フォーマットを調整
-                if 'T' in vod_time:
-                    vod_dt = datetime.fromisoformat(vod_time.replace('Z', '+00:00'))
-                    formatted_time = vod_dt.strftime('%m/%d %H:%M')
-                else:
-                    formatted_time = vod_time
-                st.caption(f"📺 最新VOD: {formatted_time}")
-            except:
-                st.caption(f"📺 最新VOD: {vod_time}")
-        else:
-            st.caption("📺 VODデータがありません")
-    
-    with col2:
-        if stats["latest_clip"]:
-            clip_time = stats['latest_clip']
-            try:
-                if 'T' in clip_time:
-                    clip_dt = datetime.fromisoformat(clip_time.replace('Z', '+00:00'))
-                    formatted_time = clip_dt.strftime('%m/%d %H:%M')
-                else:
-                    formatted_time = clip_time
-                st.caption(f"✂️ 最新クリップ: {formatted_time}")
-            except:
-                st.caption(f"✂️ 最新クリップ: {clip_time}")
-        else:
-            st.caption("✂️ クリップデータがありません")
-
-# 共通サイドバー関数（改良版）
-def show_sidebar():
-    with st.sidebar:
-        st.title("🎥 VOD Finder")
-        
-        # Twitch同期コントロール
-        add_sidebar_sync_controls()
-        
-        st.markdown("---")
-        
-        # ナビゲーション
-        st.markdown("### 📍 ナビゲーション")
-        
-        # ページリンク
-        pages = {
-            "🏠 Home": "main.py",
-            "📺 Videos": "pages/1_videos.py", 
-            "✂️ Clips": "pages/3_clips.py",
-            "⭐ Favorites": "pages/5_favorites.py",
-            "🔑 Login": "pages/6_login.py"
-        }
-        
-        for page_name, page_file in pages.items():
-            if st.button(page_name, use_container_width=True):
-                st.switch_page(page_file)
-        
-        st.markdown("---")
-        
-        # 検索ボックス
-        st.markdown("### 🔍 クイック検索")
-        search_query = st.text_input("検索", placeholder="タイトルやゲーム名で検索...", label_visibility="collapsed")
-        if search_query:
-            st.session_state['search_query'] = search_query
-            st.switch_page("pages/1_videos.py")
-        
-        # 認証状態表示
-        st.markdown("---")
-        st.markdown("### 👤 ユーザー状態")
-        
-        if st.session_state.get("is_admin", False):
-            st.success("✅ 編集者ログイン中")
-            
-            col1, col2 = st.columns(2)
-            with col1:
-                if st.button("VOD追加", use_container_width=True):
-                    st.switch_page("pages/7_add_vod.py")
-            with col2:
-                if st.button("Clip追加", use_container_width=True):
-                    st.switch_page("pages/8_add_clip.py")
-            
-            if st.button("🚪 ログアウト", use_container_width=True, type="secondary"):
-                st.session_state["is_admin"] = False
-                st.success("ログアウトしました")
-                st.rerun()
-        else:
-            st.info("🔒 閲覧モード")
-            if st.button("🔑 編集者ログイン", use_container_width=True):
-                st.switch_page("pages/6_login.py")
-
-# サイドバー表示
-show_sidebar()
-
-# メインコンテンツ（ホームページ）
-st.title("🎥 配信アーカイブ共有サイト")
-st.markdown("---")
-
-# 手動更新セクション
-add_manual_update_section()
-
-# データベース概要
-show_database_overview()
-
-# サイト紹介
-st.markdown("""
-### 🔍 このサイトについて
-(2025/08/18)Youtube,ニコニコの配信履歴を追加し、残っている限りyoutubeのリンクと結び付けました。  
-このサイトは、みどりくんの**配信アーカイブ（VOD）やクリップ動画**を整理・共有するための非公式データベースです。  
-個人制作のため、抜けや漏れがある可能性があります。ご承知おきください。
-
-#### 📁 主な機能
-- **📺 Videos**：配信アーカイブの一覧・検索・視聴
-- **✂️ Clips**：切り抜き動画の一覧・検索・視聴  
-- **⭐ Favorites**：お気に入りに追加したクリップ管理
-- **🔑 Login**：編集者用ログイン（データ追加・編集）
-
-#### 🎯 使い方
-1. **左サイドバー**から各ページに移動
-2. **検索ボックス**でコンテンツを検索
-3. **お気に入り機能**でクリップを保存(サイトを離れるとリセットされます。)
-4. **編集者権限**でデータの追加・修正
-
-#### 🔄 データ更新
-- **通常同期**: 過去7日間のデータを自動取得
-- **日付指定同期**: 指定した期間のデータを取得
-- **接続テスト**でAPI設定を確認
-- **Youtubeリンクは手動で登録してます**
-""")
-
-# 操作ガイド
-with st.expander("📖 詳細操作ガイド", expanded=False):
-    st.markdown("""
-    #### 🔧 初期設定（管理者向け）
-    1. **Twitch Developer Console**でアプリケーションを作成
-    2. **Client ID**と**Client Secret**を取得
-    3. **`.env`ファイル**に設定情報を記入
-    4. **接続テスト**で設定を確認
-    
-    #### 📱 日常の使い方
-    1. **データ同期**：定期的に「Twitch同期」ボタンをクリック
-    2. **動画検索**：Videosページで配信アーカイブを検索
-    3. **クリップ視聴**：Clipsページで切り抜き動画を視聴
-    4. **お気に入り**：気に入ったクリップを保存・管理
-    
-    #### 📅 日付指定同期の使い方
-    1. **日付指定同期**を選択
-    2. **開始日**と**終了日**を設定
-    3. **日付指定同期**ボタンをクリック
-    4. 指定期間のデータが取得されます
-    
-    #### ⚠️ トラブルシューティング
-    - **同期エラー**：接続テストでAPI設定を確認
-    - **データが古い**：手動で「Twitch同期」を実行
-    - **表示異常**：「キャッシュクリア」を実行
-    - **長期間指定時**：90日以上は時間がかかる場合があります
-    """)
-
-# システム状態表示
-if st.session_state.get("is_admin", False):
-    with st.expander("🔧 システム情報（管理者用）", expanded=False):
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            st.markdown("**データベース**")
-            if os.path.exists("vods.db"):
-                db_size = os.path.getsize("vods.db") / 1024 / 1024  # MB
-                st.caption(f"📁 ファイルサイズ: {db_size:.2f} MB")
-                
-                db_mtime = os.path.getmtime("vods.db")
-                db_update = datetime.fromtimestamp(db_mtime)
-                st.caption(f"🕒 最終変更: {db_update.strftime('%m/%d %H:%M')}")
-            else:
-                st.caption("❌ データベースファイルなし")
-        
-        with col2:
-            st.markdown("**API設定**")
-            config_ok, config_msg = check_api_configuration()
-            if config_ok:
-                st.caption("✅ 設定正常")
-            else:
-                st.caption("❌ 設定エラー")
-                st.caption(config_msg)
-        
-        with col3:
-            st.markdown("**セッション情報**")
-            st.caption(f"🔑 管理者: {'有効' if st.session_state.get('is_admin') else '無効'}")
-            if "last_manual_refresh" in st.session_state:
-                last_refresh = st.session_state.last_manual_refresh
-                st.caption(f"🔄 最終同期: {last_refresh.strftime('%H:%M')}")
-
-# 認証状態の詳細表示
-st.markdown("---")
-if st.session_state.get("is_admin"):
-    st.success("✅ 編集者としてログイン中です。")
-    st.markdown("サイドバーから新しいVODやClipを追加できます。データの同期や管理機能をご利用ください。")
-else:
-    st.info("🔒 現在は閲覧モードです。")
-    st.markdown("動画の検索・視聴・お気に入り機能をご利用いただけます。編集者権限が必要な場合はログインしてください。")
-
-# フッター情報
-st.markdown("---")
-st.markdown(
-    '''
-    <div style="text-align: center; color: #666; font-size: 0.9em; padding: 20px;">
-        <p>🎥 <strong>配信アーカイブ共有サイト</strong></p>
-        <p>データはTwitch APIから取得・定期更新されます | 
-        <a href="https://www.twitch.tv/midorokun" target="_blank">配信チャンネル</a> | 
-        <a href="https://x.com/blank_et4869" target="_blank">お問い合わせ</a> </p>
-    </div>
-    ''',
-    unsafe_allow_html=True
-)
+# メインエントリーポイント: main.py (修正版 - 日付指定同期機能付き)
+import streamlit as st
+import sys
+import os
+import sqlite3
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+# パス設定
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+# データ同期管理（修正版）
+from app.utils.update_manager import (
+    refresh_data, 
+    get_database_stats, 
+    clear_cache, 
+    add_sidebar_sync_controls,
+    check_api_configuration,
+    show_config_guide,
+    test_twitch_connection,
+    get_sync_status,
+    show_sync_status
+)
+from app.utils.progress import get_latest_run, get_run_history, request_cancel
+from app.components.channel_selector import get_selected_channel, channel_url
+from app.components.youtube_matcher import show_youtube_matcher
+from app.components.catalog_export import show_catalog_export
+from app.components.page_shell import apply_page_shell
+
+# ページ設定 - デフォルトのサイドバーを無効化
+st.set_page_config(
+    page_title="配信アーカイブ共有サイト",
+    page_icon="🎥",
+    layout="wide",
+    initial_sidebar_state="collapsed"  # デフォルトのサイドバーを非表示
+)
+
+# 共通・ホーム用のCSS/JS（static/ から1セッションに1回だけ読み込む）
+apply_page_shell("home")
+
+# Twitchボタンを右上に配置（クリックは static/js/shell.js が新しいタブで開く）
+# リンク先は選択中のチャンネル（未登録なら .env の TWITCH_CHANNEL_NAME）
+twitch_url = channel_url(get_selected_channel())
+if not twitch_url and os.getenv("TWITCH_CHANNEL_NAME"):
+    twitch_url = f"https://www.twitch.tv/{os.getenv('TWITCH_CHANNEL_NAME')}"
+if twitch_url:
+    st.markdown(
+        f'''
+        <div class="twitch-button-container">
+            <a href="{twitch_url}" target="_blank" rel="noopener noreferrer" class="twitch-button">
+                Twitch
+            </a>
+        </div>
+        ''',
+        unsafe_allow_html=True
+    )
+
+# 手動更新機能（改良版 - 日付指定機能付き）
+def add_manual_update_section():
+    """手動更新セクションを追加（日付指定機能付き）"""
+    
+    st.markdown('<div class="update-section">', unsafe_allow_html=True)
+    
+    # API設定状態チェック
+    config_ok, config_msg = check_api_configuration()
+    
+    # セクションタイトル
+    st.markdown("### 🔄 データ更新")
+    
+    # 同期モード選択
+    sync_mode = st.radio(
+        "同期モード",
+        ["通常同期 (差分)", "日付指定同期"],
+        horizontal=True,
+        key="sync_mode_selector",
+        help="通常同期: 前回の同期以降のデータを取得\n日付指定同期: 指定した日付からのデータを取得"
+    )
+    
+    # 日付指定セクション
+    date_range_params = None
+    if sync_mode == "日付指定同期":
+        st.markdown('<div class="date-range-section">', unsafe_allow_html=True)
+        
+        col_date1, col_date2 = st.columns(2)
+        
+        with col_date1:
+            start_date = st.date_input(
+                "開始日",
+                value=datetime.now().date() - timedelta(days=30),
+                max_value=datetime.now().date(),
+                help="この日付以降のデータを取得します"
+            )
+        
+        with col_date2:
+            end_date = st.date_input(
+                "終了日",
+                value=datetime.now().date(),
+                min_value=start_date,
+                max_value=datetime.now().date(),
+                help="この日付までのデータを取得します"
+            )
+        
+        # 日付範囲の確認
+        days_diff = (end_date - start_date).days
+        if days_diff > 90:
+            st.warning("⚠️ 90日以上の期間が指定されています。API制限により、データ取得に時間がかかる可能性があります。")
+        elif days_diff <= 0:
+            st.error("❌ 開始日は終了日より前である必要があります。")
+        else:
+            st.info(f"📅 取得期間: {days_diff + 1}日間 ({start_date} ～ {end_date})")
+        
+        date_range_params = {
+            'start_date': start_date,
+            'end_date': end_date
+        }
+        
+        st.markdown('</div>', unsafe_allow_html=True)
+    
+    # API設定状態とボタン配置
+    col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
+    
+    with col1:
+        # API設定状態表示
+        if config_ok:
+            st.markdown('<span class="status-indicator status-ok"></span>**API設定**: 正常', unsafe_allow_html=True)
+        else:
+            st.markdown('<span class="status-indicator status-error"></span>**API設定**: エラー', unsafe_allow_html=True)
+            st.caption(config_msg)
+        
+        # 同期状態の表示（読み取りのみ）
+        show_sync_status()
+    
+    with col2:
+        sync_button_text = "🔄 Twitch同期" if sync_mode == "通常同期 (差分)" else "📅 日付指定同期"
+        sync_disabled = not config_ok or (sync_mode == "日付指定同期" and date_range_params and (date_range_params['end_date'] - date_range_params['start_date']).days <= 0)
+        
+        if st.button(sync_button_text, key="manual_refresh_main", use_container_width=True, type="primary", disabled=sync_disabled):
+            if config_ok:
+                # 同期はバックグラウンドのプロセスで実行し、この画面は待たない
+                result = refresh_data(date_range=date_range_params)
+
+                if result.get("success"):
+                    st.success("✅ 同期を開始しました")
+                    st.info("📊 完了後に再読み込みすると新しいデータが反映されます")
+                    get_sync_status.clear()
+                    st.session_state.last_manual_refresh = datetime.now()
+                else:
+                    st.error("❌ 同期を開始できませんでした")
+                    error_msg = result.get("error", "不明なエラー")
+                    st.caption(error_msg)
+                    
+                    # 設定エラーの場合はガイドを表示
+                    if "設定" in error_msg or "API" in error_msg:
+                        if st.expander("🔧 設定ヘルプ", expanded=True):
+                            show_config_guide()
+            else:
+                st.error("API設定を完了してください")
+    
+    with col3:
+        if st.button("🧪 接続テスト", key="test_connection_main", use_container_width=True):
+            test_twitch_connection()
+    
+    with col4:
+        if st.button("🗑️ キャッシュクリア", key="clear_cache_main", use_container_width=True):
+            clear_cache()
+            st.info("🔄 キャッシュをクリアしました")
+            st.rerun()
+    
+    # 同期の進捗（このブロックだけが定期的に再実行される）
+    show_sync_progress()
+    
+    st.markdown('</div>', unsafe_allow_html=True)
+
+# 同期の進捗表示（sync_runsを2秒ごとに1行だけ読む）
+@st.fragment(run_every=2)
+def show_sync_progress():
+    """実行中の同期の進捗と、直近の同期結果を表示"""
+    run = get_latest_run("vods.db")
+    if not run:
+        return
+    
+    if run["status"] != "running":
+        status_labels = {
+            "completed": "✅ 完了",
+            "cancelled": "⏹️ キャンセル",
+            "failed": "❌ 失敗",
+            "abandoned": "⚠️ 中断（応答なし）"
+        }
+        label = status_labels.get(run["status"], run["status"])
+        st.caption(f"直近の同期 #{run['id']}: {label} - {run['message'] or ''}")
+        
+        # 実行中から終了に変わったら再描画（統計はデータバージョンが進んだ分だけ読み直される）
+        if st.session_state.get("watching_run_id") == run["id"]:
+            del st.session_state["watching_run_id"]
+            get_sync_status.clear()
+            st.rerun()
+        return
+    
+    st.session_state.watching_run_id = run["id"]
+    progress = min(max(run["progress"] or 0.0, 0.0), 1.0)
+    
+    # 経過時間と進捗率から残り時間を見積もる
+    eta_text = ""
+    try:
+        started = datetime.fromisoformat(run["started_at"].replace('Z', '+00:00'))
+        elapsed = (datetime.now(started.tzinfo) - started).total_seconds()
+        if progress > 0.05:
+            eta_text = f" / 残り約{int(elapsed * (1 - progress) / progress)}秒"
+    except Exception:
+        pass
+    
+    st.progress(progress, text=f"⏳ 同期 #{run['id']} 実行中: {run['stage'] or '準備中'} ({progress:.0%}{eta_text})")
+    
+    details = f"📄 {run['pages']}ページ / 📝 {run['rows_merged']}件反映"
+    if run["window_start"]:
+        details += f" / 🗓️ {run['window_start']} ～ {run['window_end']}"
+    if run["throttle_waits"]:
+        details += f" / 🐢 待機 {run['throttle_waits']}回 ({run['throttle_seconds']:.0f}秒)"
+    st.caption(details)
+    if run["message"]:
+        st.caption(run["message"])
+    
+    if st.session_state.get("is_admin", False):
+        if run["cancel_requested"]:
+            st.caption("⏹️ キャンセル要求済み（次のページ区切りで停止します）")
+        elif st.button("⏹️ 同期をキャンセル", key=f"cancel_sync_{run['id']}"):
+            request_cancel("vods.db", run["id"])
+            st.info("キャンセルを要求しました（取得済みのデータは保存されます）")
+
+# 同期メトリクスの推移（管理者用）
+@st.cache_data(ttl=60)
+def load_sync_history(limit=100):
+    """終了した通常同期・日付指定同期のメトリクス（古い順）"""
+    return get_run_history("vods.db", limit=limit, kinds=["sync", "range"])
+
+def show_sync_trends():
+    """同期ごとの所要時間・API呼び出し・反映件数の推移を表示"""
+    history = load_sync_history()
+    if not history:
+        st.caption("まだ同期の履歴がありません")
+        return
+    
+    index = [f"#{run['id']} {(run['started_at'] or '')[5:16].replace('T', ' ')}" for run in history]
+    
+    # ステージ（チャンネル取得・反映・ゲーム名）ごとの所要時間
+    stages = pd.DataFrame([run["stage_seconds"] for run in history], index=index).fillna(0)
+    if not stages.empty:
+        st.markdown("**ステージ別の所要時間（秒）**")
+        st.bar_chart(stages)
+    
+    counts = pd.DataFrame({
+        "API呼び出し": [run["api_calls"] or 0 for run in history],
+        "追加": [run["rows_inserted"] or 0 for run in history],
+        "更新": [run["rows_updated"] or 0 for run in history],
+        "紐づけ": [run["rows_linked"] or 0 for run in history],
+    }, index=index)
+    st.markdown("**API呼び出しと反映件数**")
+    st.line_chart(counts)
+    
+    waits = pd.DataFrame({
+        "待機秒数": [run["throttle_seconds"] or 0 for run in history],
+        "エラー": [run["error_count"] or 0 for run in history],
+    }, index=index)
+    st.markdown("**レート制限の待機とエラー**")
+    st.line_chart(waits)
+    
+    # 直近5回の中央値がそれ以前の中央値より大きく遅ければ知らせる
+    durations = pd.Series([run["duration_seconds"] for run in history]).dropna()
+    if len(durations) >= 10:
+        recent = durations.iloc[-5:].median()
+        baseline = durations.iloc[:-5].median()
+        if baseline > 0 and recent > baseline * 1.5:
+            st.warning(f"⚠️ 直近の同期が遅くなっています（中央値 {recent:.1f}秒 / 以前 {baseline:.1f}秒）")
+        else:
+            st.caption(f"所要時間の中央値: 直近 {recent:.1f}秒 / 以前 {baseline:.1f}秒")
+    
+    latest = history[-1]
+    st.caption(
+        f"直近 #{latest['id']}: {latest['duration_seconds'] or 0:.1f}秒, "
+        f"{latest['api_calls'] or 0}リクエスト ({(latest['api_bytes'] or 0) / 1024:.0f} KB)"
+    )
+    if latest["errors"]:
+        st.caption("エラー: " + " / ".join(latest["errors"][:3]))
+
+# データベース統計表示（改良版）
+def show_database_overview():
+    """データベース概要を表示"""
+    
+    st.markdown("### 📊 データベース概要")
+    
+    stats = get_database_stats()
+    
+    if "error" in stats:
+        st.error(f"❌ データベース接続エラー: {stats['error']}")
+        
+        # データベースファイルの存在確認
+        if not os.path.exists("vods.db"):
+            st.warning("⚠️ データベースファイルが存在しません。初回同期を実行してください。")
+        
+        return
+    
+    # 統計カードを表示
+    st.markdown('<div class="stats-grid">', unsafe_allow_html=True)
+    
+    # メインの統計
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.markdown(f'''
+        <div class="stat-card">
+            <div class="stat-number">{stats["vods_count"]}</div>
+            <div class="stat-label">📺 配信動画</div>
+        </div>
+        ''', unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown(f'''
+        <div class="stat-card">
+            <div class="stat-number">{stats["clips_count"]}</div>
+            <div class="stat-label">✂️ クリップ</div>
+        </div>
+        ''', unsafe_allow_html=True)
+    
+    with col3:
+        st.markdown(f'''
+        <div class="stat-card">
+            <div class="stat-number">{stats["youtube_count"]}</div>
+            <div class="stat-label">🎥 YouTubeリンク</div>
+        </div>
+        ''', unsafe_allow_html=True)
+    
+    with col4:
+        st.markdown(f'''
+        <div class="stat-card">
+            <div class="stat-number">{stats["total_items"]}</div>
+            <div class="stat-label">📚 総コンテンツ数</div>
+        </div>
+        ''', unsafe_allow_html=True)
+    
+    st.markdown('</div>', unsafe_allow_html=True)
+    
+    # 今日の追加数
+    if stats["today_vods"] > 0 or stats["today_clips"] > 0:
+        st.success(f"🆕 本日追加: VOD {stats['today_vods']}件、クリップ {stats['today_clips']}件")
+    
+    # 最新更新情報
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        if stats["latest_vod"]:
+            vod_time = stats['latest_vod']
+            try:
+                # 日時フォーマットを調整
+                if 'T' in vod_time:
+                    vod_dt = datetime.fromisoformat(vod_time.replace('Z', '+00:00'))
+                    formatted_time = vod_dt.strftime('%m/%d %H:%M')
+                else:
+                    formatted_time = vod_time
+                st.caption(f"📺 最新VOD: {formatted_time}")
+            except:
+                st.caption(f"📺 最新VOD: {vod_time}")
+        else:
+            st.caption("📺 VODデータがありません")
+    
+    with col2:
+        if stats["latest_clip"]:
+            clip_time = stats['latest_clip']
+            try:
+                if 'T' in clip_time:
+                    clip_dt = datetime.fromisoformat(clip_time.replace('Z', '+00:00'))
+                    formatted_time = clip_dt.strftime('%m/%d %H:%M')
+                else:
+                    formatted_time = clip_time
+                st.caption(f"✂️ 最新クリップ: {formatted_time}")
+            except:
+                st.caption(f"✂️ 最新クリップ: {clip_time}")
+        else:
+            st.caption("✂️ クリップデータがありません")
+
+# 共通サイドバー関数（改良版）
+def show_sidebar():
+    with st.sidebar:
+        st.title("🎥 VOD Finder")
+        
+        # Twitch同期コントロール
+        add_sidebar_sync_controls()
+        
+        st.markdown("---")
+        
+        # ナビゲーション
+        st.markdown("### 📍 ナビゲーション")
+        
+        # ページリンク
+        pages = {
+            "🏠 Home": "main.py",
+            "📺 Videos": "pages/1_videos.py", 
+            "✂️ Clips": "pages/3_clips.py",
+            "⭐ Favorites": "pages/5_favorites.py",
+            "🔑 Login": "pages/6_login.py"
+        }
+        
+        for page_name, page_file in pages.items():
+            if st.button(page_name, use_container_width=True):
+                st.switch_page(page_file)
+        
+        st.markdown("---")
+        
+        # 検索ボックス
+        st.markdown("### 🔍 クイック検索")
+        search_query = st.text_input("検索", placeholder="タイトルやゲーム名で検索...", label_visibility="collapsed")
+        if search_query:
+            st.session_state['search_query'] = search_query
+            st.switch_page("pages/1_videos.py")
+        
+        # 認証状態表示
+        st.markdown("---")
+        st.markdown("### 👤 ユーザー状態")
+        
+        if st.session_state.get("is_admin", False):
+            st.success("✅ 編集者ログイン中")
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button("VOD追加", use_container_width=True):
+                    st.switch_page("pages/7_add_vod.py")
+            with col2:
+                if st.button("Clip追加", use_container_width=True):
+                    st.switch_page("pages/8_add_clip.py")
+            
+            if st.button("🚪 ログアウト", use_container_width=True, type="secondary"):
+                st.session_state["is_admin"] = False
+                st.success("ログアウトしました")
+                st.rerun()
+        else:
+            st.info("🔒 閲覧モード")
+            if st.button("🔑 編集者ログイン", use_container_width=True):
+                st.switch_page("pages/6_login.py")
+
+# サイドバー表示
+show_sidebar()
+
+# メインコンテンツ（ホームページ）
+st.title("🎥 配信アーカイブ共有サイト")
+st.markdown("---")
+
+# 手動更新セクション
+add_manual_update_section()
+
+# データベース概要
+show_database_overview()
+
+# サイト紹介
+st.markdown("""
+### 🔍 このサイトについて
+(2025/08/18)Youtube,ニコニコの配信履歴を追加し、残っている限りyoutubeのリンクと結び付けました。  
+このサイトは、みどりくんの**配信アーカイブ（VOD）やクリップ動画**を整理・共有するための非公式データベースです。  
+個人制作のため、抜けや漏れがある可能性があります。ご承知おきください。
+
+#### 📁 主な機能
+- **📺 Videos**：配信アーカイブの一覧・検索・視聴
+- **✂️ Clips**：切り抜き動画の一覧・検索・視聴  
+- **⭐ Favorites**：お気に入りに追加したクリップ管理
+- **🔑 Login**：編集者用ログイン（データ追加・編集）
+
+#### 🎯 使い方
+1. **左サイドバー**から各ページに移動
+2. **検索ボックス**でコンテンツを検索
+3. **お気に入り機能**でクリップを保存（このブラウザに保存され、次回も引き継がれます）
+4. **編集者権限**でデータの追加・修正
+
+#### 🔄 データ更新
+- **通常同期**: 前回の同期以降のデータをバックグラウンドで取得
+- **定期同期**: `python -m app.sync daemon` を常駐させると自動で同期します
+- **日付指定同期**: 指定した期間のデータを取得
+- **接続テスト**でAPI設定を確認
+- **Youtubeリンク**: 動画詳細ページから1件ずつ、またはチャンネルのエクスポートから一括で登録（管理者用）
+""")
+
+# 操作ガイド
+with st.expander("📖 詳細操作ガイド", expanded=False):
+    st.markdown("""
+    #### 🔧 初期設定（管理者向け）
+    1. **Twitch Developer Console**でアプリケーションを作成
+    2. **Client ID**と**Client Secret**を取得
+    3. **`.env`ファイル**に設定情報を記入
+    4. **接続テスト**で設定を確認
+    
+    #### 📱 日常の使い方
+    1. **データ同期**：定期的に「Twitch同期」ボタンをクリック
+    2. **動画検索**：Videosページで配信アーカイブを検索
+    3. **クリップ視聴**：Clipsページで切り抜き動画を視聴
+    4. **お気に入り**：気に入ったクリップを保存・管理
+    
+    #### 📅 日付指定同期の使い方
+    1. **日付指定同期**を選択
+    2. **開始日**と**終了日**を設定
+    3. **日付指定同期**ボタンをクリック
+    4. 指定期間のデータが取得されます
+    
+    #### ⚠️ トラブルシューティング
+    - **同期エラー**：接続テストでAPI設定を確認
+    - **データが古い**：手動で「Twitch同期」を実行
+    - **表示異常**：「キャッシュクリア」を実行
+    - **長期間指定時**：90日以上は時間がかかる場合があります
+    """)
+
+# システム状態表示
+if st.session_state.get("is_admin", False):
+    with st.expander("🔧 システム情報（管理者用）", expanded=False):
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            st.markdown("**データベース**")
+            if os.path.exists("vods.db"):
+                db_size = os.path.getsize("vods.db") / 1024 / 1024  # MB
+                st.caption(f"📁 ファイルサイズ: {db_size:.2f} MB")
+                
+                db_mtime = os.path.getmtime("vods.db")
+                db_update = datetime.fromtimestamp(db_mtime)
+                st.caption(f"🕒 最終変更: {db_update.strftime('%m/%d %H:%M')}")
+            else:
+                st.caption("❌ データベースファイルなし")
+        
+        with col2:
+            st.markdown("**API設定**")
+            config_ok, config_msg = check_api_configuration()
+            if config_ok:
+                st.caption("✅ 設定正常")
+            else:
+                st.caption("❌ 設定エラー")
+                st.caption(config_msg)
+        
+        with col3:
+            st.markdown("**セッション情報**")
+            st.caption(f"🔑 管理者: {'有効' if st.session_state.get('is_admin') else '無効'}")
+            if "last_manual_refresh" in st.session_state:
+                last_refresh = st.session_state.last_manual_refresh
+                st.caption(f"🔄 最終同期開始: {last_refresh.strftime('%H:%M')}")
+        
+        st.markdown("**📈 同期の推移**")
+        show_sync_trends()
+    
+    with st.expander("📺 YouTubeリンクの一括登録（管理者用）", expanded=False):
+        st.caption("YouTubeチャンネルのエクスポート（動画ID・タイトル・公開日時）をVODと照合し、"
+                   "確度の高いものは自動で登録、それ以外はここで確認します")
+        show_youtube_matcher()
+    
+    with st.expander("📦 カタログの一括エクスポート（管理者用）", expanded=False):
+        st.caption("VOD・クリップ・YouTubeリンクを CSV / JSONL / Parquet で書き出します（ボタンを押したときだけ生成）")
+        show_catalog_export()
+
+# 認証状態の詳細表示
+st.markdown("---")
+if st.session_state.get("is_admin"):
+    st.success("✅ 編集者としてログイン中です。")
+    st.markdown("サイドバーから新しいVODやClipを追加できます。データの同期や管理機能をご利用ください。")
+else:
+    st.info("🔒 現在は閲覧モードです。")
+    st.markdown("動画の検索・視聴・お気に入り機能をご利用いただけます。編集者権限が必要な場合はログインしてください。")
+
+# フッター情報
+st.markdown("---")
+channel_link = f'<a href="{twitch_url}" target="_blank">配信チャンネル</a> | ' if twitch_url else ''
+st.markdown(
+    f'''
+    <div style="text-align: center; color: #666; font-size: 0.9em; padding: 20px;">
+        <p>🎥 <strong>配信アーカイブ共有サイト</strong></p>
+        <p>データはTwitch APIから取得・定期更新されます | 
+        {channel_link}
+        <a href="https://x.com/blank_et4869" target="_blank">お問い合わせ</a> </p>
+    </div>
+    ''',
+    unsafe_allow_html=True
+)
@@ -6,70 +6,14 @@ import sys, os
 # ページ設定
 st.set_page_config(page_title="Favorites", page_icon="⭐", layout="wide")
 
-# CSS: ナビゲーション非表示 + カード形式
-st.markdown("""
-<style>
-    section[data-testid="stSidebar"] .stSelectbox {
-        display: none !important;
-    }
-
-    .clip-card {
-        border: 1px solid #e0e0e0;
-        border-radius: 8px;
-        padding: 12px;
-        margin-bottom: 12px;
-        background-color: white;
-        box-shadow: 0 1px 3px rgba(0,0,0,0.1);
-        height: 140px;
-        display: flex;
-        flex-direction: column;
-        justify-content: space-between;
-    }
-
-    .clip-card:hover {
-        box-shadow: 0 3px 6px rgba(0,0,0,0.15);
-        transition: box-shadow 0.3s ease;
-    }
-
-    .clip-title {
-        font-size: 15px;
-        font-weight: bold;
-        margin-bottom: 6px;
-        color: #ff6b6b;
-        text-decoration: none;
-        line-height: 1.3;
-        word-wrap: break-word;
-        overflow-wrap: break-word;
-        height: 2.6em;
-        overflow: hidden;
-        display: -webkit-box;
-        -webkit-line-clamp: 2;
-        -webkit-box-orient: vertical;
-    }
-
-    .clip-meta {
-        color: #666;
-        font-size: 12px;
-        margin-bottom: 6px;
-    }
-
-    .clip-url {
-        font-size: 12px;
-        color: #1f77b4;
-        word-break: break-all;
-    }
-
-    .download-button-container {
-        display: flex;
-        justify-content: flex-end;
-        margin-bottom: 10px;
-    }
-</style>
-""", unsafe_allow_html=True)
-
 # サイドバー表示
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from app.components.sidebar import show_sidebar
+from app.components.page_shell import apply_page_shell
+from app.components.favorites import favorite_clip_ids, get_owner_token
+from app.utils.data_cache import DB_PATH
+from app.utils.favorites import list_favorite_clips
+apply_page_shell("favorites")
 show_sidebar()
 
 # タイトルとCSVダウンロードを横並びに
@@ -77,35 +21,22 @@ col1, col2 = st.columns([6, 1])
 with col1:
     st.title("⭐ お気に入りクリップ一覧")
 
-# お気に入りclip IDをセッションから取得
-clip_fav_ids = [
-    key.replace("clip_fav_", "")
-    for key in st.session_state
-    if key.startswith("clip_fav_") and st.session_state[key] is True
-]
+# お気に入り（このブラウザの owner_token で1回だけ検索）
+# 以前の形式でセッションに残っていたお気に入りは favorite_clip_ids() がDBに移す
+favorite_clip_ids()
+conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+c = conn.cursor()
+clips = list_favorite_clips(c, get_owner_token())
+conn.close()
+# 他のタブでの変更もここで反映しておく
+st.session_state["favorite_clip_ids"] = {row[0] for row in clips}
 
-if not clip_fav_ids:
+if not clips:
     st.info("⭐ まだお気に入りに追加されたクリップはありません。")
     st.stop()
 
-# DB接続
-conn = sqlite3.connect("vods.db", check_same_thread=False)
-c = conn.cursor()
-
-# Clip情報取得
-placeholder = ",".join(["?"] * len(clip_fav_ids))
-query = f"""
-    SELECT id, title, url, thumbnail_url, created_at, vod_id
-    FROM clips
-    WHERE id IN ({placeholder})
-    ORDER BY created_at DESC
-"""
-c.execute(query, clip_fav_ids)
-clips = c.fetchall()
-conn.close()
-
 # ダウンロード用データ
-csv_data = [{"Title": title, "URL": url, "Created At": created_at} for _, title, url, _, created_at, _ in clips]
+csv_data = [{"Title": title, "URL": url, "Created At": created_at} for _, title, url, _, created_at, _, _ in clips]
 df = pd.DataFrame(csv_data)
 csv = df.to_csv(index=False).encode("utf-8-sig")
 
@@ -121,13 +52,13 @@ with col2:
 
 # 4列表示
 cols = st.columns(4)
-for idx, (cid, title, url, thumbnail_url, created_at, vod_id) in enumerate(clips):
+for idx, (cid, title, url, thumbnail_url, created_at, vod_id, youtube_video_id) in enumerate(clips):
     with cols[idx % 4]:
-        # サムネイル表示（VOD ID またはクリップサムネイルURL）
+        # サムネイル表示（クリップのサムネイルURL、なければ元VODのYouTube動画）
         if thumbnail_url:
             st.image(thumbnail_url, use_container_width=True)
-        elif vod_id:
-            st.image(f"https://img.youtube.com/vi/{vod_id}/mqdefault.jpg", use_container_width=True)
+        elif youtube_video_id:
+            st.image(f"https://img.youtube.com/vi/{youtube_video_id}/mqdefault.jpg", use_container_width=True)
         else:
             st.markdown('<div style="height: 180px; background-color: #f5f5f5; display: flex; align-items: center; justify-content: center; border-radius: 4px; border: 2px dashed #ccc; font-size: 14px; color: #999;">No Thumbnail</div>', unsafe_allow_html=True)
 
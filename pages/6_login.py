@@ -9,6 +9,8 @@ st.set_page_config(page_title="Login", page_icon="🔒", layout="wide")
 # サイドバー表示
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from app.components.sidebar import show_sidebar
+from app.components.page_shell import apply_page_shell
+apply_page_shell("login")
 show_sidebar()
 
 # タイトル
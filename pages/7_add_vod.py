@@ -7,7 +7,10 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from app.components.sidebar import show_sidebar
+from app.components.page_shell import apply_page_shell
+from app.components.channel_selector import get_selected_channel
 
+apply_page_shell("add_vod")
 selected = show_sidebar()
 
 st.set_page_config(layout="wide")
@@ -31,11 +34,14 @@ with st.form("vod_form"):
             c = conn.cursor()
             twitch_id = "manual_" + uuid.uuid4().hex[:8]
             created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            # 一覧はチャンネルで絞り込むので、選択中のチャンネルのVODとして登録する
+            channel = get_selected_channel()
+            broadcaster_id = channel["broadcaster_id"] if channel else None
 
             c.execute("""
-                INSERT INTO vods (twitch_id, title, category, url, created_at, type)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (twitch_id, title, category, url, created_at, "upload_manual"))
+                INSERT INTO vods (twitch_id, title, category, url, created_at, type, broadcaster_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (twitch_id, title, category, url, created_at, "upload_manual", broadcaster_id))
 
             conn.commit()
             conn.close()
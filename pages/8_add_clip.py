@@ -6,7 +6,10 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from app.components.sidebar import show_sidebar
+from app.components.page_shell import apply_page_shell
+from app.components.channel_selector import get_selected_channel
 
+apply_page_shell("add_clip")
 selected = show_sidebar()
 
 st.set_page_config(layout="wide")
@@ -19,12 +22,13 @@ if not st.session_state.get("is_admin"):
 # DB接続 & VOD一覧取得（プルダウン用）
 conn = sqlite3.connect("vods.db", check_same_thread=False)
 c = conn.cursor()
-c.execute("SELECT id, title FROM vods ORDER BY created_at DESC")
+c.execute("SELECT id, title, broadcaster_id FROM vods ORDER BY created_at DESC")
 vod_choices = c.fetchall()
 conn.close()
 
-vod_titles = [f"{vid} - {title}" for vid, title in vod_choices]
-vod_map = {f"{vid} - {title}": vid for vid, title in vod_choices}
+vod_titles = [f"{vid} - {title}" for vid, title, _ in vod_choices]
+vod_map = {f"{vid} - {title}": vid for vid, title, _ in vod_choices}
+vod_channels = {vid: broadcaster_id for vid, _, broadcaster_id in vod_choices}
 
 with st.form("clip_form"):
     title = st.text_input("タイトル", max_chars=200)
@@ -41,15 +45,18 @@ with st.form("clip_form"):
         else:
             vod_id = vod_map.get(selected_vod) if selected_vod else None
             created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            # 一覧はチャンネルで絞り込むので、紐づけたVODのチャンネル（なければ選択中のチャンネル）にする
+            channel = get_selected_channel()
+            broadcaster_id = vod_channels.get(vod_id) or (channel["broadcaster_id"] if channel else None)
 
             conn = sqlite3.connect("vods.db", check_same_thread=False)
             c = conn.cursor()
             twitch_id = "manual_" + datetime.now().strftime("%Y%m%d%H%M%S")
             c.execute("""
                 INSERT INTO clips
-                (twitch_id, title, category, url, created_at, vod_id, thumbnail_url, is_favorite)
-                VALUES (?, ?, ?, ?, ?, ?, ?, 0)
-            """, (twitch_id, title, category, url, created_at, vod_id, thumbnail))
+                (twitch_id, title, category, url, created_at, vod_id, thumbnail_url, is_favorite, broadcaster_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?, 0, ?)
+            """, (twitch_id, title, category, url, created_at, vod_id, thumbnail, broadcaster_id))
             conn.commit()
             conn.close()
 
@@ -0,0 +1,172 @@
+/*
+ * 全ページ共通のスクリプト（app/components/page_shell.py が1セッションに1回だけ読み込む）
+ *
+ * 以前は各ページが st.markdown で setInterval（500ms / 2000ms）を仕込んでいたが、
+ * ここで MutationObserver を1つだけ登録し、DOMが変わったときだけ処理する。
+ *   - URLから現在のページ名を body[data-page] に設定（ページ別CSSの切り替え）
+ *   - そのページのCSSの <link> がなければ追加（一覧はローダーが window.__pageShellAssets に置く）
+ *   - サイドバーに残ったデフォルトのページナビゲーションを隠す
+ * Twitchボタンはクリックをdocumentで1回だけ受け取る（ボタンごとの登録は不要）。
+ * カード一覧のリンク（a[data-app-link]）は、ページを読み込み直さずにStreamlitのページ遷移で開く。
+ * カード一覧のサムネイル（img[data-lazy-card]）は、挿入されたものを同じ MutationObserver で拾い、
+ * スクロール位置の少し先に入ったら読み込みを始める。
+ */
+(function () {
+    if (window.__pageShell) {
+        return;
+    }
+    window.__pageShell = true;
+
+    // pages/ のファイル名から番号を除いたもの（StreamlitのURLパス）。それ以外はホーム
+    var PAGES = [
+        "videos", "video_detail", "clips", "clip_detail",
+        "favorites", "login", "add_vod", "add_clip"
+    ];
+    // スクロール位置から何px先の画像を読み込み始めるか（カード2行分程度）
+    var LAZY_AHEAD_PX = 600;
+    var NAV_SELECTOR = '[data-testid="stSidebarNav"], ul:not(.custom-nav), nav:not(.custom-nav), ' +
+        '.css-1d391kg, .e1fqkh3o0, [data-testid="stSelectbox"]';
+
+    function currentPage() {
+        var segment = window.location.pathname.replace(/\/+$/, "").split("/").pop();
+        return PAGES.indexOf(segment) >= 0 ? segment : "home";
+    }
+
+    function hideDefaultNav() {
+        var sidebar = document.querySelector('[data-testid="stSidebar"]');
+        if (!sidebar) {
+            return;
+        }
+        // Reactが管理する要素なので削除はせずに隠す
+        sidebar.querySelectorAll(NAV_SELECTOR).forEach(function (el) {
+            if (el.style.display !== "none") {
+                el.style.display = "none";
+            }
+        });
+    }
+
+    // loading="lazy" だけでも動くが、読み込み開始の距離はブラウザ任せになる（Safari/Firefoxは近い）。
+    // 先の行が見える前に取得を始めるよう、LAZY_AHEAD_PX 先に入った画像を eager に切り替える
+    var lazyObserver = null;
+
+    function lazyRoot() {
+        // Streamlitはページ全体ではなくメイン領域がスクロールする
+        return document.querySelector('[data-testid="stMain"], section.main, [data-testid="stAppViewContainer"]');
+    }
+
+    function watchLazyImages(images) {
+        if (!("IntersectionObserver" in window) || !images.length) {
+            return;
+        }
+        var root = lazyRoot();
+        // ページ遷移でスクロール領域が作り直されたら監視も作り直す
+        if (!lazyObserver || lazyObserver.root !== root) {
+            if (lazyObserver) {
+                lazyObserver.disconnect();
+            }
+            lazyObserver = new IntersectionObserver(function (entries) {
+                entries.forEach(function (entry) {
+                    if (entry.isIntersecting) {
+                        entry.target.loading = "eager";
+                        lazyObserver.unobserve(entry.target);
+                    }
+                });
+            }, {root: root, rootMargin: LAZY_AHEAD_PX + "px 0px"});
+        }
+        images.forEach(function (img) {
+            if (img.loading === "lazy") {
+                lazyObserver.observe(img);
+            }
+        });
+    }
+
+    function addedLazyImages(records) {
+        var images = [];
+        records.forEach(function (record) {
+            record.addedNodes.forEach(function (node) {
+                if (node.nodeType !== 1) {
+                    return;
+                }
+                if (node.matches("img[data-lazy-card]")) {
+                    images.push(node);
+                } else if (node.firstElementChild) {
+                    images.push.apply(images, node.querySelectorAll("img[data-lazy-card]"));
+                }
+            });
+        });
+        return images;
+    }
+
+    // page_shell.py はセッションで1回しかローダーを送らないので、移動先のページのCSSはここで追加する
+    function ensurePageCss(page) {
+        var asset = (window.__pageShellAssets || {})[page];
+        if (!asset) {
+            return;
+        }
+        var el = document.getElementById(asset.id);
+        if (el && el.getAttribute(asset.attr) === asset.url) {
+            return;
+        }
+        if (el) {
+            el.remove();
+        }
+        el = document.createElement("link");
+        el.id = asset.id;
+        el.rel = "stylesheet";
+        el.setAttribute(asset.attr, asset.url);
+        document.head.appendChild(el);
+    }
+
+    function update() {
+        var page = currentPage();
+        if (document.body.dataset.page !== page) {
+            document.body.dataset.page = page;
+        }
+        ensurePageCss(page);
+        if (page !== "home") {
+            hideDefaultNav();
+        }
+    }
+
+    // 描画前に反映されるよう、変更のたびに同期的に処理する（どちらも軽い処理）
+    new MutationObserver(function (records) {
+        update();
+        watchLazyImages(addedLazyImages(records));
+    }).observe(document.body, {childList: true, subtree: true});
+    window.addEventListener("popstate", update);
+    update();
+    // 読み込まれる前に描画済みだったカード
+    watchLazyImages(Array.prototype.slice.call(document.querySelectorAll("img[data-lazy-card]")));
+
+    // 通常のリンクのままだとページ全体を読み込み直し、新しいセッションになる（session_state の
+    // ログイン状態などが消える）。URLを書き換えて popstate を送ると、Streamlitは同じセッションのまま
+    // URLのページとクエリパラメータで再実行する（ブラウザの戻る・進むと同じ経路）。
+    // Ctrl/Shift/中クリックなどはブラウザに任せ、URLでそのまま開けるようにしておく
+    document.addEventListener("click", function (e) {
+        var link = e.target.closest && e.target.closest("a[data-app-link]");
+        if (!link || e.defaultPrevented || e.button !== 0 ||
+                e.ctrlKey || e.metaKey || e.shiftKey || e.altKey) {
+            return;
+        }
+        var url = new URL(link.getAttribute("href"), window.location.href);
+        if (url.origin !== window.location.origin) {
+            return;
+        }
+        e.preventDefault();
+        window.history.pushState(null, "", url.pathname + url.search);
+        window.dispatchEvent(new PopStateEvent("popstate", {state: null}));
+    });
+
+    document.addEventListener("click", function (e) {
+        var button = e.target.closest && e.target.closest(".twitch-button");
+        if (!button) {
+            return;
+        }
+        e.preventDefault();
+        e.stopPropagation();
+        var url = button.getAttribute("href");
+        if (url) {
+            window.open(url, "_blank", "noopener,noreferrer");
+        }
+    }, true);
+})();